@@ -2,6 +2,7 @@ import streamlit as st
 from streamlit.runtime.scriptrunner import add_script_run_ctx
 import streamlit.components.v1 as components
 
+import os
 import json
 from pathlib import Path
 from datetime import datetime
@@ -18,8 +19,10 @@ from services.oci_speech_stt_realtime import start_realtime_session, OCIAudioPro
 
 import components as component
 import services.database as database
+from services.database.connection import Connection
 import services as service
 import utils as utils
+from utils import ingest
 
 
 
@@ -69,6 +72,11 @@ if login:
         utl_function_service          = utils.FunctionService()
         db_user_service               = database.UserService()
         db_quiz_service               = database.QuizService()
+        job_manager                   = service.JobManager()
+        connection                    = Connection()
+        # Retoma los jobs huérfanos (p. ej. tras reiniciar la app), una vez por proceso
+        job_manager.resume()
+        background_jobs               = os.getenv('CON_JOB_BACKGROUND', 'True').lower() in ('true', '1', 'yes')
         st.header(":material/book_ribbon: Knowledge")
         st.caption("Manage Knowledge")
         st.set_page_config(layout="wide")
@@ -91,8 +99,45 @@ if login:
         trg_type            = None
         comment_data_editor = None
 
+        # Background Jobs (Document Understanding, Speech)
+        @st.fragment(run_every=5 if st.session_state.get("jobs_active") else None)
+        def render_jobs():
+            df_jobs = job_manager.get_jobs(user_id)
+            if df_jobs.empty:
+                return
+
+            is_active  = bool(df_jobs["JOB_STATE"].isin(["SUBMITTED", "RUNNING"]).any())
+            was_active = st.session_state.get("jobs_active", False)
+            st.session_state["jobs_active"] = is_active
+
+            with st.expander("Jobs", expanded=is_active, icon=":material/pending_actions:"):
+                st.dataframe(
+                    df_jobs,
+                    width="stretch",
+                    hide_index=True,
+                    column_config={
+                        "JOB_ID"             : st.column_config.Column("ID"),
+                        "FILE_ID"            : st.column_config.Column("File ID"),
+                        "FILE_SRC_FILE_NAME" : st.column_config.LinkColumn("Source File", display_text=r".*/(.+)$"),
+                        "JOB_TYPE"           : st.column_config.Column("Type"),
+                        "JOB_STATE"          : st.column_config.Column("State"),
+                        "JOB_MESSAGE"        : st.column_config.Column("Message"),
+                        "JOB_ATTEMPTS"       : st.column_config.Column("Polls"),
+                        "JOB_DATE"           : st.column_config.Column("Submitted"),
+                        "JOB_END_DATE"       : st.column_config.Column("Finished")
+                    }
+                )
+
+            # Un job terminó: refresca la lista de archivos
+            if was_active and not is_active:
+                db_module_service.get_modules_files_cache(user_id, force_update=True)
+                db_file_service.get_all_files.clear()
+                st.rerun()
+
         # File List
         if not st.session_state["show_form_app"]:
+            render_jobs()
+
             with st.container(border=True):
                 st.badge("List Files")
                 
@@ -679,8 +724,13 @@ if login:
                                 component.get_processing(True)
                                 utl_function_service.track_time(1)
 
-                                # ← CAMBIO: iteramos sobre cada archivo/grabación
-                                for uploaded_file in files_to_process:
+                                # Ingesta de un archivo/grabación: subida → registro → extracción → vector store
+                                def ingest_file(index, uploaded_file, report):
+                                    file_start = time.time()
+
+                                    # Avance del vector store por report: los servicios no dibujan en los hilos del pool
+                                    def get_progress(stage_key):
+                                        return lambda stage, done, total: report(stage_key, f"Vector Store · {stage} {done}/{total}")
 
                                     # Variables
                                     module_id           = selected_module_id
@@ -693,10 +743,11 @@ if login:
                                                         if selected_module_id == 6 else uploaded_file.getvalue() if uploaded_file else uploaded_record)
                                     
                                     # Upload file to Bucket
+                                    report("upload")
                                     upload_file = bucket_service.upload_file(
                                         object_name     = bucket_file_name,
                                         put_object_body = bucket_file_content,
-                                        msg             = True
+                                        msg             = False
                                     )                            
 
                                     if upload_file:
@@ -710,8 +761,8 @@ if login:
                                                             else f"{file_src_file_name.rsplit('.', 1)[0]}_trg.{trg_type.lower()}")
                                         file_trg_language = language_map[selected_language_file]
                                         file_trg_pii      = 0
-                                        file_description  = file_description
                                         # Insert File
+                                        report("register")
                                         msg, file_id = db_file_service.insert_file(
                                             file_name,
                                             user_id,
@@ -724,10 +775,12 @@ if login:
                                             file_trg_pii,
                                             file_description
                                         )
-                                        component.get_toast(msg, icon=":material/database:")
+                                        report("register", msg)
                                         
                                         # Modules
+                                        report("extract")
                                         msg_module = None  # Inicializar msg_module por defecto
+                                        job_id     = None  # Job en segundo plano (módulos 3 y 4)
                                         match module_id:
                                             case 1:
                                                 #msg = db_file_service.update_extraction(file_id, str(bucket_file_content))
@@ -747,7 +800,7 @@ if login:
                                                 file_trg_language       = language_map[selected_language_file]
                                             case 2:
                                                 msg = db_file_service.update_extraction(file_id, str(bucket_file_content))
-                                                component.get_toast(msg, ":material/database:")
+                                                report("extract", msg)
                                                 
                                                 msg_module = select_ai_rag_service.create_profile(
                                                     user_id,
@@ -760,12 +813,27 @@ if login:
                                                 file_trg_language       = language_map[selected_language_file]
                                             case 3:
                                                 object_name = bucket_file_name
-                                                msg_module, data = document_undestanding_service.create(
-                                                    object_name,
-                                                    prefix,
-                                                    language,
-                                                    file_id
-                                                )
+                                                if background_jobs and not selected_pii:
+                                                    # PII necesita la extracción en línea: solo sin PII se ejecuta en segundo plano
+                                                    job_id = document_undestanding_service.submit_job(
+                                                        object_name,
+                                                        prefix,
+                                                        language,
+                                                        file_id,
+                                                        user_id,
+                                                        file_trg_obj_name,
+                                                        language_map[selected_language_file]
+                                                    )
+                                                    msg_module, data = f"[AI Document Understanding] Job {job_id} submitted.", None
+                                                else:
+                                                    msg_module, data = document_undestanding_service.create(
+                                                        object_name,
+                                                        prefix,
+                                                        language,
+                                                        file_id,
+                                                        progress     = get_progress("extract"),
+                                                        raise_errors = True
+                                                    )
                                                 file_trg_obj_name       = file_trg_obj_name
                                                 file_trg_tot_pages      = data[-1].get('page_number', 0) if data else 0
                                                 file_trg_tot_characters = sum(page.get('characters', 0) for page in data) if data else 0
@@ -773,13 +841,28 @@ if login:
                                                 file_trg_language       = language_map[selected_language_file]
                                             case 4:
                                                 object_name = bucket_file_name
-                                                msg_module, data = speech_service.create_job(
-                                                    object_name,
-                                                    prefix,
-                                                    language,
-                                                    file_id,
-                                                    trg_type
-                                                )
+                                                if background_jobs and not selected_pii:
+                                                    job_id = speech_service.submit_job(
+                                                        object_name,
+                                                        prefix,
+                                                        language,
+                                                        file_id,
+                                                        trg_type,
+                                                        user_id,
+                                                        file_trg_obj_name,
+                                                        language_map[selected_language_file]
+                                                    )
+                                                    msg_module, data = f"[AI Speech] Job {job_id} submitted.", None
+                                                else:
+                                                    msg_module, data = speech_service.create_job(
+                                                        object_name,
+                                                        prefix,
+                                                        language,
+                                                        file_id,
+                                                        trg_type,
+                                                        progress     = get_progress("extract"),
+                                                        raise_errors = True
+                                                    )
                                                 file_trg_obj_name       = file_trg_obj_name
                                                 file_trg_tot_pages      = 1
                                                 file_trg_tot_characters = len(str(data))
@@ -796,7 +879,8 @@ if login:
                                                     agent_id,
                                                     file_id,
                                                     username,
-                                                    trg_type
+                                                    trg_type,
+                                                    progress = get_progress("extract")
                                                 )
                                                 file_trg_obj_name       = file_trg_obj_name
                                                 file_trg_tot_pages      = 1
@@ -810,7 +894,9 @@ if login:
                                                     prefix,
                                                     language,
                                                     file_id,
-                                                    trg_type
+                                                    trg_type,
+                                                    progress     = get_progress("extract"),
+                                                    raise_errors = True
                                                 )
                                                 file_trg_obj_name       = file_trg_obj_name
                                                 file_trg_tot_pages      = 1
@@ -832,11 +918,11 @@ if login:
 
                                                 # Process file extraction
                                                 msg = db_file_service.update_extraction(file_id, data)
-                                                component.get_toast(msg, ":material/database:")
+                                                report("extract", msg)
 
                                                 # Process Vector Store
-                                                msg = db_doc_service.vector_store(file_id)
-                                                component.get_toast(msg, ":material/database:")
+                                                msg = db_doc_service.vector_store(file_id, get_progress("extract"))
+                                                report("extract", msg)
 
                                                 file_trg_obj_name       = file_trg_obj_name
                                                 file_trg_tot_pages      = 1
@@ -853,7 +939,7 @@ if login:
                                                 
                                                 # Store extraction in file
                                                 msg = db_file_service.update_extraction(file_id, json_content)
-                                                component.get_toast(msg, ":material/database:")
+                                                report("extract", msg)
                                                 
                                                 # Check if this is a reload using service method
                                                 is_reload = db_quiz_service.check_if_reload(file_id)
@@ -864,12 +950,12 @@ if login:
                                                     questions_data,
                                                     reload=is_reload
                                                 )
-                                                component.get_toast(msg_quiz, icon=":material/quiz:")
+                                                report("extract", msg_quiz)
                                                 
                                                 # Assign quiz to selected user (only on first load)
                                                 if selected_quiz_user_id and not is_reload:
                                                     msg_share = db_file_service.update_file_user(file_id, [selected_quiz_user_id])
-                                                    component.get_toast(msg_share, icon=":material/person_add:")
+                                                    report("extract", msg_share)
                                                 
                                                 action_text = "reloaded" if is_reload else "loaded"
                                                 msg_module = f"Quiz '{questions_data.get('questions_name', 'Quiz')}' {action_text} successfully with {len(questions_data.get('questions', []))} questions."
@@ -882,19 +968,21 @@ if login:
                                             case _:
                                                 msg_module = f"Module {module_id} not implemented or invalid."
 
-                                        # Update Extraction
-                                        file_trg_tot_time = utl_function_service.track_time(0)
-                                        db_file_service.update_file(
-                                            file_id,
-                                            file_trg_obj_name,
-                                            file_trg_tot_pages,
-                                            file_trg_tot_characters,
-                                            file_trg_tot_time,
-                                            file_trg_language
-                                        )
+                                        # Update Extraction (los jobs en segundo plano la actualizan al terminar)
+                                        if job_id is None:
+                                            file_trg_tot_time = time.strftime("%H:%M:%S", time.gmtime(time.time() - file_start))
+                                            db_file_service.update_file(
+                                                file_id,
+                                                file_trg_obj_name,
+                                                file_trg_tot_pages,
+                                                file_trg_tot_characters,
+                                                file_trg_tot_time,
+                                                file_trg_language
+                                            )
 
                                         # PII
                                         if selected_pii:
+                                            report("pii")
                                             # Set Variables
                                             file_trg_obj_name   = f"{file_src_file_name.rsplit('.', 1)[0]}_trg_pii.{trg_type.lower()}"
                                             file_trg_pii        = (1 if selected_pii else 0)
@@ -912,7 +1000,7 @@ if login:
                                                 file_trg_pii,
                                                 file_description
                                             )
-                                            component.get_toast(msg, icon=":material/database:")
+                                            report("pii", msg)
 
                                             object_name = bucket_file_name
                                             msg_module, data = anomaly_engine_service.create(
@@ -920,7 +1008,9 @@ if login:
                                                 language,
                                                 file_id,
                                                 data,
-                                                trg_type
+                                                trg_type,
+                                                progress     = get_progress("pii"),
+                                                raise_errors = True
                                             )
                                             file_trg_obj_name       = file_trg_obj_name
                                             file_trg_tot_pages      = 1
@@ -929,7 +1019,7 @@ if login:
                                             file_trg_language       = language_map[selected_language_file]
 
                                             # Update Extraction
-                                            file_trg_tot_time = utl_function_service.track_time(0)
+                                            file_trg_tot_time = time.strftime("%H:%M:%S", time.gmtime(time.time() - file_start))
                                             db_file_service.update_file(
                                                 file_id,
                                                 file_trg_obj_name,
@@ -939,15 +1029,54 @@ if login:
                                                 file_trg_language
                                             )
 
-                                        db_module_service.get_modules_files_cache(user_id, force_update=True)
-                                        db_file_service.get_all_files.clear()
-                                        db_file_service.get_all_files(user_id)
+                                        return {"message": msg_module, "job_id": job_id}
+
+                                    raise RuntimeError(f"The file {file_name} could not be uploaded.")
+
+                                # Avance por archivo (solo el hilo del script dibuja)
+                                file_labels   = [getattr(item, "name", None) or f"Item {index + 1}" for index, item in enumerate(files_to_process)]
+                                file_progress = [st.empty() for _ in files_to_process]
+                                stage_values  = {"queued": 0.0, "upload": 0.1, "register": 0.25, "extract": 0.4, "pii": 0.8, "done": 1.0, "failed": 1.0}
+
+                                def on_update(index, stage, detail):
+                                    text = f"{file_labels[index]}: {ingest.STAGES[stage]}" + (f" — {detail}" if detail else "")
+                                    file_progress[index].progress(stage_values[stage], text=text)
+
+                                # Cada archivo usa una conexión del pool durante su ingesta
+                                def ingest_scoped(index, uploaded_file, report):
+                                    with connection.acquire():
+                                        return ingest_file(index, uploaded_file, report)
+
+                                # Select AI (1), Select AI RAG (2), Real-Time (6) y Quiz (8) comparten perfil o
+                                # interfaz por usuario: se ingieren de a uno; el resto en paralelo (CON_INGEST_WORKERS).
+                                # Los hilos del pool no tienen el contexto del script: informan solo por report
+                                results = ingest.run_ingestion(
+                                    files_to_process,
+                                    ingest_scoped,
+                                    max_workers = 1 if selected_module_id in (1, 2, 6, 8) else None,
+                                    on_update   = on_update,
+                                    initializer = connection.require_scope
+                                )
+
+                                if any(result["result"] and result["result"]["job_id"] for result in results):
+                                    st.session_state["jobs_active"] = True
+
+                                db_module_service.get_modules_files_cache(user_id, force_update=True)
+                                db_file_service.get_all_files.clear()
+                                db_file_service.get_all_files(user_id)
 
-                                        if msg_module:
-                                            component.get_success(msg_module)
+                                for result in results:
+                                    if result["result"] and result["result"]["message"]:
+                                        component.get_success(result["result"]["message"])
 
                                 st.session_state["show_form_app"] = False
-                                st.rerun()
+                                failed = [result for result in results if result["error"]]
+                                if failed:
+                                    # Los archivos correctos ya quedaron cargados; se informan solo los fallidos
+                                    errors = "\n".join(f"- {file_labels[result['index']]}: {result['error']}" for result in failed)
+                                    component.get_error(f"[Error] {len(failed)} of {len(results)} file(s) failed:\n{errors}")
+                                else:
+                                    st.rerun()
 
                             except Exception as e:
                                 component.get_error(f"[Error] Uploading File:\n{e}")
@@ -0,0 +1,25 @@
+import streamlit as st
+
+def get_progress(label: str = "Vector Store"):
+    """
+    Creates a progress bar and returns a callback to update it from long-running services.
+
+    Args:
+        label (str): Text shown next to the progress stage.
+
+    Returns:
+        callable: ``progress(stage, done, total)`` callback that updates the bar.
+    """
+    stages = {
+        "chunk"  : "Chunking",
+        "cache"  : "Embedding cache hits",
+        "embed"  : "Embedding",
+        "insert" : "Inserting"
+    }
+    bar = st.progress(0.0, text=label)
+
+    def progress(stage: str, done: int, total: int):
+        value = min(done / total, 1.0) if total else 1.0
+        bar.progress(value, text=f"{label} · {stages.get(stage, stage)} {done}/{total}")
+
+    return progress
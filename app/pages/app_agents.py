@@ -71,6 +71,8 @@ if login:
                         "AGENT_TOP_K"       : None,
                         "AGENT_FREQUENCY_PENALTY" : None,
                         "AGENT_PRESENCE_PENALTY"  : None,
+                        "AGENT_VECTOR_WEIGHT"     : None,
+                        "AGENT_LEXICAL_WEIGHT"    : None,
                         "AGENT_PROMPT_SYSTEM"     : None,
                         "AGENT_PROMPT_MESSAGE"    : None,
                         "AGENT_STATE"             : None,
@@ -179,6 +181,8 @@ if login:
                     "AGENT_TOP_K": 50,
                     "AGENT_FREQUENCY_PENALTY": 0,
                     "AGENT_PRESENCE_PENALTY": 0,
+                    "AGENT_VECTOR_WEIGHT": 1.0,
+                    "AGENT_LEXICAL_WEIGHT": 1.0,
                     "AGENT_PROMPT_SYSTEM": "",
                     "AGENT_PROMPT_MESSAGE": ""
                 } if mode == "create" else st.session_state["selected_agent"]
@@ -198,6 +202,10 @@ if login:
                     freq_penalty = st.number_input("Frequency Penalty", -2.0, 2.0, float(agent_data["AGENT_FREQUENCY_PENALTY"]), step=0.1)
                     pres_penalty = st.number_input("Presence Penalty", -2.0, 2.0, float(agent_data["AGENT_PRESENCE_PENALTY"]), step=0.1)
 
+                    st.caption("Hybrid Retrieval")
+                    vector_weight = st.number_input("Vector Weight", 0.0, 9.99, float(agent_data["AGENT_VECTOR_WEIGHT"]), step=0.1, help="0 disables the vector search")
+                    lexical_weight = st.number_input("Lexical Weight", 0.0, 9.99, float(agent_data["AGENT_LEXICAL_WEIGHT"]), step=0.1, help="0 disables the lexical search")
+
 
                 with col2:
                     
@@ -262,7 +270,9 @@ if login:
                                     agent_presence_penalty=pres_penalty,
                                     agent_prompt_system=prompt_sys,
                                     agent_prompt_message=prompt_msg,
-                                    user_id=user_id
+                                    user_id=user_id,
+                                    agent_vector_weight=vector_weight,
+                                    agent_lexical_weight=lexical_weight
                                 )
                                 component.get_success(msg, ":material/add_row_below:")
                             else:
@@ -279,7 +289,9 @@ if login:
                                     pres_penalty,
                                     prompt_sys,
                                     prompt_msg,
-                                    reverse_map_agent_state.get(agent_data.get("Status", "Active"), 1)
+                                    reverse_map_agent_state.get(agent_data.get("Status", "Active"), 1),
+                                    agent_vector_weight=vector_weight,
+                                    agent_lexical_weight=lexical_weight
                                 )
                                 component.get_success(msg, ":material/update:")
 
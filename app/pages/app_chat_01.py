@@ -93,7 +93,14 @@ if login:
                 with st.spinner("Wait for Select AI...", show_time=True):
                     start_time = time.time()
                     action = st.session_state.get("select_ai_action", "narrate")
-                    response = db_select_ai_service.get_chat(prompt, profile_name, action, language)
+                    sql_query, df = None, None
+                    if st.session_state.get("analytics_agent", False):
+                        # El Analytics Agent necesita el SQL: se genera una sola vez para ambos pasos
+                        response, sql_query, df = db_select_ai_service.get_chat_with_sql(
+                            prompt, profile_name, action, language, user_id=user_id
+                        )
+                    else:
+                        response = db_select_ai_service.get_chat(prompt, profile_name, action, language, user_id=user_id)
                     response_time = f"{(time.time() - start_time) * 1000:.2f} ms"
                     annotated_text(annotation("Select AI", response_time, background="#484c54", color="#ffffff"))
                 
@@ -116,14 +123,9 @@ if login:
                             time.sleep(2)
                             start_time = time.time()
                             
-                            # Get SQL query from Select AI (only if not already showsql action)
-                            if action != "showsql":
-                                sql_query = db_select_ai_service.get_chat(prompt, profile_name, 'showsql', language)
-                            else:
-                                sql_query = response
-                            
-                            # Execute SQL query and get DataFrame
-                            df = db_select_ai_service.get_data(sql_query)
+                            # SQL query and DataFrame already obtained with the Select AI response
+                            if df is None:
+                                df = db_select_ai_service.get_data(sql_query)
                             analytics_df = df
                             selected_agent_id = int(st.session_state.get("selected_agent_id"))
                             time.sleep(2)
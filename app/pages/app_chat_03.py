@@ -267,6 +267,8 @@ if login:
                     "AGENT_TOP_K",
                     "AGENT_FREQUENCY_PENALTY",
                     "AGENT_PRESENCE_PENALTY",
+                    "AGENT_VECTOR_WEIGHT",
+                    "AGENT_LEXICAL_WEIGHT",
                     "AGENT_PROMPT_SYSTEM",
                     "AGENT_PROMPT_MESSAGE"
                 ]
@@ -355,7 +357,9 @@ if login:
                 agent_id     = st.session_state["chat-agent"],
                 history      = messages_for_langchain,
                 input        = chat_human_prompt_input,
-                input_imagen = chat_human_prompt_image_input
+                input_imagen = chat_human_prompt_image_input,
+                hybrid       = True,  # códigos de producto y SKUs: búsqueda léxica + vectorial
+                stream       = True   # chain["answer"] es un generador de tokens
             )
 
             #
@@ -364,52 +368,53 @@ if login:
             # Limpiamos la imagen de la sesión una vez usada
             st.session_state["chat-image"] = None            
 
-            elapsed_time = time.time() - start_time
-
-            # 3. Extraemos la respuesta final
-            #chat_ai_answer = chain["answer"]
-            # 3) Respuesta RAW (para memoria interna, sin "Fuente(s)")
-            chat_ai_answer_raw = chain.get("answer", "")
-            
             # 3.1) Documentos recuperados por RAG (create_retrieval_chain suele devolver "context")
             context_docs = chain.get("context", [])
             
             # 3.2) Extraer nombres de fuentes desde metadata
             sources = _extract_sources_from_context(context_docs)
             
-            # 3.3) Construir texto final para UI (con fuentes debajo)
+            # 3.3) Construir texto de fuentes para UI (debajo de la respuesta)
             if sources:
                 fuentes_md = "\n\n---\n**Fuente(s):** " + ", ".join([f"`{s}`" for s in sources])
             else:
                 fuentes_md = "\n\n---\n**Fuente(s):** *(no disponible)*"
-            
-            chat_ai_answer_display = chat_ai_answer_raw + fuentes_md
-            
-            # Si quieres mantener la variable original
-            chat_ai_answer = chat_ai_answer_raw
-
-
-            # 4. Calcular tokens (usando la utilidad del llm_model)
-            tokens_ids    = llm.get_token_ids(chat_ai_answer)
-            answer_tokens = len(tokens_ids)
-            token_rate    = answer_tokens / elapsed_time if elapsed_time > 0 else 0.0
-            chat_tokens_rate_answer = f"{token_rate:.2f} tokens/s"
 
             # Muestra la respuesta en la UI
             placeholder = st.empty()
             with placeholder.chat_message("ai", avatar="images/llm_meta.svg"):
-                st.markdown(chat_ai_answer_display)
+                # 3) Respuesta RAW (para memoria interna, sin "Fuente(s)"), renderizada token a token
+                chat_ai_answer_raw = st.write_stream(chain["answer"]) or ""
+                st.markdown(fuentes_md)
+
+                elapsed_time = time.time() - start_time
+
+                chat_ai_answer_display = chat_ai_answer_raw + fuentes_md
+                
+                # Si quieres mantener la variable original
+                chat_ai_answer = chat_ai_answer_raw
+
+                # 4. Calcular tokens (usando la utilidad del llm_model)
+                tokens_ids    = llm.get_token_ids(chat_ai_answer)
+                answer_tokens = len(tokens_ids)
+                token_rate    = answer_tokens / elapsed_time if elapsed_time > 0 else 0.0
+                chat_tokens_rate_answer = f"{token_rate:.2f} tokens/s"
                 
                 # También calculamos los tokens de entrada
                 input_tokens = len(llm.get_token_ids(chat_human_prompt_input))
                 chat_tokens  = input_tokens + answer_tokens
                 total_tokens = sum(int(item["chat_tokens"]) for item in st.session_state["chat-save"]) + chat_tokens
 
-                annotated_text(
+                annotations = [
                     annotation("Rate", chat_tokens_rate_answer, background="#484c54", color="#ffffff"),
                     "   ",
                     annotation("Tokens", f"{str(chat_tokens)} to {str(total_tokens)}", background="#484c54", color="#ffffff")
-                )
+                ]
+                # Respuesta servida desde ANSWER_CACHE (sin llamada al LLM)
+                cache_info = chain.get("cache", {})
+                if cache_info.get("hit"):
+                    annotations += ["   ", annotation("Cache", f"{cache_info['similarity']:.2f}", background="#2e7d32", color="#ffffff")]
+                annotated_text(*annotations)
                 st.markdown("\n\n")
                 
                 # Guardamos en "chat_ux_history" para que aparezca en la interfaz en la próxima iteración
@@ -263,7 +263,8 @@ def process_llm_response(user_id, agent_id, user_message, language):
                 profile_name,
                 action,
                 language,
-                prompt_extra=prompt_extra
+                prompt_extra=prompt_extra,
+                user_id=user_id
             )
             
             # Handle "NNN" response (no information available)
@@ -1,9 +1,12 @@
 import platform
 
 from .client import ClientService
+from .genai_registry import GenAIClientRegistry
 from .oci_bucket import BucketService
+from .page_cache import PageCacheService
 from .oci_select_ai import SelectAIService
 from .oci_select_ai_rag import SelectAIRAGService
+from .job_manager import JobManager
 from .oci_document_understanding import DocumentUnderstandingService
 from .oci_speech import SpeechService
 from .oci_document_multimodal import DocumentMultimodalService
@@ -15,9 +18,12 @@ from .oci_ai_agent import DBMSAIAgentService
 
 __all__ = [
     "ClientService",
+    "GenAIClientRegistry",
     "BucketService",
+    "PageCacheService",
     "SelectAIService",
     "SelectAIRAGService",
+    "JobManager",
     "DocumentUnderstandingService",
     "SpeechService",
     "DocumentMultimodalService",
@@ -3,10 +3,18 @@ from .modules import ModuleService
 from .agent import AgentService
 from .files import FileService
 from .docs import DocService
+from .docs_pipeline import DocPipelineService
+from .emb_cache import EmbeddingCacheService
+from .answer_cache import AnswerCacheService
+from .query_embedding_cache import QueryEmbeddingCache
+from .hybrid_retriever import OracleHybridRetriever
+from .rerank_retriever import RerankRetriever
 from .select_ai import SelectAIService
 from .select_ai_rag import SelectAIRAGService
 from .dbms_ai_agent import DBMSAIAgentService
 from .quiz import QuizService
+from .jobs import JobService
+from .async_service import AsyncFileService, AsyncAgentService, AsyncSelectAIService, AsyncDocService
 
 __all__ = [
     "UserService",
@@ -14,8 +22,19 @@ __all__ = [
     "AgentService",
     "FileService",
     "DocService",
+    "DocPipelineService",
+    "EmbeddingCacheService",
+    "AnswerCacheService",
+    "QueryEmbeddingCache",
+    "OracleHybridRetriever",
+    "RerankRetriever",
     "SelectAIService",
     "SelectAIRAGService",
     "DBMSAIAgentService",
-    "QuizService"
+    "QuizService",
+    "JobService",
+    "AsyncFileService",
+    "AsyncAgentService",
+    "AsyncSelectAIService",
+    "AsyncDocService"
 ]
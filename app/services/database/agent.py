@@ -1,6 +1,70 @@
+import logging
+
 import streamlit as st
 import pandas as pd
 from services.database.connection import Connection
+from services.database.answer_cache import AnswerCacheService
+
+logger = logging.getLogger(__name__)
+
+GET_ALL_AGENTS_QUERY = """
+    SELECT 
+        A.AGENT_ID,
+        A.AGENT_MODEL_ID,
+        AM.AGENT_MODEL_NAME,
+        AM.AGENT_MODEL_TYPE,
+        AM.AGENT_MODEL_PROVIDER,
+        A.AGENT_NAME,
+        A.AGENT_DESCRIPTION,
+        A.AGENT_TYPE,
+        A.AGENT_MAX_OUT_TOKENS,
+        A.AGENT_TEMPERATURE,
+        A.AGENT_TOP_P,
+        A.AGENT_TOP_K,
+        A.AGENT_FREQUENCY_PENALTY,
+        A.AGENT_PRESENCE_PENALTY,
+        A.AGENT_VECTOR_WEIGHT,
+        A.AGENT_LEXICAL_WEIGHT,
+        A.AGENT_PROMPT_SYSTEM,
+        A.AGENT_PROMPT_MESSAGE,
+        A.AGENT_DATE,
+        A.AGENT_STATE,
+        AU1.USER_ID,
+        U1.USER_GROUP_ID,
+        AU2.OWNER,
+        AU2.USER_ID AS USER_ID_OWNER,                
+        U2.USER_USERNAME,
+        U2.USER_EMAIL,
+        (
+            SELECT COUNT(1)
+            FROM AGENT_USER FU3
+            WHERE FU3.AGENT_ID = A.AGENT_ID
+            AND FU3.OWNER <> 1
+        ) AS AGENT_USERS                              
+    FROM 
+        AGENTS A
+    LEFT JOIN
+        AGENT_MODELS AM 
+        ON A.AGENT_MODEL_ID = AM.AGENT_MODEL_ID
+    JOIN
+        AGENT_USER AU1
+        ON AU1.AGENT_ID = A.AGENT_ID
+        AND AU1.USER_ID = :user_id
+    JOIN
+        USERS U1
+        ON U1.USER_ID = AU1.USER_ID
+    JOIN 
+        AGENT_USER AU2 
+        ON AU2.AGENT_ID = A.AGENT_ID
+        AND AU2.OWNER = 1
+    JOIN
+        USERS U2
+        ON U2.USER_ID = AU2.USER_ID
+    WHERE 
+        A.AGENT_STATE <> 0
+    ORDER BY 
+        A.AGENT_ID DESC
+"""
 
 class AgentService:
     """
@@ -40,63 +104,7 @@ class AgentService:
         Returns:
             pd.DataFrame: List of agents assigned to user_id with model details.
         """
-        query = f"""
-            SELECT 
-                A.AGENT_ID,
-                A.AGENT_MODEL_ID,
-                AM.AGENT_MODEL_NAME,
-                AM.AGENT_MODEL_TYPE,
-                AM.AGENT_MODEL_PROVIDER,
-                A.AGENT_NAME,
-                A.AGENT_DESCRIPTION,
-                A.AGENT_TYPE,
-                A.AGENT_MAX_OUT_TOKENS,
-                A.AGENT_TEMPERATURE,
-                A.AGENT_TOP_P,
-                A.AGENT_TOP_K,
-                A.AGENT_FREQUENCY_PENALTY,
-                A.AGENT_PRESENCE_PENALTY,
-                A.AGENT_PROMPT_SYSTEM,
-                A.AGENT_PROMPT_MESSAGE,
-                A.AGENT_DATE,
-                A.AGENT_STATE,
-                AU1.USER_ID,
-                U1.USER_GROUP_ID,
-                AU2.OWNER,
-                AU2.USER_ID AS USER_ID_OWNER,                
-                U2.USER_USERNAME,
-                U2.USER_EMAIL,
-                (
-                    SELECT COUNT(1)
-                    FROM AGENT_USER FU3
-                    WHERE FU3.AGENT_ID = A.AGENT_ID
-                    AND FU3.OWNER <> 1
-                ) AS AGENT_USERS                              
-            FROM 
-                AGENTS A
-            LEFT JOIN
-                AGENT_MODELS AM 
-                ON A.AGENT_MODEL_ID = AM.AGENT_MODEL_ID
-            JOIN
-                AGENT_USER AU1
-                ON AU1.AGENT_ID = A.AGENT_ID
-                AND AU1.USER_ID = {user_id}
-            JOIN
-                USERS U1
-                ON U1.USER_ID = AU1.USER_ID
-            JOIN 
-                AGENT_USER AU2 
-                ON AU2.AGENT_ID = A.AGENT_ID
-                AND AU2.OWNER = 1
-            JOIN
-                USERS U2
-                ON U2.USER_ID = AU2.USER_ID
-            WHERE 
-                A.AGENT_STATE <> 0
-            ORDER BY 
-                A.AGENT_ID DESC
-        """
-        return pd.read_sql(query, con=_self.conn)
+        return pd.read_sql(GET_ALL_AGENTS_QUERY, con=_self.conn, params={"user_id": user_id})
 
     def copy_agent_to_admin(self, user_id):
         """
@@ -213,7 +221,9 @@ class AgentService:
             agent_presence_penalty,
             agent_prompt_system,
             agent_prompt_message,
-            user_id
+            user_id,
+            agent_vector_weight=1.0,
+            agent_lexical_weight=1.0
         ):
         """
         Inserts a new agent into the database. If agent name already exists, aborts.
@@ -232,17 +242,19 @@ class AgentService:
             agent_prompt_system (str): System prompt.
             agent_prompt_message (str): Message prompt.
             user_id (int): The user ID who owns this agent.
+            agent_vector_weight (float): Vector search weight of hybrid retrieval (0 disables it).
+            agent_lexical_weight (float): Lexical search weight of hybrid retrieval (0 disables it).
 
         Returns:
             str: A message indicating the result of the operation.
         """
 
         # Primero validar si ya existe un agente con el mismo nombre
-        query = f"""
+        query = """
             SELECT 1 FROM AGENTS
-            WHERE AGENT_NAME = '{agent_name}'
+            WHERE AGENT_NAME = :agent_name
         """
-        df = pd.read_sql(query, con=self.conn)
+        df = pd.read_sql(query, con=self.conn, params={"agent_name": agent_name})
 
         if not df.empty:
             raise ValueError(f"Agent '{agent_name}' already exists. Please choose a different name.")
@@ -250,7 +262,7 @@ class AgentService:
         # Insertamos el nuevo agente
         with self.conn.cursor() as cur:
             agent_id_var = cur.var(int)
-            cur.execute(f"""
+            cur.execute("""
                 INSERT INTO AGENTS (
                     AGENT_MODEL_ID,
                     AGENT_NAME,
@@ -262,23 +274,39 @@ class AgentService:
                     AGENT_TOP_K,
                     AGENT_FREQUENCY_PENALTY,
                     AGENT_PRESENCE_PENALTY,
+                    AGENT_VECTOR_WEIGHT,
+                    AGENT_LEXICAL_WEIGHT,
                     AGENT_PROMPT_SYSTEM,
                     AGENT_PROMPT_MESSAGE
                 ) VALUES (
-                    {agent_model_id},
-                    '{agent_name}',
-                    '{agent_description}',
-                    '{agent_type}',
-                    {agent_max_out_tokens},
-                    {agent_temperature},
-                    {agent_top_p},
-                    {agent_top_k},
-                    {agent_frequency_penalty},
-                    {agent_presence_penalty},
+                    :agent_model_id,
+                    :agent_name,
+                    :agent_description,
+                    :agent_type,
+                    :agent_max_out_tokens,
+                    :agent_temperature,
+                    :agent_top_p,
+                    :agent_top_k,
+                    :agent_frequency_penalty,
+                    :agent_presence_penalty,
+                    :agent_vector_weight,
+                    :agent_lexical_weight,
                     :agent_prompt_system,
                     :agent_prompt_message
                 ) RETURNING AGENT_ID INTO :agent_id
             """, {
+                "agent_model_id": agent_model_id,
+                "agent_name": agent_name,
+                "agent_description": agent_description,
+                "agent_type": agent_type,
+                "agent_max_out_tokens": agent_max_out_tokens,
+                "agent_temperature": agent_temperature,
+                "agent_top_p": agent_top_p,
+                "agent_top_k": agent_top_k,
+                "agent_frequency_penalty": agent_frequency_penalty,
+                "agent_presence_penalty": agent_presence_penalty,
+                "agent_vector_weight": agent_vector_weight,
+                "agent_lexical_weight": agent_lexical_weight,
                 "agent_prompt_system": agent_prompt_system,
                 "agent_prompt_message": agent_prompt_message,
                 "agent_id": agent_id_var
@@ -289,10 +317,10 @@ class AgentService:
 
         # Insertamos la relación AGENT_USER
         with self.conn.cursor() as cur:
-            cur.execute(f"""
+            cur.execute("""
                 INSERT INTO AGENT_USER (AGENT_ID, USER_ID)
-                VALUES ({agent_id}, {user_id})
-            """)
+                VALUES (:agent_id, :user_id)
+            """, {"agent_id": agent_id, "user_id": user_id})
         self.conn.commit()
 
         return f"Agent '{agent_name}' has been created successfully.", agent_id
@@ -311,7 +339,9 @@ class AgentService:
             agent_presence_penalty,
             agent_prompt_system,
             agent_prompt_message,
-            state
+            state,
+            agent_vector_weight=1.0,
+            agent_lexical_weight=1.0
         ):
         """
         Updates agent information in the database.
@@ -327,12 +357,14 @@ class AgentService:
             agent_frequency_penalty (float): Updated frequency penalty.
             agent_presence_penalty (float): Updated presence penalty.
             state (int): Updated agent state.
+            agent_vector_weight (float): Updated vector search weight of hybrid retrieval.
+            agent_lexical_weight (float): Updated lexical search weight of hybrid retrieval.
 
         Returns:
             str: A message indicating success.
         """
         with self.conn.cursor() as cur:
-            cur.execute(f"""
+            cur.execute("""
                 UPDATE AGENTS SET 
                     AGENT_MODEL_ID          = :agent_model_id,
                     AGENT_NAME              = :agent_name,
@@ -343,6 +375,8 @@ class AgentService:
                     AGENT_TOP_K             = :agent_top_k,
                     AGENT_FREQUENCY_PENALTY = :agent_frequency_penalty,
                     AGENT_PRESENCE_PENALTY  = :agent_presence_penalty,
+                    AGENT_VECTOR_WEIGHT     = :agent_vector_weight,
+                    AGENT_LEXICAL_WEIGHT    = :agent_lexical_weight,
                     AGENT_PROMPT_SYSTEM     = :agent_prompt_system,
                     AGENT_PROMPT_MESSAGE    = :agent_prompt_message,
                     AGENT_STATE             = :state
@@ -357,12 +391,21 @@ class AgentService:
                 "agent_top_k": agent_top_k,
                 "agent_frequency_penalty": agent_frequency_penalty,
                 "agent_presence_penalty": agent_presence_penalty,
+                "agent_vector_weight": agent_vector_weight,
+                "agent_lexical_weight": agent_lexical_weight,
                 "agent_prompt_system": agent_prompt_system,
                 "agent_prompt_message": agent_prompt_message,
                 "state": state,
                 "agent_id": agent_id
             })
         self.conn.commit()
+
+        # Las respuestas cacheadas se generaron con el prompt/modelo anterior
+        if AnswerCacheService.is_enabled():
+            try:
+                AnswerCacheService().invalidate_agent(agent_id)
+            except Exception as e:
+                logger.warning(f"⚠️ Answer cache not invalidated: {e}")
         return f"Agent '{agent_name}' has been updated successfully."
 
     def update_agent_user(self, agent_id, user_ids):
@@ -393,7 +436,7 @@ class AgentService:
         Returns:
             pd.DataFrame: Shared AGENT_USER records (excluding agents belonging to user_id).
         """
-        query = f"""
+        query = """
             SELECT 
                 FU.AGENT_USER_ID,
                 FU.AGENT_ID,
@@ -416,10 +459,10 @@ class AgentService:
             JOIN USER_GROUP UG
                 ON U.USER_GROUP_ID = UG.USER_GROUP_ID
             WHERE
-                FU.USER_ID <> {user_id}
+                FU.USER_ID <> :user_id
                 AND FU.OWNER <> 1
                 AND F.AGENT_STATE <> 0
             ORDER BY
                 FU.AGENT_USER_ID
         """
-        return pd.read_sql(query, con=_self.conn)
\ No newline at end of file
+        return pd.read_sql(query, con=_self.conn, params={"user_id": user_id})
\ No newline at end of file
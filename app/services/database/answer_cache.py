@@ -0,0 +1,203 @@
+import os
+import json
+import threading
+
+from services.database.connection import Connection, output_type_handler
+from services.database import vector_codec
+
+
+class AnswerCacheService:
+    """
+    Semantic answer cache of the RAG chat (ANSWER_CACHE table), shared by every worker.
+
+    An entry is reused when the agent and the set of files match, the files still have
+    the same FILE_VERSION and the cosine similarity between the question embeddings is
+    at least ``CON_GEN_AI_ANSWER_CACHE_THRESHOLD``.
+    """
+    _stats = {"hits": 0, "misses": 0, "saved_tokens": 0}
+    _stats_lock = threading.Lock()
+
+    def __init__(self):
+        """
+        Keep only the singleton connection instance.
+        """
+        self.conn_instance = Connection()
+        self.threshold     = float(os.getenv('CON_GEN_AI_ANSWER_CACHE_THRESHOLD', 0.95))
+
+    @staticmethod
+    def is_enabled():
+        return os.getenv('CON_GEN_AI_ANSWER_CACHE', 'True').lower() in ('true', '1', 'yes')
+
+    @staticmethod
+    def get_files_key(file_ids):
+        """
+        Canonical key of a set of files ("3,7,12").
+        """
+        return ",".join(str(file_id) for file_id in sorted({int(file_id) for file_id in file_ids}))
+
+    def get_files_version(self, file_ids):
+        """
+        Current FILE_VERSION of each file as "3:1,7:2,12:1"; a re-ingested file changes it.
+        """
+        file_ids = sorted({int(file_id) for file_id in file_ids})
+        if not file_ids:
+            return ""
+        binds = {f"f_{i}": file_id for i, file_id in enumerate(file_ids)}
+        with self.conn_instance.acquire() as conn:
+            with conn.cursor() as cur:
+                cur.execute(f"""
+                    SELECT FILE_ID, FILE_VERSION
+                    FROM FILES
+                    WHERE FILE_ID IN ({','.join(':' + name for name in binds)})
+                    ORDER BY FILE_ID
+                """, binds)
+                return ",".join(f"{file_id}:{version}" for file_id, version in cur)
+
+    def _count(self, hit, saved_tokens=0):
+        with self._stats_lock:
+            self._stats["hits" if hit else "misses"] += 1
+            self._stats["saved_tokens"] += saved_tokens
+
+    def get(self, agent_id, file_ids, embedding, files_version=None):
+        """
+        Looks up the closest cached answer.
+
+        Args:
+            agent_id (int): The agent ID.
+            file_ids (list[int]): Files of the chat.
+            embedding (list[float]): Question embedding.
+            files_version (str, optional): Result of get_files_version (queried when omitted).
+
+        Returns:
+            dict | None: answer, context (list of {page_content, metadata}), answer_tokens
+            and similarity, or None on a miss.
+        """
+        files_version = files_version if files_version is not None else self.get_files_version(file_ids)
+        with self.conn_instance.acquire() as conn:
+            with conn.cursor() as cur:
+                cur.outputtypehandler = output_type_handler
+                cur.execute("""
+                    SELECT
+                        ANSWER_CACHE_ID,
+                        ANSWER,
+                        CONTEXT,
+                        ANSWER_TOKENS,
+                        1 - VECTOR_DISTANCE(EMBEDDING, :embedding, COSINE) AS SIMILARITY
+                    FROM ANSWER_CACHE
+                    WHERE AGENT_ID = :agent_id
+                    AND FILES_KEY = :files_key
+                    AND FILES_VERSION = :files_version
+                    ORDER BY VECTOR_DISTANCE(EMBEDDING, :embedding, COSINE)
+                    FETCH FIRST 1 ROWS ONLY
+                """, {
+                    "embedding": vector_codec.encode(embedding, "float32"),
+                    "agent_id": int(agent_id),
+                    "files_key": self.get_files_key(file_ids),
+                    "files_version": files_version
+                })
+                row = cur.fetchone()
+
+                if row is None or row[4] < self.threshold:
+                    self._count(False)
+                    return None
+
+                answer_cache_id, answer, context, answer_tokens, similarity = row
+                cur.execute("""
+                    UPDATE ANSWER_CACHE SET
+                        HITS          = HITS + 1,
+                        LAST_HIT_DATE = SYSTIMESTAMP
+                    WHERE ANSWER_CACHE_ID = :answer_cache_id
+                """, {"answer_cache_id": answer_cache_id})
+
+        self._count(True, int(answer_tokens))
+        return {
+            "answer": answer,
+            "context": json.loads(context) if context else [],
+            "answer_tokens": int(answer_tokens),
+            "similarity": float(similarity)
+        }
+
+    def put(self, agent_id, file_ids, files_version, question, embedding, answer, context=None, answer_tokens=0):
+        """
+        Stores an answer.
+
+        Args:
+            agent_id (int): The agent ID.
+            file_ids (list[int]): Files of the chat.
+            files_version (str): Result of get_files_version when the answer was generated.
+            question (str): The question.
+            embedding (list[float]): Question embedding.
+            answer (str): The generated answer.
+            context (list[Document], optional): Retrieved documents (to show the sources on a hit).
+            answer_tokens (int): Tokens of the answer (reported as saved on each hit).
+        """
+        context = [
+            {"page_content": doc.page_content, "metadata": doc.metadata} for doc in (context or [])
+        ]
+        with self.conn_instance.acquire() as conn:
+            with conn.cursor() as cur:
+                cur.execute("""
+                    INSERT INTO ANSWER_CACHE (
+                        AGENT_ID, FILES_KEY, FILES_VERSION, QUESTION, EMBEDDING, ANSWER, CONTEXT, ANSWER_TOKENS
+                    ) VALUES (
+                        :agent_id, :files_key, :files_version, :question, :embedding, :answer, :context, :answer_tokens
+                    )
+                """, {
+                    "agent_id": int(agent_id),
+                    "files_key": self.get_files_key(file_ids),
+                    "files_version": files_version,
+                    "question": question[:4000],
+                    "embedding": vector_codec.encode(embedding, "float32"),
+                    "answer": answer,
+                    "context": json.dumps(context, default=str),
+                    "answer_tokens": int(answer_tokens)
+                })
+            conn.commit()
+
+    def invalidate(self, file_id):
+        """
+        Deletes the cached answers that used a file (called when the file is re-ingested).
+        """
+        with self.conn_instance.acquire() as conn:
+            with conn.cursor() as cur:
+                cur.execute("""
+                    DELETE FROM ANSWER_CACHE
+                    WHERE INSTR(',' || FILES_KEY || ',', ',' || :file_id || ',') > 0
+                """, {"file_id": str(int(file_id))})
+            conn.commit()
+
+    def invalidate_agent(self, agent_id):
+        """
+        Deletes the cached answers of an agent (called when its prompt, model or
+        generation settings change).
+        """
+        with self.conn_instance.acquire() as conn:
+            with conn.cursor() as cur:
+                cur.execute("DELETE FROM ANSWER_CACHE WHERE AGENT_ID = :agent_id", {"agent_id": int(agent_id)})
+            conn.commit()
+
+    def get_stats(self):
+        """
+        Hit rate and saved tokens: ``process`` counts lookups of this worker, ``total``
+        aggregates the hits recorded in ANSWER_CACHE by every worker.
+
+        Returns:
+            dict: process (hits, misses, saved_tokens, hit_rate) and total (entries, hits, saved_tokens).
+        """
+        with self._stats_lock:
+            process = dict(self._stats)
+        lookups = process["hits"] + process["misses"]
+        process["hit_rate"] = process["hits"] / lookups if lookups else 0.0
+
+        with self.conn_instance.acquire() as conn:
+            with conn.cursor() as cur:
+                cur.execute("""
+                    SELECT COUNT(*), NVL(SUM(HITS), 0), NVL(SUM(HITS * ANSWER_TOKENS), 0)
+                    FROM ANSWER_CACHE
+                """)
+                entries, hits, saved_tokens = cur.fetchone()
+
+        return {
+            "process": process,
+            "total": {"entries": int(entries), "hits": int(hits), "saved_tokens": int(saved_tokens)}
+        }
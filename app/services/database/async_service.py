@@ -0,0 +1,172 @@
+import oracledb
+import pandas as pd
+
+from services.database.connection import output_type_handler
+from services.database.connection_async import AsyncConnection
+from services.database.files import GET_ALL_FILES_QUERY
+from services.database.agent import GET_ALL_AGENTS_QUERY
+from services.database.select_ai import GET_CHAT_QUERY, SelectAIService
+from services.database.docs import DocService
+
+
+async def _read_sql(conn, query, params=None):
+    """
+    Async equivalent of pd.read_sql for the python-oracledb asyncio API.
+
+    Returns:
+        pd.DataFrame: Query result with the column names reported by the cursor.
+    """
+    cursor = conn.cursor()
+    try:
+        cursor.outputtypehandler = output_type_handler
+        await cursor.execute(query, params or {})
+        rows = await cursor.fetchall()
+        columns = [col[0] for col in cursor.description]
+        return pd.DataFrame(rows, columns=columns)
+    finally:
+        cursor.close()
+
+
+class AsyncFileService:
+    """
+    Async twin of FileService built on the asyncio connection pool.
+    """
+
+    def __init__(self):
+        """
+        Initializes the service with the shared async connection pool.
+        """
+        self.conn_instance = AsyncConnection()
+
+    async def get_all_files(self, user_id):
+        """
+        Awaitable version of FileService.get_all_files.
+
+        Args:
+            user_id (int): The ID of the user.
+
+        Returns:
+            pd.DataFrame: A DataFrame containing file information.
+        """
+        async with self.conn_instance.acquire() as conn:
+            return await _read_sql(conn, GET_ALL_FILES_QUERY, {"user_id": user_id})
+
+
+class AsyncAgentService:
+    """
+    Async twin of AgentService built on the asyncio connection pool.
+    """
+
+    def __init__(self):
+        """
+        Initializes the service with the shared async connection pool.
+        """
+        self.conn_instance = AsyncConnection()
+
+    async def get_all_agents(self, user_id):
+        """
+        Awaitable version of AgentService.get_all_agents.
+
+        Args:
+            user_id (int): The ID of the user.
+
+        Returns:
+            pd.DataFrame: List of agents assigned to user_id with model details.
+        """
+        async with self.conn_instance.acquire() as conn:
+            return await _read_sql(conn, GET_ALL_AGENTS_QUERY, {"user_id": user_id})
+
+
+class AsyncSelectAIService:
+    """
+    Async twin of SelectAIService built on the asyncio connection pool.
+    """
+
+    def __init__(self):
+        """
+        Initializes the service with the shared async connection pool.
+        """
+        self.conn_instance = AsyncConnection()
+
+    async def get_chat(
+            self,
+            prompt,
+            profile_name,
+            action,
+            language,
+            prompt_extra=None,
+            user_id=None
+        ):
+        """
+        Awaitable version of SelectAIService.get_chat (shares its response cache).
+
+        Args:
+            prompt (str): The user's message.
+            profile_name (str): The Select AI profile name.
+            action (str): The action to perform.
+            language (str): The response language.
+            prompt_extra (str, optional): Additional instructions for the model.
+            user_id (int, optional): Owner of the profile; adds the schema version to the cache key.
+        """
+        key = SelectAIService._get_cache_key(
+            prompt, profile_name, action, language, prompt_extra,
+            SelectAIService().get_schema_version(user_id)
+        )
+        response = SelectAIService._cache_get(key)
+        if response is not None:
+            return response
+
+        prompt_with_instructions, fallback_sorry, error_prefix = SelectAIService._build_chat_request(
+            prompt,
+            language,
+            prompt_extra
+        )
+
+        async with self.conn_instance.acquire() as conn:
+            cursor = conn.cursor()
+            try:
+                response_var = cursor.var(oracledb.DB_TYPE_CLOB)
+                await cursor.execute(
+                    GET_CHAT_QUERY,
+                    prompt_text=prompt_with_instructions,
+                    profile_name=profile_name,
+                    action=action,
+                    error_prefix=error_prefix,
+                    out_response=response_var
+                )
+                response = response_var.getvalue()
+                if hasattr(response, "read"):
+                    response = await response.read()
+            finally:
+                cursor.close()
+
+        response = SelectAIService._localize_response(response, fallback_sorry)
+        SelectAIService._cache_put(key, response, fallback_sorry, error_prefix)
+        return response
+
+
+class AsyncDocService:
+    """
+    Async twin of DocService for vector search.
+    """
+
+    def __init__(self):
+        """
+        Initializes the service with the shared async connection pool.
+        """
+        self.conn_instance = AsyncConnection()
+        self.doc_service = DocService()
+
+    async def similarity_search(self, query, k=4, **kwargs):
+        """
+        Awaitable version of OracleVS.similarity_search over the DOCS table.
+
+        Args:
+            query (str): The text to search for.
+            k (int): Number of chunks to return.
+
+        Returns:
+            list: LangChain Documents ordered by distance.
+        """
+        vector_store = self.doc_service.get_vector_store(async_client=self.conn_instance)
+        return await vector_store.asimilarity_search(query, k=k, **kwargs)
@@ -1,33 +1,137 @@
 import os
+import time
+import threading
+from contextlib import contextmanager
+
 import ads
 import oracledb
+import pandas as pd
 from dotenv import load_dotenv
 
 load_dotenv()
 
+# Identifica las sesiones de la app en V$SESSION / V$SQLAREA
+MODULE_NAME = "ORACLE_AI_ACCELERATOR"
+
+def output_type_handler(cursor, metadata):
+    """
+    Fetch CLOB/BLOB columns as str/bytes, so rows need no extra LOB round-trip.
+    Assign it to ``cursor.outputtypehandler`` (works for sync and async cursors).
+    """
+    if metadata.type_code is oracledb.DB_TYPE_CLOB:
+        return cursor.var(oracledb.DB_TYPE_LONG, arraysize=cursor.arraysize)
+    if metadata.type_code is oracledb.DB_TYPE_BLOB:
+        return cursor.var(oracledb.DB_TYPE_LONG_RAW, arraysize=cursor.arraysize)
+
+
+class _Lease:
+    """
+    Pooled connection held by a single thread.
+
+    The connection goes back to the pool when the lease is released explicitly
+    or, as a safety net, when the owning thread ends and its thread-local
+    storage is collected (Streamlit runs every script run in its own thread).
+    """
+    def __init__(self, pool, conn):
+        self.pool = pool
+        self.conn = conn
+
+    def release(self):
+        if self.conn is None:
+            return
+        conn, self.conn = self.conn, None
+        try:
+            self.pool.release(conn)
+        except oracledb.Error:
+            pass
+
+    def __del__(self):
+        self.release()
+
+
 class Connection:
     """
-    Singleton class for managing a reusable Oracle database connection.
+    Singleton class for managing reusable Oracle database connections.
 
-    Ensures only one instance of the connection is created and reused throughout the application.
+    Two modes are available:
+      - Pool (default): a process-wide ``oracledb.ConnectionPool`` is created and every
+        thread (Streamlit session run, worker, ...) leases its own connection, so a slow
+        statement in one session no longer blocks the rest of the worker.
+      - Standalone (``CON_ADB_POOL_ENABLED=False``): one connection shared by the process.
+
+    Both modes only ping connections that have been idle longer than
+    ``CON_ADB_POOL_PING_INTERVAL`` seconds instead of pinging on every call.
+
+    Connection scopes in pool mode:
+      - ``acquire()``: the connection is released when the block ends. Use it for every
+        unit of work that runs in a long-lived thread (executors, background jobs).
+      - ``get_connection()`` (the ``conn`` property of the services): outside an
+        ``acquire()`` block it pins a connection to the calling thread until the thread
+        ends. Only the short-lived Streamlit script threads may rely on that; executor
+        threads call ``require_scope()`` so an unscoped call fails instead of holding a
+        pooled connection for the life of the worker.
     """
     _instance = None
+    _lock = threading.Lock()
 
     def __new__(cls):
         if cls._instance is None:
-            cls._instance = super(Connection, cls).__new__(cls)
-            # Persist configuration to allow seamless reconnection
-            cls._instance._db_config = {
-                "user": os.getenv('CON_ADB_DEV_USER_NAME'),
-                "password": os.getenv('CON_ADB_DEV_PASSWORD'),
-                "dsn": os.getenv('CON_ADB_DEV_SERVICE_NAME'),
-                "config_dir": os.getenv('CON_ADB_WALLET_LOCATION'),
-                "wallet_location": os.getenv('CON_ADB_WALLET_LOCATION'),
-                "wallet_password": os.getenv('CON_ADB_WALLET_PASSWORD')
-            }
-            cls._instance.conn = cls._instance._create_connection()
+            with cls._lock:
+                if cls._instance is None:
+                    instance = super(Connection, cls).__new__(cls)
+                    # Persist configuration to allow seamless reconnection
+                    instance._db_config = {
+                        "user": os.getenv('CON_ADB_DEV_USER_NAME'),
+                        "password": os.getenv('CON_ADB_DEV_PASSWORD'),
+                        "dsn": os.getenv('CON_ADB_DEV_SERVICE_NAME'),
+                        "config_dir": os.getenv('CON_ADB_WALLET_LOCATION'),
+                        "wallet_location": os.getenv('CON_ADB_WALLET_LOCATION'),
+                        "wallet_password": os.getenv('CON_ADB_WALLET_PASSWORD')
+                    }
+                    instance._pool_config = {
+                        "enabled": os.getenv('CON_ADB_POOL_ENABLED', 'True').lower() in ('true', '1', 'yes'),
+                        "min": int(os.getenv('CON_ADB_POOL_MIN', 1)),
+                        "max": int(os.getenv('CON_ADB_POOL_MAX', 8)),
+                        "increment": int(os.getenv('CON_ADB_POOL_INCREMENT', 1)),
+                        "ping_interval": int(os.getenv('CON_ADB_POOL_PING_INTERVAL', 60)),
+                        "timeout": int(os.getenv('CON_ADB_POOL_TIMEOUT', 300)),
+                        "wait_timeout": int(os.getenv('CON_ADB_POOL_WAIT_TIMEOUT', 30000)),
+                        "stmtcachesize": int(os.getenv('CON_ADB_STMT_CACHE_SIZE', 50))
+                    }
+                    instance._local = threading.local()
+                    instance._last_used = 0.0
+                    instance.pool = None
+                    instance.conn = None
+                    if instance._pool_config["enabled"]:
+                        instance.pool = instance._create_pool()
+                    else:
+                        instance.conn = instance._create_connection()
+                    cls._instance = instance
         return cls._instance
 
+    def _create_pool(self):
+        """
+        Create the session pool using the stored configuration.
+        The pool pings a connection on acquire only when it was idle for longer
+        than ``ping_interval`` seconds.
+        """
+        return oracledb.create_pool(
+            user=self._db_config["user"],
+            password=self._db_config["password"],
+            dsn=self._db_config["dsn"],
+            config_dir=self._db_config["config_dir"],
+            wallet_location=self._db_config["wallet_location"],
+            wallet_password=self._db_config["wallet_password"],
+            min=self._pool_config["min"],
+            max=self._pool_config["max"],
+            increment=self._pool_config["increment"],
+            ping_interval=self._pool_config["ping_interval"],
+            timeout=self._pool_config["timeout"],
+            wait_timeout=self._pool_config["wait_timeout"],
+            stmtcachesize=self._pool_config["stmtcachesize"],
+            getmode=oracledb.POOL_GETMODE_TIMEDWAIT
+        )
+
     def _create_connection(self):
         """
         Create a new database connection using the stored configuration.
@@ -38,44 +142,171 @@ class Connection:
             dsn=self._db_config["dsn"],
             config_dir=self._db_config["config_dir"],
             wallet_location=self._db_config["wallet_location"],
-            wallet_password=self._db_config["wallet_password"]
+            wallet_password=self._db_config["wallet_password"],
+            stmtcachesize=self._pool_config["stmtcachesize"]
         )
         conn.autocommit = True
+        conn.module = MODULE_NAME
+        return conn
+
+    def _acquire(self):
+        """
+        Acquire a connection from the pool with the same session defaults
+        as the standalone connection.
+        """
+        conn = self.pool.acquire()
+        conn.autocommit = True
+        conn.module = MODULE_NAME
         return conn
 
     def _ensure_connection(self):
         """
-        Ensure the connection is alive; recreate it if it was dropped by the
-        network/database (e.g., DPY-4011, timeouts, etc.).
+        Ensure the standalone connection is alive; recreate it if it was dropped by the
+        network/database (e.g., DPY-4011, timeouts, etc.). The ping is only issued
+        when the connection has been idle longer than the configured interval.
         """
         if self.conn is None:
             self.conn = self._create_connection()
-            return
-        try:
-            # Fast health check; raises if not connected
-            self.conn.ping()
-        except oracledb.Error:
-            # Recreate a fresh connection on any ping failure
+        elif time.monotonic() - self._last_used > self._pool_config["ping_interval"]:
             try:
-                self.conn.close()
-            except Exception:
-                pass
-            self.conn = self._create_connection()
+                # Fast health check; raises if not connected
+                self.conn.ping()
+            except oracledb.Error:
+                # Recreate a fresh connection on any ping failure
+                try:
+                    self.conn.close()
+                except Exception:
+                    pass
+                self.conn = self._create_connection()
+        self._last_used = time.monotonic()
 
     def get_connection(self):
         """
-        Returns the Oracle database connection instance.
+        Returns the Oracle database connection for the current thread.
+
+        Inside an ``acquire()`` block this is the connection of that block. Otherwise,
+        in pool mode, the first call leases a pooled connection that stays pinned to the
+        thread until the thread ends; threads marked with ``require_scope()`` get a
+        RuntimeError instead.
 
         Returns:
             oracledb.Connection: The database connection object.
+
+        Raises:
+            RuntimeError: Unscoped call from a thread marked with ``require_scope()``.
+        """
+        if self.pool is None:
+            self._ensure_connection()
+            return self.conn
+
+        lease = getattr(self._local, "lease", None)
+        if lease is None or lease.conn is None:
+            if getattr(self._local, "scope_required", False):
+                raise RuntimeError(
+                    "get_connection() outside Connection().acquire() in a worker thread would pin a pooled connection"
+                )
+            lease = _Lease(self.pool, self._acquire())
+            self._local.lease = lease
+        return lease.conn
+
+    def require_scope(self):
+        """
+        Marks the current thread as a long-lived worker: ``get_connection()`` only works
+        inside an ``acquire()`` block. Meant as a ``ThreadPoolExecutor`` initializer.
+        """
+        self._local.scope_required = True
+
+    @contextmanager
+    def acquire(self):
+        """
+        Context manager that scopes a pooled connection to a block of work
+        (one request, one job, one worker task) and releases it on exit.
+        Nested scopes in the same thread reuse the outer connection.
+
+        Yields:
+            oracledb.Connection: The database connection object.
+        """
+        if self.pool is None:
+            yield self.get_connection()
+            return
+
+        lease = getattr(self._local, "lease", None)
+        if lease is not None and lease.conn is not None:
+            yield lease.conn
+            return
+
+        lease = _Lease(self.pool, self._acquire())
+        self._local.lease = lease
+        try:
+            yield lease.conn
+        finally:
+            self._local.lease = None
+            lease.release()
+
+    def get_pool_stats(self):
         """
-        self._ensure_connection()
-        return self.conn
+        Returns basic pool usage figures (empty dict in standalone mode).
+        """
+        if self.pool is None:
+            return {}
+        return {
+            "min": self.pool.min,
+            "max": self.pool.max,
+            "opened": self.pool.opened,
+            "busy": self.pool.busy
+        }
+
+    def get_statement_stats(self, limit=50):
+        """
+        Parse vs. execution counters per statement issued by the app (``MODULE_NAME``),
+        used to confirm that bind variables and the statement cache keep hard/soft
+        parses well below executions under load.
+
+        Requires ``SELECT ON V_$SQLAREA`` (granted by setup/c.GRANT_USER.sql); returns an
+        empty DataFrame when the view is not accessible.
+
+        Args:
+            limit (int): Maximum number of statements, most executed first.
+
+        Returns:
+            pd.DataFrame: SQL_ID, PARSE_CALLS, EXECUTIONS, LOADS, PARSE_RATIO and SQL_TEXT.
+        """
+        query = """
+            SELECT
+                SQL_ID,
+                PARSE_CALLS,
+                EXECUTIONS,
+                LOADS,
+                ROUND(PARSE_CALLS / NULLIF(EXECUTIONS, 0), 4) AS PARSE_RATIO,
+                SUBSTR(SQL_TEXT, 1, 200) AS SQL_TEXT
+            FROM V$SQLAREA
+            WHERE MODULE = :module_name
+            ORDER BY EXECUTIONS DESC
+            FETCH FIRST :limit ROWS ONLY
+        """
+        try:
+            return pd.read_sql(
+                query,
+                con=self.get_connection(),
+                params={"module_name": MODULE_NAME, "limit": int(limit)}
+            )
+        except Exception as e:
+            # ORA-00942: sin privilegio sobre V$SQLAREA
+            print(f"Statement stats not available: {e}")
+            return pd.DataFrame(columns=["SQL_ID", "PARSE_CALLS", "EXECUTIONS", "LOADS", "PARSE_RATIO", "SQL_TEXT"])
 
     def close_connection(self):
         """
-        Closes the Oracle database connection if it is open.
+        Closes the standalone connection, or releases the connection leased
+        by the current thread back to the pool.
         """
+        if self.pool is not None:
+            lease = getattr(self._local, "lease", None)
+            if lease is not None:
+                self._local.lease = None
+                lease.release()
+            return
+
         if self.conn is not None:
             try:
                 self.conn.close()
@@ -96,6 +327,6 @@ class Connection:
 
     def __exit__(self, exc_type, exc_value, traceback):
         """
-        Ensures the connection is closed when exiting the context.
+        Ensures the connection is closed (or released to the pool) when exiting the context.
         """
-        self.close_connection()
\ No newline at end of file
+        self.close_connection()
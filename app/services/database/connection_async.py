@@ -0,0 +1,106 @@
+import os
+import asyncio
+import threading
+from contextlib import asynccontextmanager
+
+import oracledb
+from dotenv import load_dotenv
+
+from services.database.connection import MODULE_NAME
+
+load_dotenv()
+
+class AsyncConnection:
+    """
+    Singleton class for managing the asyncio Oracle connection pool (``oracledb.create_pool_async``).
+
+    Streamlit runs every script in a plain thread and every ``asyncio.run`` creates a new
+    event loop, while an async pool is bound to the loop that created it. The pool therefore
+    lives on a dedicated background event loop and synchronous code submits coroutines to
+    it with ``run`` / ``gather``.
+    """
+    _instance = None
+    _lock = threading.Lock()
+
+    def __new__(cls):
+        if cls._instance is None:
+            with cls._lock:
+                if cls._instance is None:
+                    instance = super(AsyncConnection, cls).__new__(cls)
+                    instance._db_config = {
+                        "user": os.getenv('CON_ADB_DEV_USER_NAME'),
+                        "password": os.getenv('CON_ADB_DEV_PASSWORD'),
+                        "dsn": os.getenv('CON_ADB_DEV_SERVICE_NAME'),
+                        "config_dir": os.getenv('CON_ADB_WALLET_LOCATION'),
+                        "wallet_location": os.getenv('CON_ADB_WALLET_LOCATION'),
+                        "wallet_password": os.getenv('CON_ADB_WALLET_PASSWORD')
+                    }
+                    instance._loop = asyncio.new_event_loop()
+                    instance._thread = threading.Thread(
+                        target=instance._loop.run_forever,
+                        name="AsyncConnection.loop",
+                        daemon=True
+                    )
+                    instance._thread.start()
+                    instance.pool = instance.run(instance._create_pool())
+                    cls._instance = instance
+        return cls._instance
+
+    async def _create_pool(self):
+        """
+        Create the async session pool on the background loop, sized like the sync pool.
+        """
+        return oracledb.create_pool_async(
+            user=self._db_config["user"],
+            password=self._db_config["password"],
+            dsn=self._db_config["dsn"],
+            config_dir=self._db_config["config_dir"],
+            wallet_location=self._db_config["wallet_location"],
+            wallet_password=self._db_config["wallet_password"],
+            min=int(os.getenv('CON_ADB_POOL_MIN', 1)),
+            max=int(os.getenv('CON_ADB_POOL_MAX', 8)),
+            increment=int(os.getenv('CON_ADB_POOL_INCREMENT', 1)),
+            ping_interval=int(os.getenv('CON_ADB_POOL_PING_INTERVAL', 60)),
+            timeout=int(os.getenv('CON_ADB_POOL_TIMEOUT', 300)),
+            stmtcachesize=int(os.getenv('CON_ADB_STMT_CACHE_SIZE', 50))
+        )
+
+    @asynccontextmanager
+    async def acquire(self):
+        """
+        Async context manager that acquires a pooled connection and releases it on exit.
+
+        Yields:
+            oracledb.AsyncConnection: The database connection object.
+        """
+        conn = await self.pool.acquire()
+        conn.autocommit = True
+        conn.module = MODULE_NAME
+        try:
+            yield conn
+        finally:
+            await self.pool.release(conn)
+
+    def run(self, coro):
+        """
+        Runs a coroutine on the pool's event loop and waits for its result.
+        Safe to call from any (non event loop) thread.
+        """
+        return asyncio.run_coroutine_threadsafe(coro, self._loop).result()
+
+    def gather(self, *coros):
+        """
+        Runs independent coroutines concurrently and returns their results in order.
+        """
+        async def _gather():
+            return await asyncio.gather(*coros)
+        return self.run(_gather())
+
+    def close_pool(self):
+        """
+        Closes the async pool and stops the background event loop.
+        """
+        if self.pool is not None:
+            self.run(self.pool.close())
+            self.pool = None
+        self._loop.call_soon_threadsafe(self._loop.stop)
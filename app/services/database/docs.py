@@ -1,4 +1,5 @@
 import os
+import logging
 from services.database.connection import Connection
 
 #from langchain_community.embeddings.oci_generative_ai import OCIGenAIEmbeddings
@@ -6,6 +7,13 @@ from services.database.connection import Connection
 from langchain_oci import OCIGenAIEmbeddings
 #from langchain_oracledb.vectorstores.oraclevs import OracleVS
 from services.database.oracle_vs import OracleVS
+from services.database.hybrid_retriever import OracleHybridRetriever
+from services.database.rerank_retriever import RerankRetriever
+from services.database.docs_pipeline import DocPipelineService
+from services.database.answer_cache import AnswerCacheService
+from services.database import vector_codec
+
+logger = logging.getLogger(__name__)
 
 class DocService:
     """
@@ -24,44 +32,140 @@ class DocService:
         """Always returns a live connection (auto-reconnect)."""
         return self.conn_instance.get_connection()
     
-    def vector_store(self, file_id):
+    def vector_store(self, file_id, progress=None):
         """
-        Executes a stored procedure to add a document to the vector store.
+        Adds a document to the vector store.
+
+        By default the SP_VECTOR_STORE stored procedure chunks and embeds the file inside
+        the database. With ``CON_GEN_AI_EMB_PIPELINE=python`` the Python pipeline
+        (DocPipelineService) is used instead, which batches the embedding calls and
+        reports progress.
 
         Args:
             file_id (str): The identifier of the file to be stored in the vector store.
+            progress (callable, optional): ``progress(stage, done, total)`` callback
+                (Python pipeline only).
 
         Returns:
             str: Confirmation message indicating the document was stored successfully.
         """
-        
-        query = f"""
+        # Las respuestas cacheadas con la versión anterior del archivo dejan de servir
+        if AnswerCacheService.is_enabled():
+            try:
+                AnswerCacheService().invalidate(file_id)
+            except Exception as e:
+                # Sin ANSWER_CACHE (paso w) la ingesta sigue; la búsqueda en get_chain también lo tolera
+                logger.warning(f"⚠️ Answer cache not invalidated: {e}")
+
+        if os.getenv('CON_GEN_AI_EMB_PIPELINE', 'plsql').lower() == 'python':
+            return DocPipelineService().run(int(file_id), progress)
+
+        query = """
                 BEGIN
-                    SP_VECTOR_STORE('{file_id}');
+                    SP_VECTOR_STORE(:file_id);
                 END;
             """
         conn = self.conn
         with conn.cursor() as cur:
-            cur.execute(query)
+            cur.execute(query, {"file_id": int(file_id)})
         conn.commit()
+        if progress:
+            progress("insert", 1, 1)
         return f"The file was created to the vector store successfully."
-    
-    def get_vector_store(self):
+
+    @staticmethod
+    def get_embeddings():
         """
-        Creates and returns an Oracle Vector Store instance using OCI Generative AI embeddings.
+        Creates the OCI Generative AI embeddings client configured for the DOCS table.
 
         Returns:
-            OracleVS: The vector store instance.
+            OCIGenAIEmbeddings: The embeddings client.
         """
-        embeddings = OCIGenAIEmbeddings(
+        return OCIGenAIEmbeddings(
             model_id         = os.getenv('CON_GEN_AI_EMB_MODEL_ID'),
             service_endpoint = os.getenv('CON_GEN_AI_SERVICE_ENDPOINT'),
             compartment_id   = os.getenv('CON_COMPARTMENT_ID')
         )
+    
+    def get_vector_store(self, async_client=None, filter_mode=None, search_mode=None, target_accuracy=None):
+        """
+        Creates and returns an Oracle Vector Store instance using OCI Generative AI embeddings.
+
+        Args:
+            async_client (AsyncConnection, optional): Async pool used by asimilarity_search.
+                When provided, no synchronous connection is leased.
+            filter_mode (str, optional): "pre" (filter inside the search) or "post" (filter
+                the nearest candidates). Defaults to ``CON_ADB_VS_FILTER_MODE``.
+            search_mode (str, optional): "exact" or "approx" (vector index docs_hnsw_idx).
+                Defaults to ``CON_ADB_VS_SEARCH_MODE``.
+            target_accuracy (int, optional): Target accuracy (%) of approximate searches.
+                Defaults to ``CON_ADB_VS_TARGET_ACCURACY``.
+
+        Returns:
+            OracleVS: The vector store instance.
+        """
+        embeddings = self.get_embeddings()
         
-        conn = self.conn
+        # Sin conexión fija: cada búsqueda usa la del hilo que la ejecuta (ver OracleVS.client)
         return OracleVS(
-            client             = conn,
+            client             = None,
             embedding_function = embeddings,
-            table_name         = 'docs'
+            table_name         = 'docs',
+            async_client       = async_client,
+            filter_mode        = filter_mode or os.getenv('CON_ADB_VS_FILTER_MODE', 'pre'),
+            search_mode        = search_mode or os.getenv('CON_ADB_VS_SEARCH_MODE', 'approx'),
+            target_accuracy    = target_accuracy or int(os.getenv('CON_ADB_VS_TARGET_ACCURACY', 95)),
+            vector_format      = vector_codec.get_vector_format(),
+            distance_strategy  = vector_codec.get_distance()
+        )
+
+    def get_hybrid_retriever(self, k=5, filter=None, vector_weight=1.0, lexical_weight=1.0, lexical_mode=None):
+        """
+        Creates a hybrid (lexical + vector) retriever over DOCS fused with Reciprocal Rank Fusion.
+
+        Args:
+            k (int): Number of documents returned after the fusion.
+            filter (dict, optional): Metadata filter applied to both searches.
+            vector_weight (float): RRF weight of the vector search (0 disables it).
+            lexical_weight (float): RRF weight of the lexical search (0 disables it).
+            lexical_mode (str, optional): "text" (Oracle Text index docs_text_idx) or "bm25"
+                (in-memory BM25 index). Defaults to ``CON_ADB_VS_LEXICAL_MODE``.
+
+        Returns:
+            OracleHybridRetriever: The retriever instance.
+        """
+        return OracleHybridRetriever(
+            vector_store   = self.get_vector_store(),
+            k              = k,
+            filter         = filter,
+            vector_weight  = float(vector_weight),
+            lexical_weight = float(lexical_weight),
+            lexical_mode   = lexical_mode or os.getenv('CON_ADB_VS_LEXICAL_MODE', 'text'),
+            rrf_k          = int(os.getenv('CON_ADB_VS_RRF_K', 60))
+        )
+
+    def get_rerank_retriever(self, filter=None, base_retriever=None, candidates=None, top_n=None, on_timing=None):
+        """
+        Creates a retriever that fetches a wide candidate set and keeps only the best chunks
+        (cosine + term overlap relevance, MMR diversity).
+
+        Args:
+            filter (dict, optional): Metadata filter of the vector search.
+            base_retriever (BaseRetriever, optional): Candidate source (e.g. the hybrid
+                retriever); the vector store is used when omitted.
+            candidates (int, optional): Candidates to rescore. Defaults to ``CON_ADB_VS_RERANK_CANDIDATES``.
+            top_n (int, optional): Chunks passed to the LLM. Defaults to ``CON_ADB_VS_RERANK_TOP_N``.
+            on_timing (callable, optional): ``on_timing(stage, ms)`` hook for each stage.
+
+        Returns:
+            RerankRetriever: The retriever instance.
+        """
+        return RerankRetriever(
+            vector_store   = self.get_vector_store(),
+            base_retriever = base_retriever,
+            candidates     = candidates or int(os.getenv('CON_ADB_VS_RERANK_CANDIDATES', 30)),
+            top_n          = top_n or int(os.getenv('CON_ADB_VS_RERANK_TOP_N', 4)),
+            filter         = filter,
+            lambda_mult    = float(os.getenv('CON_ADB_VS_RERANK_LAMBDA', 0.7)),
+            on_timing      = on_timing
         )
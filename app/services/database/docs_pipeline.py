@@ -0,0 +1,387 @@
+import os
+import re
+import json
+import threading
+from concurrent.futures import ThreadPoolExecutor
+
+from services.database.connection import Connection, output_type_handler
+from services.database.emb_cache import EmbeddingCacheService
+from services.database import vector_codec
+
+# Mismos parámetros que SP_VECTOR_STORE (dbms_vector_chain.utl_to_chunks)
+CHUNK_MAX_CHARS = 512
+CHUNK_OVERLAP   = 51
+CHUNK_SEPARATORS = ["\n\n", "\n", ". ", " ", ""]
+
+# Filas por executemany al insertar en DOCS
+INSERT_BATCH_SIZE = 1000
+
+
+def incremental_enabled():
+    """
+    True when new file versions are re-vectorized by chunk diff (Python pipeline only),
+    so FileService must keep the previous DOCS rows instead of deleting them.
+    """
+    return (
+        os.getenv('CON_GEN_AI_EMB_PIPELINE', 'plsql').lower() == 'python'
+        and os.getenv('CON_GEN_AI_EMB_INCREMENTAL', 'True').lower() in ('true', '1', 'yes')
+    )
+
+
+def _metadata_key(metadata):
+    """
+    Groups DOCS rows by the user of their metadata (one copy of each chunk per FILE_USER).
+    """
+    try:
+        return json.loads(metadata).get("user_id")
+    except (TypeError, ValueError, AttributeError):
+        return metadata
+
+
+def normalize_text(text):
+    """
+    Whitespace normalization equivalent to ``"normalize": "all"`` in utl_to_chunks.
+    """
+    text = text.replace("\r\n", "\n").replace("\r", "\n")
+    text = re.sub(r"[ \t\f\v]+", " ", text)
+    text = re.sub(r" *\n *", "\n", text)
+    return re.sub(r"\n{3,}", "\n\n", text).strip()
+
+
+def _split_spans(text, start, end, max_chars, separators):
+    """
+    Recursively yields (start, end) spans no longer than max_chars, cutting on the
+    first separator that appears in the span (the separator stays with the left side).
+    """
+    if end - start <= max_chars:
+        yield start, end
+        return
+
+    separator, rest = separators[0], separators[1:]
+    if separator == "":
+        for i in range(start, end, max_chars):
+            yield i, min(i + max_chars, end)
+        return
+
+    pos = start
+    while pos < end:
+        idx  = text.find(separator, pos, end)
+        stop = end if idx == -1 else idx + len(separator)
+        if stop - pos <= max_chars:
+            yield pos, stop
+        else:
+            yield from _split_spans(text, pos, stop, max_chars, rest)
+        pos = stop
+
+
+def split_text(text, max_chars=CHUNK_MAX_CHARS, overlap=CHUNK_OVERLAP):
+    """
+    Recursive character splitter with the SP_VECTOR_STORE settings.
+
+    Args:
+        text (str): Normalized text to split.
+        max_chars (int): Maximum characters per chunk.
+        overlap (int): Maximum characters shared with the previous chunk.
+
+    Returns:
+        list[tuple[int, str]]: (offset, chunk) pairs; offsets refer to ``text``.
+    """
+    chunks = []
+    window = []
+
+    def emit():
+        chunk_start, chunk_end = window[0][0], window[-1][1]
+        chunk = text[chunk_start:chunk_end]
+        stripped = chunk.strip()
+        if stripped:
+            chunks.append((chunk_start + len(chunk) - len(chunk.lstrip()), stripped))
+
+    for span_start, span_end in _split_spans(text, 0, len(text), max_chars, CHUNK_SEPARATORS):
+        if window and span_end - window[0][0] > max_chars:
+            emit()
+            # Conservar solo la cola que cabe en el solape y deja sitio al nuevo tramo
+            while window and (
+                window[-1][1] - window[0][0] > overlap
+                or span_end - window[0][0] > max_chars
+            ):
+                window.pop(0)
+        window.append((span_start, span_end))
+
+    if window:
+        emit()
+    return chunks
+
+
+class DocPipelineService:
+    """
+    Python ingestion pipeline for the DOCS vector store, alternative to SP_VECTOR_STORE.
+
+    The extraction is chunked locally, embedded in batches of ``CON_GEN_AI_EMB_BATCH_SIZE``
+    texts by ``CON_GEN_AI_EMB_WORKERS`` threads (reusing EMB_CACHE for chunks already
+    embedded with the same model), and bulk-inserted with ``executemany``
+    and VECTOR binds in a single transaction, reporting progress along the way.
+    With ``CON_GEN_AI_EMB_INCREMENTAL`` a new file version only deletes the chunks that
+    disappeared and inserts the new ones.
+    """
+
+    def __init__(self):
+        """
+        Initializes the pipeline with the shared database connection instance.
+        """
+        self.conn_instance = Connection()
+        self.batch_size    = int(os.getenv('CON_GEN_AI_EMB_BATCH_SIZE', 96))
+        self.workers       = int(os.getenv('CON_GEN_AI_EMB_WORKERS', 4))
+        self.cache_enabled = os.getenv('CON_GEN_AI_EMB_CACHE', 'True').lower() in ('true', '1', 'yes')
+        self.emb_cache     = EmbeddingCacheService()
+        self.incremental   = incremental_enabled()
+        self.vector_format = vector_codec.get_vector_format()
+        self._local        = threading.local()
+
+    def _get_embeddings(self):
+        """
+        One embeddings client per worker thread (OCI clients are not shared across threads,
+        same rule as GenAIClientRegistry).
+        """
+        from services.database.docs import DocService
+
+        embeddings = getattr(self._local, "embeddings", None)
+        if embeddings is None:
+            embeddings = DocService.get_embeddings()
+            self._local.embeddings = embeddings
+        return embeddings
+
+    def _embed_batch(self, texts):
+        return self._get_embeddings().embed_documents(texts)
+
+    def get_source(self, file_id):
+        """
+        Reads the extraction and the per-user metadata rows used by SP_VECTOR_STORE.
+
+        Args:
+            file_id (int): The ID of the file.
+
+        Returns:
+            tuple[str, list[str]]: Extraction text and one metadata JSON per FILE_USER row.
+        """
+        with self.conn_instance.acquire() as conn:
+            with conn.cursor() as cur:
+                cur.outputtypehandler = output_type_handler
+                cur.execute("""
+                    SELECT METADATA
+                    FROM VW_DOCS_FILES
+                    WHERE FILE_ID = :file_id
+                """, {"file_id": file_id})
+                metadatas = [meta for meta, in cur.fetchall()]
+                if not metadatas:
+                    return "", []
+
+                cur.execute("""
+                    SELECT FILE_TRG_EXTRACTION
+                    FROM FILES
+                    WHERE FILE_ID = :file_id
+                """, {"file_id": file_id})
+                text, = cur.fetchone()
+
+        return text or "", metadatas
+
+    def get_existing(self, file_id):
+        """
+        Reads the DOCS rows currently stored for a file.
+
+        Args:
+            file_id (int): The ID of the file.
+
+        Returns:
+            list[tuple[int, str, str]]: (id, text, metadata) rows.
+        """
+        with self.conn_instance.acquire() as conn:
+            with conn.cursor() as cur:
+                cur.outputtypehandler = output_type_handler
+                cur.arraysize = 1000
+                cur.execute("""
+                    SELECT ID, TEXT, METADATA
+                    FROM DOCS
+                    WHERE FILE_ID = :file_id
+                """, {"file_id": file_id})
+                return cur.fetchall()
+
+    @staticmethod
+    def diff(chunks, metadatas, existing):
+        """
+        Compares the new chunks with the stored DOCS rows, user by user.
+
+        Stored rows whose text is still a chunk of the new version are kept (only their
+        metadata is refreshed when it changed, e.g. file_version); the rest are deleted
+        and only chunks without a stored match are inserted.
+
+        Args:
+            chunks (list[str]): Chunks of the new extraction.
+            metadatas (list[str]): Target metadata JSON, one per FILE_USER row.
+            existing (list[tuple]): (id, text, metadata) rows from get_existing.
+
+        Returns:
+            tuple[list, list, list]: ids to delete, (metadata, id) updates and
+            (chunk, metadata) inserts.
+        """
+        stored = {}
+        for doc_id, doc_text, doc_meta in existing:
+            stored.setdefault(_metadata_key(doc_meta), []).append((doc_id, doc_text, doc_meta))
+
+        delete_ids, updates, inserts = [], [], []
+        for metadata in metadatas:
+            by_text = {}
+            for doc_id, doc_text, doc_meta in stored.pop(_metadata_key(metadata), []):
+                by_text.setdefault(doc_text, []).append((doc_id, doc_meta))
+
+            for chunk in chunks:
+                matches = by_text.get(chunk)
+                if matches:
+                    doc_id, doc_meta = matches.pop()
+                    if doc_meta != metadata:
+                        updates.append((metadata, doc_id))
+                else:
+                    inserts.append((chunk, metadata))
+
+            delete_ids.extend(doc_id for rows in by_text.values() for doc_id, _ in rows)
+
+        # Usuarios que ya no tienen acceso al archivo
+        delete_ids.extend(doc_id for rows in stored.values() for doc_id, _, _ in rows)
+        return delete_ids, updates, inserts
+
+    def embed(self, texts, progress=None):
+        """
+        Embeds texts in batches using a bounded worker pool.
+
+        Args:
+            texts (list[str]): Texts to embed.
+            progress (callable, optional): ``progress(stage, done, total)`` callback.
+
+        Returns:
+            list[list[float]]: Embeddings in the same order as ``texts``.
+        """
+        batches = [texts[i:i + self.batch_size] for i in range(0, len(texts), self.batch_size)]
+        vectors = []
+        done    = 0
+        with ThreadPoolExecutor(max_workers=max(1, self.workers)) as executor:
+            # map conserva el orden de los lotes
+            for batch_vectors in executor.map(self._embed_batch, batches):
+                vectors.extend(batch_vectors)
+                done += len(batch_vectors)
+                if progress:
+                    progress("embed", done, len(texts))
+        return vectors
+
+    def embed_cached(self, texts, progress=None):
+        """
+        Embeds texts through the EMB_CACHE table: cached chunks are reused and only the
+        misses (deduplicated) are sent to the embedding model and then cached.
+
+        Args:
+            texts (list[str]): Texts to embed.
+            progress (callable, optional): ``progress(stage, done, total)`` callback.
+
+        Returns:
+            tuple[list, int]: Embeddings in the same order as ``texts`` and cache hits.
+        """
+        if not self.cache_enabled:
+            return self.embed(texts, progress), 0
+
+        hashes = [EmbeddingCacheService.get_hash(text) for text in texts]
+        cached = self.emb_cache.get_many(hashes)
+        hits   = sum(1 for h in hashes if h in cached)
+        if progress:
+            progress("cache", hits, len(texts))
+
+        # Un solo embedding por hash nuevo, aunque el chunk se repita en el documento
+        missing = {h: text for h, text in zip(hashes, texts) if h not in cached}
+        if missing:
+            new_vectors = dict(zip(missing, self.embed(list(missing.values()), progress)))
+            self.emb_cache.put_many(new_vectors)
+            cached.update(new_vectors)
+
+        return [cached[h] for h in hashes], hits
+
+    def apply(self, file_id, rows, delete_ids=None, updates=None, progress=None):
+        """
+        Writes the DOCS changes of a file in one transaction using executemany.
+
+        Without ``delete_ids`` every previous row of the file is replaced; otherwise only
+        the listed rows are deleted and the ``updates`` metadata refreshed, which keeps
+        vector index maintenance proportional to the change.
+
+        Args:
+            file_id (int): The ID of the file.
+            rows (list[tuple]): (file_id, text, metadata, vector) tuples to insert.
+            delete_ids (list[int], optional): DOCS ids to delete (incremental mode).
+            updates (list[tuple], optional): (metadata, id) pairs (incremental mode).
+            progress (callable, optional): ``progress(stage, done, total)`` callback.
+        """
+        with self.conn_instance.acquire() as conn:
+            autocommit, conn.autocommit = conn.autocommit, False
+            try:
+                with conn.cursor() as cur:
+                    if delete_ids is None:
+                        cur.execute("DELETE FROM DOCS WHERE FILE_ID = :file_id", {"file_id": file_id})
+                    elif delete_ids:
+                        cur.executemany("DELETE FROM DOCS WHERE ID = :1", [(doc_id,) for doc_id in delete_ids])
+                    if updates:
+                        cur.executemany("UPDATE DOCS SET METADATA = :1 WHERE ID = :2", updates)
+                    for i in range(0, len(rows), INSERT_BATCH_SIZE):
+                        batch = rows[i:i + INSERT_BATCH_SIZE]
+                        cur.executemany("""
+                            INSERT INTO DOCS (FILE_ID, TEXT, METADATA, EMBEDDING)
+                            VALUES (:1, :2, :3, :4)
+                        """, batch)
+                        if progress:
+                            progress("insert", i + len(batch), len(rows))
+                conn.commit()
+            except Exception:
+                conn.rollback()
+                raise
+            finally:
+                conn.autocommit = autocommit
+
+    def run(self, file_id, progress=None):
+        """
+        Chunks, embeds and stores a file in the DOCS vector store.
+
+        Args:
+            file_id (int): The ID of the file.
+            progress (callable, optional): ``progress(stage, done, total)`` callback,
+                stages are ``chunk``, ``cache``, ``embed`` and ``insert``.
+
+        Returns:
+            str: Confirmation message.
+        """
+        text, metadatas = self.get_source(file_id)
+        chunks = [chunk for _, chunk in split_text(normalize_text(text))] if metadatas else []
+        if progress:
+            progress("chunk", len(chunks), len(chunks))
+
+        if self.incremental:
+            delete_ids, updates, inserts = self.diff(chunks, metadatas, self.get_existing(file_id))
+        else:
+            delete_ids, updates = None, None
+            # Mismo resultado que SP_VECTOR_STORE: una copia de cada chunk por usuario del archivo
+            inserts = [(chunk, metadata) for metadata in metadatas for chunk in chunks]
+
+        # Solo se embeben los textos que realmente se insertan
+        new_texts = list(dict.fromkeys(chunk for chunk, _ in inserts))
+        vectors, hits = self.embed_cached(new_texts, progress) if new_texts else ([], 0)
+        vector_by_text = dict(zip(new_texts, vectors))
+
+        rows = [
+            (file_id, chunk, metadata, vector_codec.encode(vector_by_text[chunk], self.vector_format))
+            for chunk, metadata in inserts
+        ]
+        self.apply(file_id, rows, delete_ids, updates, progress)
+
+        hit_rate = hits / len(new_texts) if new_texts else 0
+        summary  = (
+            f"{len(chunks)} chunks, {len(rows)} inserted, {len(delete_ids)} deleted, {len(updates)} refreshed"
+            if self.incremental else f"{len(chunks)} chunks"
+        )
+        return (
+            f"The file was created to the vector store successfully "
+            f"({summary}, embedding cache hits {hits}/{len(new_texts)} · {hit_rate:.0%})."
+        )
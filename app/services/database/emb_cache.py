@@ -0,0 +1,78 @@
+import os
+import hashlib
+
+from services.database.connection import Connection
+from services.database import vector_codec
+
+# Máximo de binds por consulta IN al leer la caché
+LOOKUP_BATCH_SIZE = 500
+
+
+class EmbeddingCacheService:
+    """
+    Persistent embedding cache (EMB_CACHE table) keyed by embedding model and chunk hash,
+    so re-vectorizing a file only calls the embedding model for chunks never seen before.
+    """
+
+    def __init__(self, model_id=None):
+        """
+        Initializes the cache for an embedding model (``CON_GEN_AI_EMB_MODEL_ID`` by default).
+        """
+        self.conn_instance = Connection()
+        self.model_id      = model_id or os.getenv('CON_GEN_AI_EMB_MODEL_ID')
+
+    @staticmethod
+    def get_hash(text):
+        """
+        SHA-256 of the chunk with whitespace normalized, so formatting-only changes still hit.
+        """
+        return hashlib.sha256(" ".join(text.split()).encode("utf-8")).hexdigest()
+
+    def get_many(self, hashes):
+        """
+        Looks up cached embeddings.
+
+        Args:
+            hashes (list[str]): Chunk hashes.
+
+        Returns:
+            dict[str, array.array]: Embeddings found, by chunk hash.
+        """
+        hashes = list(dict.fromkeys(hashes))
+        found  = {}
+        with self.conn_instance.acquire() as conn:
+            with conn.cursor() as cur:
+                for i in range(0, len(hashes), LOOKUP_BATCH_SIZE):
+                    binds = {f"h_{j}": h for j, h in enumerate(hashes[i:i + LOOKUP_BATCH_SIZE])}
+                    binds["model_id"] = self.model_id
+                    cur.execute(f"""
+                        SELECT CHUNK_HASH, EMBEDDING
+                        FROM EMB_CACHE
+                        WHERE MODEL_ID = :model_id
+                        AND CHUNK_HASH IN ({','.join(':' + name for name in binds if name != 'model_id')})
+                    """, binds)
+                    for chunk_hash, embedding in cur:
+                        found[chunk_hash] = embedding
+        return found
+
+    def put_many(self, items):
+        """
+        Stores new embeddings; keys already cached (e.g. by a concurrent ingestion) are skipped.
+
+        Args:
+            items (dict[str, list[float]]): Embeddings by chunk hash.
+        """
+        if not items:
+            return
+        rows = [
+            (self.model_id, chunk_hash, vector_codec.encode(embedding, "float32"))
+            for chunk_hash, embedding in items.items()
+        ]
+        with self.conn_instance.acquire() as conn:
+            with conn.cursor() as cur:
+                # batcherrors: ignora ORA-00001 en claves ya existentes
+                cur.executemany("""
+                    INSERT INTO EMB_CACHE (MODEL_ID, CHUNK_HASH, EMBEDDING)
+                    VALUES (:1, :2, :3)
+                """, rows, batcherrors=True)
+            conn.commit()
@@ -1,6 +1,67 @@
 import streamlit as st
 import pandas as pd
 from services.database.connection import Connection
+from services.database.docs_pipeline import incremental_enabled
+
+GET_ALL_FILES_QUERY = """
+    SELECT 
+        A.FILE_ID,
+        A.MODULE_ID,
+        B.MODULE_NAME,
+        B.MODULE_VECTOR_STORE,
+        A.FILE_SRC_FILE_NAME,
+        A.FILE_SRC_SIZE,
+        A.FILE_SRC_STRATEGY,
+        CASE 
+            WHEN B.MODULE_VECTOR_STORE = 0 THEN NULL 
+            ELSE A.FILE_TRG_OBJ_NAME 
+        END AS FILE_TRG_OBJ_NAME,
+        A.FILE_TRG_EXTRACTION,
+        A.FILE_TRG_TOT_PAGES,
+        A.FILE_TRG_TOT_CHARACTERS,
+        A.FILE_TRG_TOT_TIME,
+        A.FILE_TRG_LANGUAGE,
+        A.FILE_TRG_PII,
+        A.FILE_DESCRIPTION,
+        A.FILE_VERSION,
+        A.FILE_DATE,
+        A.FILE_STATE,
+        FU1.USER_ID,
+        U1.USER_GROUP_ID,
+        FU2.OWNER,
+        FU2.USER_ID AS USER_ID_OWNER,
+        U2.USER_USERNAME,
+        U2.USER_EMAIL,
+        (
+            SELECT COUNT(1)
+            FROM FILE_USER FU3
+            WHERE FU3.FILE_ID = A.FILE_ID
+            AND FU3.OWNER <> 1
+        ) AS FILE_USERS
+    FROM
+        FILES A
+    LEFT JOIN
+        MODULES B
+        ON B.MODULE_ID = A.MODULE_ID
+    JOIN
+        FILE_USER FU1
+        ON FU1.FILE_ID = A.FILE_ID
+        AND FU1.USER_ID = :user_id
+    JOIN
+        USERS U1
+        ON U1.USER_ID = FU1.USER_ID
+    JOIN
+        FILE_USER FU2
+        ON FU2.FILE_ID = A.FILE_ID
+        AND FU2.OWNER = 1
+    JOIN
+        USERS U2
+        ON U2.USER_ID = FU2.USER_ID
+    WHERE
+        A.FILE_STATE <> 0
+    ORDER BY
+        A.FILE_ID DESC
+"""
 
 class FileService:
     """
@@ -31,66 +92,7 @@ class FileService:
         Returns:
             pd.DataFrame: A DataFrame containing file information.
         """
-        query = f"""
-            SELECT 
-                A.FILE_ID,
-                A.MODULE_ID,
-                B.MODULE_NAME,
-                B.MODULE_VECTOR_STORE,
-                A.FILE_SRC_FILE_NAME,
-                A.FILE_SRC_SIZE,
-                A.FILE_SRC_STRATEGY,
-                CASE 
-                    WHEN B.MODULE_VECTOR_STORE = 0 THEN NULL 
-                    ELSE A.FILE_TRG_OBJ_NAME 
-                END AS FILE_TRG_OBJ_NAME,
-                A.FILE_TRG_EXTRACTION,
-                A.FILE_TRG_TOT_PAGES,
-                A.FILE_TRG_TOT_CHARACTERS,
-                A.FILE_TRG_TOT_TIME,
-                A.FILE_TRG_LANGUAGE,
-                A.FILE_TRG_PII,
-                A.FILE_DESCRIPTION,
-                A.FILE_VERSION,
-                A.FILE_DATE,
-                A.FILE_STATE,
-                FU1.USER_ID,
-                U1.USER_GROUP_ID,
-                FU2.OWNER,
-                FU2.USER_ID AS USER_ID_OWNER,
-                U2.USER_USERNAME,
-                U2.USER_EMAIL,
-                (
-                    SELECT COUNT(1)
-                    FROM FILE_USER FU3
-                    WHERE FU3.FILE_ID = A.FILE_ID
-                    AND FU3.OWNER <> 1
-                ) AS FILE_USERS
-            FROM
-                FILES A
-            LEFT JOIN
-                MODULES B
-                ON B.MODULE_ID = A.MODULE_ID
-            JOIN
-                FILE_USER FU1
-                ON FU1.FILE_ID = A.FILE_ID
-                AND FU1.USER_ID = {user_id}
-            JOIN
-                USERS U1
-                ON U1.USER_ID = FU1.USER_ID
-            JOIN
-                FILE_USER FU2
-                ON FU2.FILE_ID = A.FILE_ID
-                AND FU2.OWNER = 1
-            JOIN
-                USERS U2
-                ON U2.USER_ID = FU2.USER_ID
-            WHERE
-                A.FILE_STATE <> 0
-            ORDER BY
-                A.FILE_ID DESC
-        """
-        return pd.read_sql(query, con=_self.conn)
+        return pd.read_sql(GET_ALL_FILES_QUERY, con=_self.conn, params={"user_id": user_id})
 
     def delete_file_user_by_user(self, file_id, user_id, file_name):
         delete_query = """
@@ -123,56 +125,70 @@ class FileService:
         """
 
         # Verificar si el FILE ya existe (por file name, module y pii)
-        check_query = f"""
+        check_query = """
             SELECT FILE_ID, FILE_VERSION
             FROM FILES
-            WHERE FILE_SRC_FILE_NAME = '{file_src_file_name}'
-            AND MODULE_ID = {module_id}
-            AND FILE_TRG_PII = {file_trg_pii}
+            WHERE FILE_SRC_FILE_NAME = :file_src_file_name
+            AND MODULE_ID = :module_id
+            AND FILE_TRG_PII = :file_trg_pii
         """
-        df = pd.read_sql(check_query, con=self.conn)
+        df = pd.read_sql(check_query, con=self.conn, params={
+            "file_src_file_name": file_src_file_name,
+            "module_id": module_id,
+            "file_trg_pii": file_trg_pii
+        })
 
         if not df.empty:
-            file_id = df['FILE_ID'].iloc[0]
-            file_version = df['FILE_VERSION'].iloc[0]
+            file_id = int(df['FILE_ID'].iloc[0])
 
             # Verificar si ya existe la relación con el usuario
-            user_file_query = f"""
+            user_file_query = """
                 SELECT 1 FROM FILE_USER
-                WHERE FILE_ID = {file_id} AND USER_ID = {user_id}
+                WHERE FILE_ID = :file_id AND USER_ID = :user_id
             """
-            df_user_file = pd.read_sql(user_file_query, con=self.conn)
+            df_user_file = pd.read_sql(user_file_query, con=self.conn, params={
+                "file_id": file_id,
+                "user_id": user_id
+            })
 
             if not df_user_file.empty:
                 # El archivo existe y ya está asociado al usuario → actualizar versión
                 with self.conn.cursor() as cur:
-                    cur.execute(f"""
+                    cur.execute("""
                         UPDATE FILES SET
-                            FILE_SRC_SIZE      = {file_src_size},
-                            FILE_SRC_STRATEGY  = '{file_src_strategy}',
-                            FILE_TRG_LANGUAGE  = '{file_trg_language}',
-                            FILE_VERSION       = {file_version} + 1,
-                            FILE_DESCRIPTION   = '{file_description}',
+                            FILE_SRC_SIZE      = :file_src_size,
+                            FILE_SRC_STRATEGY  = :file_src_strategy,
+                            FILE_TRG_LANGUAGE  = :file_trg_language,
+                            FILE_VERSION       = FILE_VERSION + 1,
+                            FILE_DESCRIPTION   = :file_description,
+                            FILE_TRG_EXTRACTION = NULL,
                             FILE_STATE         = 1,
                             FILE_DATE          = SYSDATE
-                        WHERE FILE_ID = {file_id}
-                    """)
+                        WHERE FILE_ID = :file_id
+                    """, {
+                        "file_src_size": file_src_size,
+                        "file_src_strategy": file_src_strategy,
+                        "file_trg_language": file_trg_language,
+                        "file_description": file_description,
+                        "file_id": file_id
+                    })
                 self.conn.commit()
 
-                # Borrar documentos asociados anteriores
-                with self.conn.cursor() as cur:
-                    cur.execute(f"DELETE FROM DOCS WHERE FILE_ID = {file_id}")
-                self.conn.commit()
+                # Borrar documentos asociados anteriores (el modo incremental los compara con la nueva versión)
+                if not incremental_enabled():
+                    with self.conn.cursor() as cur:
+                        cur.execute("DELETE FROM DOCS WHERE FILE_ID = :file_id", {"file_id": file_id})
+                    self.conn.commit()
 
-                return f"File '{file_name}' already existed and added new version.", int(file_id)
+                return f"File '{file_name}' already existed and added new version.", file_id
 
             else:
                 # El archivo existe pero no está asociado al usuario → asociar en FILE_USER
                 with self.conn.cursor() as cur:
-                    cur.execute(f"""
+                    cur.execute("""
                         INSERT INTO FILE_USER (FILE_ID, USER_ID)
-                        VALUES ({file_id}, {user_id})
-                    """)
+                        VALUES (:file_id, :user_id)
+                    """, {"file_id": file_id, "user_id": user_id})
                 self.conn.commit()
 
                 return f"File '{file_name}' existed but was linked to user.", file_id
@@ -181,7 +197,7 @@ class FileService:
             # El archivo no existe → crear nuevo FILE y FILE_USER
             with self.conn.cursor() as cur:
                 file_id_var = cur.var(int)
-                cur.execute(f"""
+                cur.execute("""
                     INSERT INTO FILES (
                         MODULE_ID,
                         FILE_SRC_FILE_NAME,
@@ -192,26 +208,36 @@ class FileService:
                         FILE_TRG_PII,
                         FILE_DESCRIPTION
                     ) VALUES (
-                        {module_id},
-                        '{file_src_file_name}',
-                        {file_src_size},
-                        '{file_src_strategy}',
-                        '{file_trg_obj_name}',
-                        '{file_trg_language}',
-                        {file_trg_pii},
-                        '{file_description}'
+                        :module_id,
+                        :file_src_file_name,
+                        :file_src_size,
+                        :file_src_strategy,
+                        :file_trg_obj_name,
+                        :file_trg_language,
+                        :file_trg_pii,
+                        :file_description
                     ) RETURNING FILE_ID INTO :file_id
-                """, {"file_id": file_id_var})
+                """, {
+                    "module_id": module_id,
+                    "file_src_file_name": file_src_file_name,
+                    "file_src_size": file_src_size,
+                    "file_src_strategy": file_src_strategy,
+                    "file_trg_obj_name": file_trg_obj_name,
+                    "file_trg_language": file_trg_language,
+                    "file_trg_pii": file_trg_pii,
+                    "file_description": file_description,
+                    "file_id": file_id_var
+                })
             self.conn.commit()
 
             file_id_new = file_id_var.getvalue()[0]
 
             # Asociar el nuevo FILE con el USER
             with self.conn.cursor() as cur:
-                cur.execute(f"""
+                cur.execute("""
                     INSERT INTO FILE_USER (FILE_ID, USER_ID)
-                    VALUES ({file_id_new}, {user_id})
-                """)
+                    VALUES (:file_id, :user_id)
+                """, {"file_id": file_id_new, "user_id": user_id})
             self.conn.commit()
 
             return f"File '{file_name}' has been created successfully.", file_id_new
@@ -225,6 +251,12 @@ class FileService:
         """
         Updates the file extraction information in the database using CLOB for large text.
 
+        The previous extraction is replaced: the CLOB is reset to ``EMPTY_CLOB()`` and the
+        text is written through the locator fetched ``FOR UPDATE`` in large pieces, so the
+        whole extraction is one transaction with a single commit instead of one
+        ``UPDATE ... CONCAT`` and commit per 4000 characters. The incremental vector store
+        diffs DOCS against this value, so it must hold only the current version.
+
         Args:
             file_id (int)             : ID of the file to update.
             file_trg_extraction (str) : Extraction content to update.
@@ -232,20 +264,49 @@ class FileService:
         Returns:
             str: Success message or error message.
         """
-        # Define chunk size for splitting the content
-        chunk_size     = 4000  # Oracle supports up to 4000 characters per chunk
-        tot_characters = len(file_trg_extraction)
-        for i in range(0, tot_characters, chunk_size):
-            chunk = file_trg_extraction[i:i + chunk_size]
-
-            with self.conn.cursor() as cur:
-                # Append the current chunk to the CLOB column
-                cur.execute(f"""
-                    UPDATE FILES SET
-                        FILE_TRG_EXTRACTION     = CONCAT(FILE_TRG_EXTRACTION,'{chunk.replace("'", "''")}')
-                    WHERE FILE_ID = {file_id}
-                """)
-            self.conn.commit()
+        # Define chunk size for each LOB write (characters)
+        chunk_size = 1024 * 1024
+
+        with self.conn_instance.acquire() as conn:
+            # El locator solo se puede escribir mientras la fila siga bloqueada
+            autocommit, conn.autocommit = conn.autocommit, False
+            try:
+                with conn.cursor() as cur:
+                    cur.execute("""
+                        UPDATE FILES SET
+                            FILE_TRG_EXTRACTION = EMPTY_CLOB()
+                        WHERE FILE_ID = :file_id
+                    """, {"file_id": file_id})
+
+                    cur.execute("""
+                        SELECT FILE_TRG_EXTRACTION
+                        FROM FILES
+                        WHERE FILE_ID = :file_id
+                        FOR UPDATE
+                    """, {"file_id": file_id})
+                    row = cur.fetchone()
+                    if row is None:
+                        conn.rollback()
+                        return f"File '{file_id}' was not found."
+
+                    lob = row[0]
+                    lob.open()
+                    try:
+                        # Offset 1-based, en unidades UTF-16
+                        offset = 1
+                        for i in range(0, len(file_trg_extraction), chunk_size):
+                            chunk = file_trg_extraction[i:i + chunk_size]
+                            lob.write(chunk, offset)
+                            offset += len(chunk.encode("utf-16-le")) // 2
+                    finally:
+                        lob.close()
+
+                conn.commit()
+            except Exception:
+                conn.rollback()
+                raise
+            finally:
+                conn.autocommit = autocommit
 
         return f"File extraction has been updated successfully."
 
@@ -275,15 +336,22 @@ class FileService:
         """
         # Update the existing file record
         with self.conn.cursor() as cur:
-            cur.execute(f"""
+            cur.execute("""
                 UPDATE FILES SET
-                    FILE_TRG_OBJ_NAME       = '{file_trg_obj_name}',
-                    FILE_TRG_TOT_PAGES      = {file_trg_tot_pages},
-                    FILE_TRG_TOT_CHARACTERS = {file_trg_tot_characters},
-                    FILE_TRG_TOT_TIME       = '{file_trg_tot_time}',
-                    FILE_TRG_LANGUAGE       = '{file_trg_language}'
-                WHERE FILE_ID = {file_id}
-            """)
+                    FILE_TRG_OBJ_NAME       = :file_trg_obj_name,
+                    FILE_TRG_TOT_PAGES      = :file_trg_tot_pages,
+                    FILE_TRG_TOT_CHARACTERS = :file_trg_tot_characters,
+                    FILE_TRG_TOT_TIME       = :file_trg_tot_time,
+                    FILE_TRG_LANGUAGE       = :file_trg_language
+                WHERE FILE_ID = :file_id
+            """, {
+                "file_trg_obj_name": file_trg_obj_name,
+                "file_trg_tot_pages": file_trg_tot_pages,
+                "file_trg_tot_characters": file_trg_tot_characters,
+                "file_trg_tot_time": file_trg_tot_time,
+                "file_trg_language": file_trg_language,
+                "file_id": file_id
+            })
         self.conn.commit()
         return f"The file was updated successfully."
 
@@ -370,11 +438,11 @@ class FileService:
         """
         Deletes a record from FILE_USER.
         """
-        query = f"""
-            DELETE FROM FILE_USER WHERE FILE_USER_ID = {file_user_id}
+        query = """
+            DELETE FROM FILE_USER WHERE FILE_USER_ID = :file_user_id
         """
         with self.conn.cursor() as cur:
-            cur.execute(query)
+            cur.execute(query, {"file_user_id": file_user_id})
         self.conn.commit()
         return f"Shared FileUser ID {file_user_id} deleted successfully."
 
@@ -394,7 +462,7 @@ class FileService:
         Returns:
             pd.DataFrame: Shared FILE_USER records (excluding files belonging to user_id).
         """
-        query = f"""
+        query = """
             SELECT 
                 FU.FILE_USER_ID,
                 FU.FILE_ID,
@@ -417,10 +485,10 @@ class FileService:
             JOIN USER_GROUP UG
                 ON U.USER_GROUP_ID = UG.USER_GROUP_ID
             WHERE
-                FU.USER_ID <> {user_id}
+                FU.USER_ID <> :user_id
                 AND FU.OWNER <> 1
                 AND F.FILE_STATE <> 0
             ORDER BY
                 FU.FILE_USER_ID
         """
-        return pd.read_sql(query, con=_self.conn)
\ No newline at end of file
+        return pd.read_sql(query, con=_self.conn, params={"user_id": user_id})
\ No newline at end of file
@@ -0,0 +1,214 @@
+# app/services/database/hybrid_retriever.py
+from __future__ import annotations
+import json
+import math
+import re
+import time
+import logging
+import threading
+from collections import Counter, OrderedDict
+from concurrent.futures import ThreadPoolExecutor
+from typing import Any, Dict, List, Optional, Tuple
+
+import oracledb
+from pydantic import ConfigDict
+from langchain_core.callbacks import CallbackManagerForRetrieverRun
+from langchain_core.documents import Document
+from langchain_core.retrievers import BaseRetriever
+
+from services.database.connection import Connection
+from services.database.oracle_vs import OracleVS
+
+logger = logging.getLogger(__name__)
+
+# text: índice Oracle Text (docs_text_idx, CONTAINS); bm25: índice BM25 en memoria sobre DOCS.text
+LEXICAL_MODES = ("text", "bm25")
+# Términos de la consulta léxica (códigos, SKUs, siglas...)
+TERM_PATTERN = re.compile(r"\w[\w\-./]*\w|\w")
+LEXICAL_MAX_TERMS = 16
+# Índices BM25 en memoria (uno por filtro: archivos + usuario)
+BM25_CACHE_SIZE = 32
+BM25_K1 = 1.5
+BM25_B = 0.75
+
+# Ambas ramas corren en paralelo, cada una con su propia conexión del pool
+_executor = ThreadPoolExecutor(max_workers=8, thread_name_prefix="hybrid", initializer=lambda: Connection().require_scope())
+# filtro -> (firma de las filas, BM25Index), compartido por todas las sesiones del proceso
+_bm25_cache: "OrderedDict[str, Tuple[tuple, BM25Index]]" = OrderedDict()
+_bm25_lock = threading.Lock()
+
+
+def get_terms(text: str) -> List[str]:
+    """Tokens en minúsculas de la búsqueda léxica (conserva guiones y puntos internos)."""
+    return TERM_PATTERN.findall(text.lower())
+
+
+class BM25Index:
+    """Índice BM25 (Okapi) sobre las filas (id, text, metadata) de DOCS."""
+
+    def __init__(self, rows: List[Tuple[Any, str, str]]):
+        self.rows = rows
+        self.postings: Dict[str, List[Tuple[int, int]]] = {}
+        self.lengths: List[int] = []
+        for i, (_, text, _) in enumerate(rows):
+            terms = get_terms(text or "")
+            self.lengths.append(len(terms))
+            for term, tf in Counter(terms).items():
+                self.postings.setdefault(term, []).append((i, tf))
+        self.avg_length = sum(self.lengths) / len(self.lengths) if self.lengths else 0.0
+
+    def search(self, query: str, k: int) -> List[Tuple[Any, str, str]]:
+        """Filas con mayor puntaje BM25 para la consulta."""
+        total = len(self.rows)
+        scores: Dict[int, float] = {}
+        for term in set(get_terms(query)):
+            postings = self.postings.get(term)
+            if not postings:
+                continue
+            idf = math.log(1 + (total - len(postings) + 0.5) / (len(postings) + 0.5))
+            for i, tf in postings:
+                norm = BM25_K1 * (1 - BM25_B + BM25_B * self.lengths[i] / (self.avg_length or 1))
+                scores[i] = scores.get(i, 0.0) + idf * tf * (BM25_K1 + 1) / (tf + norm)
+        best = sorted(scores, key=scores.get, reverse=True)[:k]
+        return [self.rows[i] for i in best]
+
+
+class OracleHybridRetriever(BaseRetriever):
+    """
+    Retriever híbrido léxico + vectorial sobre DOCS.
+
+    La búsqueda vectorial de ``OracleVS`` y la léxica (Oracle Text ``CONTAINS`` o BM25
+    local) corren en paralelo y se fusionan con Reciprocal Rank Fusion:
+    ``score(d) = sum(weight / (rrf_k + rank))``. Un peso 0 desactiva esa rama.
+    """
+
+    model_config = ConfigDict(arbitrary_types_allowed=True)
+
+    vector_store: OracleVS
+    k: int = 5
+    filter: Optional[Dict[str, Any]] = None
+    vector_weight: float = 1.0
+    lexical_weight: float = 1.0
+    lexical_mode: str = "text"
+    rrf_k: int = 60
+    # Candidatos por rama = k * candidates_factor
+    candidates_factor: int = 4
+
+    def _vector_search(self, query: str, k: int) -> List[Document]:
+        store = self.vector_store
+        embedding = store.query_cache.get_or_embed(store.embedding_function, query)
+        sql, binds = store._search_sql(embedding, k, self.filter)
+        with Connection().acquire() as conn:
+            with conn.cursor() as cursor:
+                store._prepare_cursor(cursor, k)
+                cursor.execute(sql, binds)
+                return [store._to_document(text, meta_str, doc_id) for doc_id, text, meta_str in cursor]
+
+    def _text_search(self, query: str, k: int) -> List[Document]:
+        # {término}: escapa los operadores de Oracle Text; ACCUM suma los términos encontrados
+        terms = list(dict.fromkeys(get_terms(query)))[:LEXICAL_MAX_TERMS]
+        if not terms:
+            return []
+        where, binds = OracleVS._filter_sql(self.filter, ["CONTAINS(text, :text_query, 1) > 0"])
+        binds.update({"text_query": " ACCUM ".join(f"{{{term}}}" for term in terms), "k": k})
+        with Connection().acquire() as conn:
+            with conn.cursor() as cursor:
+                OracleVS._prepare_cursor(cursor, k)
+                cursor.execute(f"""
+                    SELECT id, text, metadata
+                    FROM {self.vector_store.table_name}
+                    {where}
+                    ORDER BY SCORE(1) DESC
+                    FETCH FIRST :k ROWS ONLY
+                """, binds)
+                return [OracleVS._to_document(text, meta_str, doc_id) for doc_id, text, meta_str in cursor]
+
+    def _get_bm25_index(self, conn: Any) -> BM25Index:
+        """
+        Índice BM25 de las filas del filtro, reconstruido solo cuando cambian
+        (COUNT, MAX(id) y MAX(ORA_ROWSCN) detectan inserciones, borrados y updates).
+        """
+        table = self.vector_store.table_name
+        where, binds = OracleVS._filter_sql(self.filter)
+        key = json.dumps(self.filter or {}, sort_keys=True, default=str)
+        with conn.cursor() as cursor:
+            cursor.execute(f"SELECT COUNT(*), MAX(id), MAX(ORA_ROWSCN) FROM {table} {where}", binds)
+            signature = cursor.fetchone()
+
+            with _bm25_lock:
+                cached = _bm25_cache.get(key)
+                if cached is not None and cached[0] == signature:
+                    _bm25_cache.move_to_end(key)
+                    return cached[1]
+
+            OracleVS._prepare_cursor(cursor, 1000)
+            cursor.execute(f"SELECT id, text, metadata FROM {table} {where}", binds)
+            index = BM25Index(cursor.fetchall())
+
+        with _bm25_lock:
+            _bm25_cache[key] = (signature, index)
+            _bm25_cache.move_to_end(key)
+            while len(_bm25_cache) > BM25_CACHE_SIZE:
+                _bm25_cache.popitem(last=False)
+        return index
+
+    def _bm25_search(self, query: str, k: int) -> List[Document]:
+        with Connection().acquire() as conn:
+            index = self._get_bm25_index(conn)
+        return [OracleVS._to_document(text, meta_str, doc_id) for doc_id, text, meta_str in index.search(query, k)]
+
+    def _timed(self, search: Any, query: str, k: int) -> Tuple[List[Document], float]:
+        start = time.perf_counter()
+        docs = search(query, k)
+        return docs, (time.perf_counter() - start) * 1000
+
+    def fuse(self, rankings: List[Tuple[List[Document], float]]) -> List[Document]:
+        """
+        Reciprocal Rank Fusion de varias listas ordenadas con su peso.
+        Los documentos se identifican por id (o por texto si no lo tienen).
+        """
+        scores: Dict[str, float] = {}
+        docs: Dict[str, Document] = {}
+        for ranking, weight in rankings:
+            for rank, doc in enumerate(ranking, start=1):
+                key = doc.id or doc.page_content
+                scores[key] = scores.get(key, 0.0) + weight / (self.rrf_k + rank)
+                docs.setdefault(key, doc)
+
+        fused = []
+        for key in sorted(scores, key=scores.get, reverse=True)[:self.k]:
+            doc = docs[key]
+            doc.metadata["rrf_score"] = scores[key]
+            fused.append(doc)
+        return fused
+
+    def _get_relevant_documents(
+        self, query: str, *, run_manager: CallbackManagerForRetrieverRun
+    ) -> List[Document]:
+        if self.lexical_mode not in LEXICAL_MODES:
+            raise ValueError(f"lexical_mode must be one of {LEXICAL_MODES}")
+        candidates = self.k * self.candidates_factor
+        lexical_search = self._text_search if self.lexical_mode == "text" else self._bm25_search
+
+        legs = {}
+        if self.vector_weight > 0:
+            legs["vector"] = (_executor.submit(self._timed, self._vector_search, query, candidates), self.vector_weight)
+        if self.lexical_weight > 0:
+            legs["lexical"] = (_executor.submit(self._timed, lexical_search, query, candidates), self.lexical_weight)
+
+        rankings, timings = [], {}
+        for name, (future, weight) in legs.items():
+            try:
+                docs, elapsed_ms = future.result()
+            except oracledb.DatabaseError as e:
+                if name != "lexical" or "vector" not in legs:
+                    raise
+                # Sin docs_text_idx (paso v) CONTAINS falla (DRG-10599/ORA-20000): queda solo la rama vectorial
+                logger.warning(f"⚠️ Lexical search ({self.lexical_mode}) failed, using vector search only: {e}")
+                timings[name] = "failed"
+                continue
+            rankings.append((docs, weight))
+            timings[name] = f"{len(docs)} docs {elapsed_ms:.1f} ms"
+        logger.debug(f"Hybrid retrieval ({self.lexical_mode}): {timings}")
+
+        return self.fuse(rankings)
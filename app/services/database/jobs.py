@@ -0,0 +1,181 @@
+import json
+
+import pandas as pd
+from services.database.connection import Connection
+
+# Estados de JOBS
+JOB_STATES = ("SUBMITTED", "RUNNING", "SUCCEEDED", "FAILED")
+JOB_ACTIVE_STATES = ("SUBMITTED", "RUNNING")
+
+
+class JobService:
+    """
+    Persistent job table (JOBS) of the background job manager.
+    """
+
+    def __init__(self):
+        """
+        Keep only the singleton connection instance.
+        """
+        self.conn_instance = Connection()
+
+    def insert_job(self, user_id, file_id, job_type, job_params, timeout):
+        """
+        Registers a new job in SUBMITTED state.
+
+        Args:
+            user_id (int): Owner of the job.
+            file_id (int): File processed by the job.
+            job_type (str): Handler name (e.g. DOCUMENT_UNDERSTANDING, SPEECH).
+            job_params (dict): JSON-serializable parameters of the handler.
+            timeout (int): Seconds until the job is marked FAILED.
+
+        Returns:
+            int: The new JOB_ID.
+        """
+        with self.conn_instance.acquire() as conn:
+            with conn.cursor() as cur:
+                job_id_var = cur.var(int)
+                cur.execute("""
+                    INSERT INTO JOBS (
+                        USER_ID, FILE_ID, JOB_TYPE, JOB_PARAMS, JOB_TIMEOUT_DATE
+                    ) VALUES (
+                        :user_id, :file_id, :job_type, :job_params,
+                        SYSTIMESTAMP + NUMTODSINTERVAL(:timeout, 'SECOND')
+                    ) RETURNING JOB_ID INTO :job_id
+                """, {
+                    "user_id": user_id,
+                    "file_id": file_id,
+                    "job_type": job_type,
+                    "job_params": json.dumps(job_params, ensure_ascii=False),
+                    "timeout": int(timeout),
+                    "job_id": job_id_var
+                })
+            conn.commit()
+        return job_id_var.getvalue()[0]
+
+    def claim_job(self, job_id, lease):
+        """
+        Takes the lease of an active job so only one worker polls it.
+
+        Args:
+            job_id (int): The job ID.
+            lease (int): Seconds the lease lasts; the owner renews it on every poll.
+
+        Returns:
+            bool: True if this worker owns the job now.
+        """
+        with self.conn_instance.acquire() as conn:
+            with conn.cursor() as cur:
+                cur.execute("""
+                    UPDATE JOBS SET
+                        JOB_LEASE_DATE  = SYSTIMESTAMP + NUMTODSINTERVAL(:lease, 'SECOND'),
+                        JOB_UPDATE_DATE = SYSTIMESTAMP
+                    WHERE JOB_ID = :job_id
+                    AND JOB_STATE IN ('SUBMITTED', 'RUNNING')
+                    AND (JOB_LEASE_DATE IS NULL OR JOB_LEASE_DATE < SYSTIMESTAMP)
+                """, {"job_id": job_id, "lease": int(lease)})
+                claimed = cur.rowcount == 1
+            conn.commit()
+        return claimed
+
+    def update_job(self, job_id, job_state, job_oci_id=None, job_message=None, job_attempts=None, lease=None, job_params=None):
+        """
+        Updates the state of a job (and optionally its OCI id, message, attempts, lease and params).
+        SUCCEEDED and FAILED set JOB_END_DATE and release the lease.
+        """
+        with self.conn_instance.acquire() as conn:
+            with conn.cursor() as cur:
+                cur.execute("""
+                    UPDATE JOBS SET
+                        JOB_STATE       = :job_state,
+                        JOB_OCI_ID      = NVL(:job_oci_id, JOB_OCI_ID),
+                        JOB_PARAMS      = NVL(:job_params, JOB_PARAMS),
+                        JOB_MESSAGE     = NVL(:job_message, JOB_MESSAGE),
+                        JOB_ATTEMPTS    = NVL(:job_attempts, JOB_ATTEMPTS),
+                        JOB_LEASE_DATE  = CASE
+                                            WHEN :job_state IN ('SUCCEEDED', 'FAILED') THEN NULL
+                                            WHEN :lease IS NOT NULL THEN SYSTIMESTAMP + NUMTODSINTERVAL(:lease, 'SECOND')
+                                            ELSE JOB_LEASE_DATE
+                                          END,
+                        JOB_END_DATE    = CASE WHEN :job_state IN ('SUCCEEDED', 'FAILED') THEN SYSTIMESTAMP END,
+                        JOB_UPDATE_DATE = SYSTIMESTAMP
+                    WHERE JOB_ID = :job_id
+                """, {
+                    "job_state": job_state,
+                    "job_oci_id": job_oci_id,
+                    "job_params": json.dumps(job_params, ensure_ascii=False) if job_params is not None else None,
+                    "job_message": job_message[:4000] if job_message else None,
+                    "job_attempts": job_attempts,
+                    "lease": lease,
+                    "job_id": job_id
+                })
+            conn.commit()
+
+    def get_job(self, job_id):
+        """
+        Returns a job as a dict (JOB_PARAMS parsed) or None.
+        """
+        with self.conn_instance.acquire() as conn:
+            with conn.cursor() as cur:
+                cur.execute("""
+                    SELECT
+                        JOB_ID, USER_ID, FILE_ID, JOB_TYPE, JOB_STATE, JOB_PARAMS, JOB_OCI_ID,
+                        JOB_MESSAGE, JOB_ATTEMPTS, JOB_DATE,
+                        CASE WHEN JOB_TIMEOUT_DATE < SYSTIMESTAMP THEN 1 ELSE 0 END AS TIMED_OUT
+                    FROM JOBS
+                    WHERE JOB_ID = :job_id
+                """, {"job_id": job_id})
+                columns = [col[0] for col in cur.description]
+                row = cur.fetchone()
+        if row is None:
+            return None
+
+        job = dict(zip(columns, row))
+        params = job["JOB_PARAMS"]
+        params = params.read() if hasattr(params, "read") else params
+        job["JOB_PARAMS"] = json.loads(params) if params else {}
+        return job
+
+    def get_jobs(self, user_id, limit=20):
+        """
+        Latest jobs of a user (for the Knowledge page).
+
+        Returns:
+            pd.DataFrame: JOB_ID, FILE_ID, FILE_SRC_FILE_NAME, JOB_TYPE, JOB_STATE, JOB_MESSAGE,
+            JOB_ATTEMPTS, JOB_DATE, JOB_END_DATE.
+        """
+        with self.conn_instance.acquire() as conn:
+            return pd.read_sql("""
+                SELECT
+                    J.JOB_ID,
+                    J.FILE_ID,
+                    F.FILE_SRC_FILE_NAME,
+                    J.JOB_TYPE,
+                    J.JOB_STATE,
+                    J.JOB_MESSAGE,
+                    J.JOB_ATTEMPTS,
+                    J.JOB_DATE,
+                    J.JOB_END_DATE
+                FROM JOBS J
+                LEFT JOIN FILES F
+                    ON F.FILE_ID = J.FILE_ID
+                WHERE J.USER_ID = :user_id
+                ORDER BY J.JOB_DATE DESC
+                FETCH FIRST :limit ROWS ONLY
+            """, con=conn, params={"user_id": user_id, "limit": int(limit)})
+
+    def get_orphan_jobs(self):
+        """
+        IDs of active jobs whose lease expired (their worker stopped), to be resumed.
+        """
+        with self.conn_instance.acquire() as conn:
+            with conn.cursor() as cur:
+                cur.execute("""
+                    SELECT JOB_ID
+                    FROM JOBS
+                    WHERE JOB_STATE IN ('SUBMITTED', 'RUNNING')
+                    AND (JOB_LEASE_DATE IS NULL OR JOB_LEASE_DATE < SYSTIMESTAMP)
+                    ORDER BY JOB_ID
+                """)
+                return [job_id for (job_id,) in cur]
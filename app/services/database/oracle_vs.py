@@ -1,35 +1,85 @@
 # app/services/database/oracle_vs.py
 from __future__ import annotations
 import logging
-from typing import Any, Iterable, List, Optional, Type, Dict
+import numbers
+import re
+from typing import Any, Iterable, List, Optional, Type, Dict, Tuple
 import oracledb
 from langchain_core.embeddings import Embeddings
 from langchain_core.vectorstores import VectorStore
 from langchain_core.documents import Document
-import array
 import json
+from functools import lru_cache
+
+from services.database import vector_codec
+from services.database.connection import Connection, output_type_handler
+from services.database.query_embedding_cache import QueryEmbeddingCache
 
 logger = logging.getLogger(__name__)
 
+# Claves de filtro que son columnas reales de la tabla; el resto se evalúa con JSON_VALUE(metadata)
+FILTER_COLUMNS = ("file_id",)
+FILTER_KEY_PATTERN = re.compile(r"^[A-Za-z_][A-Za-z0-9_]*$")
+FILTER_MODES = ("pre", "post")
+SEARCH_MODES = ("exact", "approx")
+# Metadatas JSON distintas (archivo + usuario + versión) parseadas en memoria
+METADATA_CACHE_SIZE = 1024
+
 class OracleVS(VectorStore):
     """Oracle AI Vector Search Wrapper compatible con OCI."""
-    
+
     def __init__(
         self,
-        client: oracledb.Connection,
+        client: Optional[oracledb.Connection],
         embedding_function: Embeddings,
         table_name: str,
         distance_strategy: str = "COSINE",
         query: Optional[str] = None,
         params: Optional[Dict[str, Any]] = None,
+        async_client: Optional[Any] = None,
+        filter_mode: str = "pre",
+        post_filter_factor: int = 10,
+        search_mode: str = "exact",
+        target_accuracy: Optional[int] = None,
+        vector_format: str = "float32",
     ):
-        self.client = client
+        # None: cada búsqueda usa la conexión del hilo (la del acquire() en curso, si lo hay)
+        self._client = client
         self.embedding_function = embedding_function
         self.table_name = table_name
         self.distance_strategy = distance_strategy
         self.query = query
         self.params = params
+        # AsyncConnection (services.database.connection_async) para asimilarity_search
+        self.async_client = async_client
+        # Caché LRU+TTL de embeddings de consulta compartida por todo el proceso
+        self.query_cache = QueryEmbeddingCache()
+        # pre: el filtro va en el WHERE de la búsqueda (coste proporcional al corpus filtrado)
+        # post: se ordenan k * post_filter_factor candidatos y luego se filtra
+        if filter_mode not in FILTER_MODES:
+            raise ValueError(f"filter_mode must be one of {FILTER_MODES}")
+        self.filter_mode = filter_mode
+        self.post_filter_factor = post_filter_factor
+        # exact: VECTOR_DISTANCE sobre todas las filas; approx: índice vectorial (docs_hnsw_idx)
+        if search_mode not in SEARCH_MODES:
+            raise ValueError(f"search_mode must be one of {SEARCH_MODES}")
+        if target_accuracy is not None and not 0 < int(target_accuracy) <= 100:
+            raise ValueError("target_accuracy must be between 1 and 100")
+        self.search_mode = search_mode
+        self.target_accuracy = int(target_accuracy) if target_accuracy is not None else None
+        # Formato de DOCS.embedding (float32 | int8 | binary); la consulta se codifica igual
+        self.vector_format = vector_codec.get_vector_format(vector_format)
 
+    @property
+    def client(self) -> oracledb.Connection:
+        """
+        Connection of the searches: the one given to the constructor or, without one,
+        Connection().get_connection() resolved on every call (inside an acquire() block,
+        the connection of that block).
+        """
+        if self._client is not None:
+            return self._client
+        return Connection().get_connection()
     def add_texts(
         self,
         texts: Iterable[str],
@@ -38,68 +88,270 @@ class OracleVS(VectorStore):
     ) -> List[str]:
         return []
 
+    @staticmethod
+    def _filter_sql(
+        filter: Optional[Dict[str, Any]], conditions: Optional[List[str]] = None
+    ) -> Tuple[str, Dict[str, Any]]:
+        """
+        Traduce el filtro de LangChain a un WHERE con binds.
+
+        Acepta {"file_id": 1}, {"file_id": [1, 2]} o {"module_id": {"$in": [...]}}; las
+        claves se combinan con AND y las de FILTER_COLUMNS usan la columna real.
+        ``conditions`` agrega predicados SQL propios (p. ej. CONTAINS) al mismo WHERE.
+        """
+        clauses, binds = list(conditions or []), {}
+        if not filter and not clauses:
+            return "", {}
+
+        for i, (key, value) in enumerate((filter or {}).items()):
+            if not FILTER_KEY_PATTERN.match(key):
+                raise ValueError(f"Invalid filter key: {key}")
+            if isinstance(value, dict):
+                value = value.get("$in", value.get("$eq"))
+            values = list(value) if isinstance(value, (list, tuple, set)) else [value]
+            if not values:
+                clauses.append("1 = 0")
+                continue
+
+            names = []
+            for j, item in enumerate(values):
+                name = f"f_{i}_{j}"
+                # numpy.int64 no se puede enlazar directamente
+                binds[name] = int(item) if isinstance(item, numbers.Integral) else item
+                names.append(f":{name}")
+
+            numeric = all(
+                isinstance(item, numbers.Number) and not isinstance(item, bool) for item in values
+            )
+            if key.lower() in FILTER_COLUMNS:
+                column = key.lower()
+            else:
+                column = f"JSON_VALUE(metadata, '$.{key}'{' RETURNING NUMBER' if numeric else ''})"
+            clauses.append(f"{column} IN ({', '.join(names)})")
+
+        return "WHERE " + " AND ".join(clauses), binds
+
+    def _fetch_sql(self, rows: str) -> str:
+        """Cláusula FETCH según el modo de búsqueda."""
+        if self.search_mode == "exact":
+            return f"FETCH EXACT FIRST {rows} ROWS ONLY"
+        accuracy = f" WITH TARGET ACCURACY {self.target_accuracy}" if self.target_accuracy else ""
+        return f"FETCH APPROX FIRST {rows} ROWS ONLY{accuracy}"
+
+    def _search_sql(
+        self,
+        embedding: Any,
+        k: int,
+        filter: Optional[Dict[str, Any]] = None,
+        embedding_bind: str = "embedding",
+        with_embedding: bool = False,
+    ) -> Tuple[str, Dict[str, Any]]:
+        """SQL de búsqueda vectorial (usa 'embedding') con sus binds."""
+        where, binds = self._filter_sql(filter)
+        # with_embedding: devuelve también el vector de cada fila (rerank / MMR)
+        columns = "id, text, metadata, embedding" if with_embedding else "id, text, metadata"
+        binds.update({embedding_bind: vector_codec.encode(embedding, self.vector_format), "k": k})
+        distance = f"VECTOR_DISTANCE(embedding, :{embedding_bind}, {self.distance_strategy})"
+
+        if where and self.filter_mode == "post":
+            binds["candidates"] = k * self.post_filter_factor
+            return f"""
+                SELECT {columns}
+                FROM (
+                    SELECT id, file_id, text, metadata, embedding, {distance} AS distance
+                    FROM {self.table_name}
+                    ORDER BY distance
+                    {self._fetch_sql(":candidates")}
+                )
+                {where}
+                ORDER BY distance
+                FETCH FIRST :k ROWS ONLY
+            """, binds
+
+        return f"""
+            SELECT {columns}
+            FROM {self.table_name}
+            {where}
+            ORDER BY {distance}
+            {self._fetch_sql(":k")}
+        """, binds
+
+    @staticmethod
+    @lru_cache(maxsize=METADATA_CACHE_SIZE)
+    def _parse_metadata(meta_str: str) -> Dict[str, Any]:
+        """
+        Parsea el JSON de metadata una sola vez por valor distinto.
+
+        La metadata de DOCS es la misma para todos los chunks de un archivo y usuario
+        (incluye file_id y file_version), así que los resultados repiten pocas cadenas.
+        """
+        try:
+            # Intentamos parsear si parece un JSON
+            if meta_str.strip().startswith("{"):
+                return json.loads(meta_str)
+        except json.JSONDecodeError:
+            pass
+        return {"content": meta_str}
+
+    @classmethod
+    def _to_document(cls, page_content: Any, meta_str: Any, doc_id: Any = None) -> Document:
+        """Crea un Document de LangChain a partir del texto y metadata ya leídos."""
+        page_content = str(page_content) if page_content else ""
+        meta_str = str(meta_str) if meta_str else ""
+
+        # Copia: cada Document puede modificar su metadata sin afectar a la caché
+        meta = dict(cls._parse_metadata(meta_str)) if meta_str else {}
+        return Document(
+            id=str(doc_id) if doc_id is not None else None, page_content=page_content, metadata=meta
+        )
+
+    @staticmethod
+    def _prepare_cursor(cursor: Any, rows: int) -> None:
+        """
+        CLOBs como str y todas las filas en el mismo round-trip que el execute.
+        """
+        cursor.outputtypehandler = output_type_handler
+        cursor.arraysize = max(rows, 1)
+        cursor.prefetchrows = rows + 1
+
     def similarity_search(
         self, query: str, k: int = 4, **kwargs: Any
     ) -> List[Document]:
         """Realiza búsqueda vectorial usando Oracle 23ai."""
-        embedding = self.embedding_function.embed_query(query)
-        
-        # SQL corregido (usa 'embedding')
-        sql = f"""
-            SELECT id, text, metadata 
-            FROM {self.table_name}
-            ORDER BY VECTOR_DISTANCE(embedding, :embedding, {self.distance_strategy})
-            FETCH FIRST :k ROWS ONLY
-        """
-        
-        # Convertir embedding a array float
-        embedding_array = array.array("f", embedding)
+        embedding = self.query_cache.get_or_embed(self.embedding_function, query)
+        sql, binds = self._search_sql(embedding, k, kwargs.get("filter"))
 
         cursor = self.client.cursor()
         try:
-            cursor.execute(sql, embedding=embedding_array, k=k)
-            
-            docs = []
-            for row in cursor:
-                # row[0]=id, row[1]=text (CLOB), row[2]=metadata (CLOB)
-                
-                # --- CORRECCIÓN CLOB TEXTO ---
-                text_obj = row[1]
-                if hasattr(text_obj, "read"): # Si es un LOB, leerlo
-                    page_content = text_obj.read()
-                else:
-                    page_content = str(text_obj) if text_obj else ""
-
-                # --- CORRECCIÓN CLOB METADATA ---
-                meta_obj = row[2]
-                meta_str = ""
-                if hasattr(meta_obj, "read"): # Si es un LOB, leerlo
-                    meta_str = meta_obj.read()
-                else:
-                    meta_str = str(meta_obj) if meta_obj else ""
-
-                # Parsear JSON de metadata
-                meta = {}
-                if meta_str:
-                    try:
-                        # Intentamos parsear si parece un JSON
-                        if meta_str.strip().startswith("{"):
-                            meta = json.loads(meta_str)
-                        else:
-                            meta = {"content": meta_str}
-                    except json.JSONDecodeError:
-                        meta = {"content": meta_str}
-                
-                # Crear documento compatible con LangChain
-                docs.append(Document(page_content=page_content, metadata=meta))
-                
-            return docs
+            self._prepare_cursor(cursor, k)
+            cursor.execute(sql, binds)
+
+            # row[0]=id, row[1]=text, row[2]=metadata (CLOB ya leídos como str)
+            return [self._to_document(text, meta_str, doc_id) for doc_id, text, meta_str in cursor]
         except Exception as e:
             logger.error(f"Error en similarity_search: {e}")
             raise e
         finally:
             cursor.close()
 
+    def similarity_search_with_embeddings(
+        self, query: str, k: int = 4, **kwargs: Any
+    ) -> Tuple[List[float], List[Tuple[Document, Any]]]:
+        """
+        Búsqueda vectorial que devuelve, junto a cada Document, su vector almacenado
+        (array.array) y el embedding de la consulta, para reordenar sin más llamadas.
+        """
+        embedding = self.query_cache.get_or_embed(self.embedding_function, query)
+        sql, binds = self._search_sql(embedding, k, kwargs.get("filter"), with_embedding=True)
+
+        cursor = self.client.cursor()
+        try:
+            self._prepare_cursor(cursor, k)
+            cursor.execute(sql, binds)
+            return embedding, [
+                (self._to_document(text, meta_str, doc_id), vector)
+                for doc_id, text, meta_str, vector in cursor
+            ]
+        except Exception as e:
+            logger.error(f"Error en similarity_search_with_embeddings: {e}")
+            raise e
+        finally:
+            cursor.close()
+
+    def get_embeddings_by_ids(self, ids: List[Any]) -> Dict[str, Any]:
+        """Vectores almacenados de las filas indicadas, por id (str)."""
+        if not ids:
+            return {}
+        binds = {f"id_{i}": int(doc_id) for i, doc_id in enumerate(dict.fromkeys(ids))}
+
+        cursor = self.client.cursor()
+        try:
+            self._prepare_cursor(cursor, len(binds))
+            cursor.execute(f"""
+                SELECT id, embedding
+                FROM {self.table_name}
+                WHERE id IN ({', '.join(':' + name for name in binds)})
+            """, binds)
+            return {str(doc_id): vector for doc_id, vector in cursor}
+        finally:
+            cursor.close()
+
+    def similarity_search_batch(
+        self, queries: List[str], k: int = 4, batch_size: int = 16, **kwargs: Any
+    ) -> List[List[Document]]:
+        """
+        Búsqueda vectorial de varias consultas: un único embed_documents para todas y una
+        sentencia UNION ALL por cada ``batch_size`` consultas (un round-trip por grupo).
+
+        Returns:
+            list[list[Document]]: Resultados en el mismo orden que ``queries``.
+        """
+        if not queries:
+            return []
+
+        embeddings = self.query_cache.get_or_embed_many(self.embedding_function, queries)
+        results: List[List[Document]] = []
+
+        cursor = self.client.cursor()
+        try:
+            for start in range(0, len(embeddings), batch_size):
+                group = embeddings[start:start + batch_size]
+                parts, binds = [], {}
+                for i, embedding in enumerate(group):
+                    sql, query_binds = self._search_sql(
+                        embedding, k, kwargs.get("filter"), embedding_bind=f"embedding_{i}"
+                    )
+                    # ROWNUM sobre la vista ordenada conserva el ranking de cada consulta
+                    parts.append(f"""
+                        SELECT {i} AS query_idx, ROWNUM AS query_rank, id, text, metadata
+                        FROM ({sql})
+                    """)
+                    binds.update(query_binds)
+
+                self._prepare_cursor(cursor, k * len(group))
+                cursor.execute(
+                    " UNION ALL ".join(parts) + " ORDER BY query_idx, query_rank", binds
+                )
+
+                grouped: List[List[Document]] = [[] for _ in group]
+                for query_idx, _, doc_id, text, meta_str in cursor:
+                    grouped[query_idx].append(self._to_document(text, meta_str, doc_id))
+                results.extend(grouped)
+
+            return results
+        except Exception as e:
+            logger.error(f"Error en similarity_search_batch: {e}")
+            raise e
+        finally:
+            cursor.close()
+
+    async def asimilarity_search(
+        self, query: str, k: int = 4, **kwargs: Any
+    ) -> List[Document]:
+        """
+        Versión awaitable de similarity_search sobre el pool asíncrono.
+        Sin async_client se delega a la implementación por defecto (executor).
+        """
+        if self.async_client is None:
+            return await super().asimilarity_search(query, k=k, **kwargs)
+
+        embedding = await self.query_cache.aget_or_embed(self.embedding_function, query)
+        sql, binds = self._search_sql(embedding, k, kwargs.get("filter"))
+
+        async with self.async_client.acquire() as conn:
+            cursor = conn.cursor()
+            try:
+                self._prepare_cursor(cursor, k)
+                await cursor.execute(sql, binds)
+                rows = await cursor.fetchall()
+
+                return [self._to_document(text, meta_str, doc_id) for doc_id, text, meta_str in rows]
+            except Exception as e:
+                logger.error(f"Error en asimilarity_search: {e}")
+                raise e
+            finally:
+                cursor.close()
+
     @classmethod
     def from_texts(cls, *args, **kwargs):
         raise NotImplementedError("Usar constructor directo init")
@@ -0,0 +1,200 @@
+import os
+import time
+import array
+import sqlite3
+import hashlib
+import threading
+from collections import OrderedDict
+
+from dotenv import load_dotenv
+
+load_dotenv()
+
+class QueryEmbeddingCache:
+    """
+    In-process LRU + TTL cache for query embeddings, so repeated questions skip the
+    GenAI embedding round-trip.
+
+    When ``CON_GEN_AI_EMB_QUERY_CACHE_DIR`` is set, entries are also stored in a SQLite
+    file in that folder, shared by every Streamlit worker on the host.
+
+    Entries are keyed by input type too: ``embed_query`` and ``embed_documents`` vectors
+    differ on asymmetric models (e.g. Cohere ``search_query`` / ``search_document``), so
+    batched lookups never serve or overwrite single-query embeddings.
+    """
+    _instance = None
+    _lock = threading.Lock()
+
+    def __new__(cls):
+        if cls._instance is None:
+            with cls._lock:
+                if cls._instance is None:
+                    instance = super(QueryEmbeddingCache, cls).__new__(cls)
+                    instance.maxsize = int(os.getenv('CON_GEN_AI_EMB_QUERY_CACHE_SIZE', 1024))
+                    instance.ttl     = int(os.getenv('CON_GEN_AI_EMB_QUERY_CACHE_TTL', 3600))
+                    instance._items  = OrderedDict()
+                    instance._stats  = {"hits": 0, "disk_hits": 0, "misses": 0, "evictions": 0}
+                    instance._mutex  = threading.Lock()
+                    instance._db_path = None
+                    cache_dir = os.getenv('CON_GEN_AI_EMB_QUERY_CACHE_DIR')
+                    if cache_dir:
+                        os.makedirs(cache_dir, exist_ok=True)
+                        instance._db_path = os.path.join(cache_dir, "query_embeddings.sqlite")
+                        instance._init_disk()
+                    cls._instance = instance
+        return cls._instance
+
+    @staticmethod
+    def get_key(model_id, query, input_type="query"):
+        """
+        Cache key: embedding model, input type ("query" or "document") plus the query with
+        whitespace normalized (case is kept: the embedding model is case-sensitive).
+        """
+        normalized = " ".join(str(query).split())
+        return hashlib.sha256(f"{model_id}\n{input_type}\n{normalized}".encode("utf-8")).hexdigest()
+
+    def _connect(self):
+        conn = sqlite3.connect(self._db_path, timeout=5)
+        conn.execute("PRAGMA journal_mode=WAL")
+        return conn
+
+    def _init_disk(self):
+        with self._connect() as conn:
+            conn.execute("""
+                CREATE TABLE IF NOT EXISTS query_embeddings (
+                    key        TEXT PRIMARY KEY,
+                    embedding  BLOB NOT NULL,
+                    created    REAL NOT NULL
+                )
+            """)
+
+    def _get_disk(self, key):
+        try:
+            with self._connect() as conn:
+                row = conn.execute(
+                    "SELECT embedding, created FROM query_embeddings WHERE key = ?", (key,)
+                ).fetchone()
+        except sqlite3.Error:
+            return None
+        if row is None or time.time() - row[1] > self.ttl:
+            return None
+        embedding = array.array("f")
+        embedding.frombytes(row[0])
+        return embedding.tolist(), row[1]
+
+    def _put_disk(self, key, embedding, created):
+        try:
+            with self._connect() as conn:
+                conn.execute(
+                    "INSERT OR REPLACE INTO query_embeddings (key, embedding, created) VALUES (?, ?, ?)",
+                    (key, array.array("f", embedding).tobytes(), created)
+                )
+        except sqlite3.Error:
+            pass
+
+    def get(self, model_id, query, input_type="query"):
+        """
+        Returns the cached embedding or None.
+        """
+        key = self.get_key(model_id, query, input_type)
+        now = time.time()
+        with self._mutex:
+            item = self._items.get(key)
+            if item is not None:
+                embedding, created = item
+                if now - created <= self.ttl:
+                    self._items.move_to_end(key)
+                    self._stats["hits"] += 1
+                    return embedding
+                del self._items[key]
+
+        if self._db_path:
+            item = self._get_disk(key)
+            if item is not None:
+                self._store(key, *item)
+                with self._mutex:
+                    self._stats["disk_hits"] += 1
+                return item[0]
+
+        with self._mutex:
+            self._stats["misses"] += 1
+        return None
+
+    def _store(self, key, embedding, created):
+        with self._mutex:
+            self._items[key] = (embedding, created)
+            self._items.move_to_end(key)
+            while len(self._items) > self.maxsize:
+                self._items.popitem(last=False)
+                self._stats["evictions"] += 1
+
+    def put(self, model_id, query, embedding, input_type="query"):
+        """
+        Stores an embedding in memory (and on disk when enabled).
+        """
+        key     = self.get_key(model_id, query, input_type)
+        created = time.time()
+        embedding = list(embedding)
+        self._store(key, embedding, created)
+        if self._db_path:
+            self._put_disk(key, embedding, created)
+
+    def get_or_embed(self, embedding_function, query):
+        """
+        Returns the query embedding, calling ``embed_query`` only on a cache miss.
+        """
+        model_id  = getattr(embedding_function, "model_id", None)
+        embedding = self.get(model_id, query)
+        if embedding is None:
+            embedding = embedding_function.embed_query(query)
+            self.put(model_id, query, embedding)
+        return embedding
+
+    def get_or_embed_many(self, embedding_function, queries):
+        """
+        Returns the embeddings of several queries in input order, embedding all the
+        misses (deduplicated) in a single ``embed_documents`` call. Those vectors are
+        cached as "document" entries, apart from the ``embed_query`` ones of get_or_embed.
+        """
+        model_id   = getattr(embedding_function, "model_id", None)
+        embeddings = [self.get(model_id, query, "document") for query in queries]
+        missing    = list(dict.fromkeys(q for q, e in zip(queries, embeddings) if e is None))
+        if missing:
+            new_embeddings = dict(zip(missing, embedding_function.embed_documents(missing)))
+            for query, embedding in new_embeddings.items():
+                self.put(model_id, query, embedding, "document")
+            embeddings = [new_embeddings[q] if e is None else e for q, e in zip(queries, embeddings)]
+        return embeddings
+
+    async def aget_or_embed(self, embedding_function, query):
+        """
+        Awaitable version of get_or_embed (uses ``aembed_query`` on a miss).
+        """
+        model_id  = getattr(embedding_function, "model_id", None)
+        embedding = self.get(model_id, query)
+        if embedding is None:
+            embedding = await embedding_function.aembed_query(query)
+            self.put(model_id, query, embedding)
+        return embedding
+
+    def get_stats(self):
+        """
+        Hit/miss counters of the cache.
+
+        Returns:
+            dict: hits, disk_hits, misses, evictions, size and hit_rate.
+        """
+        with self._mutex:
+            stats = dict(self._stats)
+            stats["size"] = len(self._items)
+        lookups = stats["hits"] + stats["disk_hits"] + stats["misses"]
+        stats["hit_rate"] = (stats["hits"] + stats["disk_hits"]) / lookups if lookups else 0.0
+        return stats
+
+    def clear(self):
+        """
+        Empties the in-memory cache and resets the counters.
+        """
+        with self._mutex:
+            self._items.clear()
+            self._stats = {"hits": 0, "disk_hits": 0, "misses": 0, "evictions": 0}
@@ -0,0 +1,160 @@
+# app/services/database/rerank_retriever.py
+from __future__ import annotations
+import time
+import logging
+from typing import Any, Callable, Dict, List, Optional
+
+import numpy as np
+from pydantic import ConfigDict
+from langchain_core.callbacks import CallbackManagerForRetrieverRun
+from langchain_core.documents import Document
+from langchain_core.retrievers import BaseRetriever
+
+from services.database import vector_codec
+from services.database.hybrid_retriever import get_terms
+from services.database.oracle_vs import OracleVS
+
+logger = logging.getLogger(__name__)
+
+
+def _normalize(matrix: np.ndarray) -> np.ndarray:
+    norms = np.linalg.norm(matrix, axis=-1, keepdims=True)
+    return matrix / np.where(norms == 0, 1, norms)
+
+
+def rerank(
+    query: str,
+    query_embedding: Any,
+    documents: List[Document],
+    embeddings: List[Any],
+    top_n: int,
+    lambda_mult: float = 0.7,
+    overlap_weight: float = 0.2,
+    vector_format: str = "float32",
+) -> List[Document]:
+    """
+    Reordena candidatos en CPU y devuelve los ``top_n`` mejores.
+
+    Relevancia = (1 - overlap_weight) * coseno(consulta, chunk) + overlap_weight * fracción
+    de términos de la consulta presentes en el chunk. La selección final es MMR
+    (Maximal Marginal Relevance): ``lambda_mult * relevancia - (1 - lambda_mult) * máxima
+    similitud con los chunks ya elegidos``, para no repetir chunks casi iguales.
+
+    Args:
+        query (str): Texto de la consulta.
+        query_embedding (list[float]): Embedding de la consulta.
+        documents (list[Document]): Candidatos.
+        embeddings (list): Vector almacenado de cada candidato (None si no se tiene).
+        top_n (int): Cantidad de documentos a devolver.
+        lambda_mult (float): 1 = solo relevancia, 0 = solo diversidad.
+        overlap_weight (float): Peso del solapamiento de términos en la relevancia.
+        vector_format (str): Formato de los vectores (float32, int8 o binary).
+
+    Returns:
+        list[Document]: Documentos elegidos, con ``rerank_score`` en la metadata.
+    """
+    if not documents:
+        return []
+
+    # La consulta se codifica como los chunks para compararla en el mismo espacio
+    query_vector = _normalize(vector_codec.to_dense(vector_codec.encode(query_embedding, vector_format)))
+    dimension = query_vector.shape[0]
+    matrix = _normalize(np.stack([
+        vector_codec.to_dense(vector) if vector is not None else np.zeros(dimension, dtype=np.float32)
+        for vector in embeddings
+    ]))
+
+    query_terms = set(get_terms(query))
+    overlap = np.array([
+        len(query_terms & set(get_terms(doc.page_content))) / len(query_terms) if query_terms else 0.0
+        for doc in documents
+    ], dtype=np.float32)
+    relevance = (1 - overlap_weight) * (matrix @ query_vector) + overlap_weight * overlap
+
+    similarity = matrix @ matrix.T
+    selected: List[int] = []
+    remaining = list(range(len(documents)))
+    while remaining and len(selected) < top_n:
+        if selected:
+            redundancy = similarity[np.ix_(remaining, selected)].max(axis=1)
+            scores = lambda_mult * relevance[remaining] - (1 - lambda_mult) * redundancy
+        else:
+            scores = relevance[remaining]
+        best = remaining.pop(int(np.argmax(scores)))
+        selected.append(best)
+
+    reranked = []
+    for i in selected:
+        doc = documents[i]
+        doc.metadata["rerank_score"] = float(relevance[i])
+        reranked.append(doc)
+    return reranked
+
+
+class RerankRetriever(BaseRetriever):
+    """
+    Recupera un conjunto amplio de candidatos (``candidates``) y deja pasar al LLM solo
+    los ``top_n`` mejores según ``rerank``.
+
+    Sin ``base_retriever`` los candidatos salen de ``OracleVS`` con sus vectores en el
+    mismo round-trip; con uno (p. ej. ``OracleHybridRetriever``) los vectores se leen
+    por id en una sola consulta.
+
+    ``on_timing(stage, ms)`` recibe la duración de cada etapa: retrieve, embeddings
+    (solo con base_retriever) y rerank.
+    """
+
+    model_config = ConfigDict(arbitrary_types_allowed=True)
+
+    vector_store: OracleVS
+    base_retriever: Optional[BaseRetriever] = None
+    candidates: int = 30
+    top_n: int = 4
+    filter: Optional[Dict[str, Any]] = None
+    lambda_mult: float = 0.7
+    overlap_weight: float = 0.2
+    on_timing: Optional[Callable[[str, float], None]] = None
+
+    def _timing(self, stage: str, start: float) -> float:
+        elapsed_ms = (time.perf_counter() - start) * 1000
+        logger.debug(f"Rerank {stage}: {elapsed_ms:.1f} ms")
+        if self.on_timing is not None:
+            self.on_timing(stage, elapsed_ms)
+        return time.perf_counter()
+
+    def _get_relevant_documents(
+        self, query: str, *, run_manager: CallbackManagerForRetrieverRun
+    ) -> List[Document]:
+        store = self.vector_store
+        start = time.perf_counter()
+
+        if self.base_retriever is None:
+            query_embedding, rows = store.similarity_search_with_embeddings(
+                query, k=self.candidates, filter=self.filter
+            )
+            documents = [doc for doc, _ in rows]
+            embeddings = [vector for _, vector in rows]
+            start = self._timing("retrieve", start)
+        else:
+            documents = self.base_retriever.invoke(
+                query, config={"callbacks": run_manager.get_child()}
+            )
+            start = self._timing("retrieve", start)
+            # El embedding de la consulta ya está en QueryEmbeddingCache (rama vectorial)
+            query_embedding = store.query_cache.get_or_embed(store.embedding_function, query)
+            vectors = store.get_embeddings_by_ids([doc.id for doc in documents if doc.id])
+            embeddings = [vectors.get(doc.id) for doc in documents]
+            start = self._timing("embeddings", start)
+
+        reranked = rerank(
+            query,
+            query_embedding,
+            documents,
+            embeddings,
+            top_n          = self.top_n,
+            lambda_mult    = self.lambda_mult,
+            overlap_weight = self.overlap_weight,
+            vector_format  = store.vector_format
+        )
+        self._timing("rerank", start)
+        return reranked
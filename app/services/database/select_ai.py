@@ -1,11 +1,71 @@
+import os
+import time
+import hashlib
+import threading
+from collections import OrderedDict
+
 import streamlit as st
 import pandas as pd
 import oracledb
 from services.database.connection import Connection
 
+# Messages by language (simple and direct)
+CHAT_LANGUAGE_MESSAGES = {
+    "Spanish": (
+        "Lo siento, no se pudo generar una sentencia SQL válida para tu solicitud. "
+        "Revisa la consulta e inténtalo de nuevo.",
+        "Error al generar la respuesta: "
+    ),
+    "Portuguese": (
+        "Desculpe, não foi possível gerar uma instrução SQL válida para sua solicitação. "
+        "Revise a consulta e tente novamente.",
+        "Erro ao gerar a resposta: "
+    ),
+    "English": (
+        "Sorry, a valid SQL statement could not be generated for your request. "
+        "Please review your query and try again.",
+        "Error while generating the response: "
+    )
+}
+
+CHAT_GENERIC_SORRY = "Sorry, unfortunately a valid SELECT statement could not be generated"
+
+# PL/SQL block that captures exceptions and returns the CLOB as is
+GET_CHAT_QUERY = """
+    DECLARE
+        l_sql CLOB;
+    BEGIN
+        BEGIN
+            l_sql := DBMS_CLOUD_AI.GENERATE(
+                prompt       => :prompt_text,
+                profile_name => :profile_name,
+                action       => :action
+            );
+            :out_response := l_sql;
+        EXCEPTION
+            WHEN OTHERS THEN
+                :out_response := :error_prefix || SQLERRM;
+        END;
+    END;
+"""
+
+# Filas del resultado que se envían al LLM para narrarlo (get_chat_with_sql)
+NARRATE_MAX_ROWS = 50
+
+# Exact-match cache of DBMS_CLOUD_AI.GENERATE, shared by every session of the process:
+# (profile, action, prompt, language, prompt_extra, schema version) -> (response, expires_at)
+_chat_cache = OrderedDict()
+_chat_cache_lock = threading.Lock()
+_chat_cache_stats = {"hits": 0, "misses": 0}
+
+
 class SelectAIService:
     """
     Service class for managing Select AI operations.
+
+    ``get_chat`` results are cached in memory (``CON_ADB_SEL_AI_CACHE``) keyed by profile,
+    action, normalized prompt, language and the schema version of the user's tables, for
+    ``CON_ADB_SEL_AI_CACHE_TTL`` seconds. Error responses are never cached.
     """
 
     def __init__(self):
@@ -242,24 +302,13 @@ class SelectAIService:
             cur.execute(query)
         self.conn.commit()
     
-    def get_chat(
-            self,
-            prompt,
-            profile_name,
-            action,
-            language,
-            prompt_extra=None
-        ):
+    @staticmethod
+    def _build_chat_request(prompt, language, prompt_extra=None):
         """
-        Generates a response using Select AI profile with controlled
-        error handling and messages in the chosen language.
-        
-        Args:
-            prompt (str): The user's message.
-            profile_name (str): The Select AI profile name.
-            action (str): The action to perform.
-            language (str): The response language.
-            prompt_extra (str, optional): Additional instructions for the model.
+        Builds the prompt with instructions and the localized messages used by get_chat.
+
+        Returns:
+            tuple: (prompt_with_instructions, fallback_sorry, error_prefix)
         """
         # Normalize user message to avoid syntax issues
         prompt = prompt.replace("'", "''")
@@ -279,50 +328,140 @@ class SelectAIService:
                 f"{prompt} /** {base_instructions} **/"
             )
 
-        # Messages by language (simple and direct)
-        language_messages = {
-            "Spanish": (
-                "Lo siento, no se pudo generar una sentencia SQL válida para tu solicitud. "
-                "Revisa la consulta e inténtalo de nuevo.",
-                "Error al generar la respuesta: "
-            ),
-            "Portuguese": (
-                "Desculpe, não foi possível gerar uma instrução SQL válida para sua solicitação. "
-                "Revise a consulta e tente novamente.",
-                "Erro ao gerar a resposta: "
-            ),
-            "English": (
-                "Sorry, a valid SQL statement could not be generated for your request. "
-                "Please review your query and try again.",
-                "Error while generating the response: "
-            )
-        }
-        fallback_sorry, error_prefix = language_messages.get(
+        fallback_sorry, error_prefix = CHAT_LANGUAGE_MESSAGES.get(
             language,
-            language_messages["English"]
+            CHAT_LANGUAGE_MESSAGES["English"]
+        )
+        return prompt_with_instructions, fallback_sorry, error_prefix
+
+    @staticmethod
+    def _normalize(text):
+        """
+        Whitespace and case-insensitive form of a prompt, used in the cache key.
+        """
+        return " ".join((text or "").split()).casefold()
+
+    def get_schema_version(self, user_id):
+        """
+        Short hash of the table metadata returned by get_tables (columns, comments and
+        annotations), so loading or altering a table changes the cache key.
+        """
+        if user_id is None:
+            return None
+        df_tables = self.get_tables_cache(user_id)
+        return hashlib.sha256(df_tables.to_csv(index=False).encode("utf-8")).hexdigest()[:16]
+
+    @staticmethod
+    def _get_cache_key(prompt, profile_name, action, language, prompt_extra, schema_version):
+        return (
+            profile_name.upper(),
+            action.lower(),
+            SelectAIService._normalize(prompt),
+            language,
+            SelectAIService._normalize(prompt_extra),
+            schema_version
+        )
+
+    @staticmethod
+    def _cache_get(key):
+        if os.getenv('CON_ADB_SEL_AI_CACHE', 'True').lower() not in ('true', '1', 'yes'):
+            return None
+        with _chat_cache_lock:
+            cached = _chat_cache.get(key)
+            if cached is not None and cached[1] > time.monotonic():
+                _chat_cache.move_to_end(key)
+                _chat_cache_stats["hits"] += 1
+                return cached[0]
+            if cached is not None:
+                del _chat_cache[key]
+            _chat_cache_stats["misses"] += 1
+        return None
+
+    @staticmethod
+    def _cache_put(key, response, fallback_sorry, error_prefix, value=None):
+        if os.getenv('CON_ADB_SEL_AI_CACHE', 'True').lower() not in ('true', '1', 'yes'):
+            return
+        # Los errores y el "Sorry..." localizado se reintentan siempre
+        if not response or response == fallback_sorry or response.startswith(error_prefix):
+            return
+        ttl     = int(os.getenv('CON_ADB_SEL_AI_CACHE_TTL', 900))
+        maxsize = int(os.getenv('CON_ADB_SEL_AI_CACHE_SIZE', 256))
+        with _chat_cache_lock:
+            _chat_cache[key] = (response if value is None else value, time.monotonic() + ttl)
+            _chat_cache.move_to_end(key)
+            while len(_chat_cache) > maxsize:
+                _chat_cache.popitem(last=False)
+
+    @staticmethod
+    def invalidate_chat_cache(profile_name=None):
+        """
+        Drops the cached responses of a profile (all profiles when omitted).
+        Called after a new table is loaded for the profile.
+        """
+        with _chat_cache_lock:
+            if profile_name is None:
+                _chat_cache.clear()
+                return
+            for key in [key for key in _chat_cache if key[0] == profile_name.upper()]:
+                del _chat_cache[key]
+
+    @staticmethod
+    def get_cache_stats():
+        """
+        Hits, misses and size of the Select AI response cache of this process.
+        """
+        with _chat_cache_lock:
+            return {**_chat_cache_stats, "size": len(_chat_cache)}
+
+    @staticmethod
+    def _localize_response(response, fallback_sorry):
+        """
+        Replaces the generic Select AI 'Sorry...' message with the localized message.
+        """
+        response = response or ""
+        if response.startswith(CHAT_GENERIC_SORRY):
+            return fallback_sorry
+        return response
+
+    def get_chat(
+            self,
+            prompt,
+            profile_name,
+            action,
+            language,
+            prompt_extra=None,
+            user_id=None
+        ):
+        """
+        Generates a response using Select AI profile with controlled
+        error handling and messages in the chosen language.
+        
+        Args:
+            prompt (str): The user's message.
+            profile_name (str): The Select AI profile name.
+            action (str): The action to perform.
+            language (str): The response language.
+            prompt_extra (str, optional): Additional instructions for the model.
+            user_id (int, optional): Owner of the profile; adds the schema version to the cache key.
+        """
+        key = self._get_cache_key(
+            prompt, profile_name, action, language, prompt_extra, self.get_schema_version(user_id)
+        )
+        response = self._cache_get(key)
+        if response is not None:
+            return response
+
+        prompt_with_instructions, fallback_sorry, error_prefix = self._build_chat_request(
+            prompt,
+            language,
+            prompt_extra
         )
 
         # Execute a PL/SQL block that captures exceptions and returns the CLOB as is
         with self.conn.cursor() as cur:
             response_var = cur.var(oracledb.CLOB)
             cur.execute(
-                """
-                DECLARE
-                    l_sql CLOB;
-                BEGIN
-                    BEGIN
-                        l_sql := DBMS_CLOUD_AI.GENERATE(
-                            prompt       => :prompt_text,
-                            profile_name => :profile_name,
-                            action       => :action
-                        );
-                        :out_response := l_sql;
-                    EXCEPTION
-                        WHEN OTHERS THEN
-                            :out_response := :error_prefix || SQLERRM;
-                    END;
-                END;
-                """,
+                GET_CHAT_QUERY,
                 prompt_text=prompt_with_instructions,
                 profile_name=profile_name,
                 action=action,
@@ -333,14 +472,70 @@ class SelectAIService:
             response = response_var.getvalue()
             if isinstance(response, oracledb.LOB):
                 response = response.read()
-            response = response or ""
-
-        # If Select AI returned the 'Sorry...' message, replace it with the localized message
-        generic_sorry = "Sorry, unfortunately a valid SELECT statement could not be generated"
-        if response.startswith(generic_sorry):
-            return fallback_sorry
 
+        response = self._localize_response(response, fallback_sorry)
+        self._cache_put(key, response, fallback_sorry, error_prefix)
         return response
+
+    def get_chat_with_sql(
+            self,
+            prompt,
+            profile_name,
+            action,
+            language,
+            prompt_extra=None,
+            user_id=None
+        ):
+        """
+        Like get_chat, but also returns the generated SQL and its result so callers that
+        need both (e.g. the Analytics Agent) pay for NL-to-SQL once.
+
+        ``narrate`` reuses the cached ``showsql`` statement: the SQL is executed here and
+        the result is narrated with the ``chat`` action, instead of letting
+        DBMS_CLOUD_AI.GENERATE generate the same SQL again. The narration is cached
+        together with the DataFrame it describes, so a hit returns both without executing
+        the SQL; a failed execution is returned as an error and never narrated or cached.
+        Other actions fall back to get_chat plus a (cached) ``showsql``.
+
+        Returns:
+            tuple: (response, sql, df). ``df`` is None when the SQL could not be generated
+            or executed.
+        """
+        sql = self.get_chat(prompt, profile_name, "showsql", language, prompt_extra, user_id)
+        _, fallback_sorry, error_prefix = self._build_chat_request(prompt, language, prompt_extra)
+        if sql == fallback_sorry or sql.startswith(error_prefix):
+            return sql, sql, None
+
+        # Clave propia: el valor es (narración, DataFrame), no la respuesta de get_chat
+        key = self._get_cache_key(
+            prompt, profile_name, "narrate_sql", language, prompt_extra, self.get_schema_version(user_id)
+        )
+        if action == "narrate":
+            cached = self._cache_get(key)
+            if cached is not None:
+                response, df = cached
+                return response, sql, df.copy()
+
+        try:
+            df = self.get_data(sql, raise_errors=True)
+        except Exception as e:
+            return f"{error_prefix}{e}", sql, None
+
+        if action == "showsql":
+            return sql, sql, df
+        if action != "narrate":
+            return self.get_chat(prompt, profile_name, action, language, prompt_extra, user_id), sql, df
+
+        narrate_prompt = (
+            f"Question: {prompt}\n"
+            f"SQL executed: {sql}\n"
+            f"Result ({len(df)} rows, first {NARRATE_MAX_ROWS} shown):\n"
+            f"{df.head(NARRATE_MAX_ROWS).to_csv(index=False)}\n"
+            "Answer the question in natural language using only this result."
+        )
+        response = self.get_chat(narrate_prompt, profile_name, "chat", language, prompt_extra)
+        self._cache_put(key, response, fallback_sorry, error_prefix, value=(response, df.copy()))
+        return response, sql, df
     
     def get_tables_cache(self, user_id, force_update=False):
         if force_update:
@@ -409,11 +604,17 @@ class SelectAIService:
         """
         return pd.read_sql(query, con=_self.conn)
 
-    def get_data(self, sql):
+    def get_data(self, sql, raise_errors=False):
         """
         Executes the received SQL and returns the complete DataFrame without modifications.
+
+        Args:
+            sql (str): The statement to execute.
+            raise_errors (bool): Raise the database error instead of returning an empty DataFrame.
         """
         try:
             return pd.read_sql(sql, con=self.conn)
         except Exception:
+            if raise_errors:
+                raise
             return pd.DataFrame()
\ No newline at end of file
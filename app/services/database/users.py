@@ -92,7 +92,7 @@ class UserService:
         Returns:
             pd.DataFrame: A DataFrame containing user information.
         """
-        query = f"""
+        query = """
             SELECT
                 A.USER_ID,
                 A.USER_GROUP_ID,
@@ -140,7 +140,7 @@ class UserService:
         Returns:
             pd.DataFrame: A DataFrame containing the user's information.
         """
-        query = f"""
+        query = """
             SELECT
                 A.USER_ID,
                 A.USER_USERNAME,
@@ -152,9 +152,9 @@ class UserService:
                 A.USER_STATE,
                 A.USER_DATE
             FROM USERS A
-            WHERE A.USER_ID = {user_id}
+            WHERE A.USER_ID = :user_id
         """
-        return pd.read_sql(query, con=_self.conn)
+        return pd.read_sql(query, con=_self.conn, params={"user_id": user_id})
 
     def insert_user(
             self,
@@ -195,13 +195,13 @@ class UserService:
 
             if current_state != 1:
                 with self.conn.cursor() as cur:
-                    cur.execute(f"""
+                    cur.execute("""
                         UPDATE USERS 
-                        SET USER_MODULES = '{modules}',
+                        SET USER_MODULES = :modules,
                             USER_STATE   = 1,                            
                             USER_DATE    = SYSDATE
-                        WHERE USER_ID    = {user_id}
-                    """)
+                        WHERE USER_ID    = :user_id
+                    """, {"modules": modules, "user_id": int(user_id)})
                 self.conn.commit()
                 return f"User '{username}' already existed and has been reactivated.", user_id
             else:
@@ -209,7 +209,7 @@ class UserService:
         else:
             with self.conn.cursor() as cur:
                 user_id_var = cur.var(int)  # Define the output variable
-                cur.execute(f"""
+                cur.execute("""
                     INSERT INTO USERS (                        
                         USER_GROUP_ID,
                         USER_USERNAME,
@@ -220,16 +220,26 @@ class UserService:
                         USER_EMAIL,
                         USER_MODULES
                     ) VALUES (
-                        '{user_group_id}',
-                        '{username}',
-                        '{password}',
-                        '{sel_ai_password}',
-                        '{name}',
-                        '{last_name}',
-                        '{email}',
-                        '{modules}'
+                        :user_group_id,
+                        :username,
+                        :password,
+                        :sel_ai_password,
+                        :name,
+                        :last_name,
+                        :email,
+                        :modules
                     ) RETURNING USER_ID INTO :user_id
-                """, {"user_id": user_id_var})
+                """, {
+                    "user_group_id": user_group_id,
+                    "username": username,
+                    "password": password,
+                    "sel_ai_password": sel_ai_password,
+                    "name": name,
+                    "last_name": last_name,
+                    "email": email,
+                    "modules": modules,
+                    "user_id": user_id_var
+                })
             self.conn.commit()
             return f"User '{username}' has been created successfully.", user_id_var.getvalue()[0]
         
@@ -260,17 +270,26 @@ class UserService:
             str: A message indicating success.
         """
         with self.conn.cursor() as cur:
-            cur.execute(f"""
+            cur.execute("""
                 UPDATE USERS SET 
-                    USER_GROUP_ID  = {user_group_id},
-                    USER_USERNAME  = '{username}',
-                    USER_NAME      = '{name}',
-                    USER_LAST_NAME = '{last_name}',
-                    USER_EMAIL     = '{email}',
-                    USER_STATE     = {state},
-                    USER_MODULES   = '{modules}'
-                WHERE USER_ID      = {user_id}
-            """)
+                    USER_GROUP_ID  = :user_group_id,
+                    USER_USERNAME  = :username,
+                    USER_NAME      = :name,
+                    USER_LAST_NAME = :last_name,
+                    USER_EMAIL     = :email,
+                    USER_STATE     = :state,
+                    USER_MODULES   = :modules
+                WHERE USER_ID      = :user_id
+            """, {
+                "user_group_id": user_group_id,
+                "username": username,
+                "name": name,
+                "last_name": last_name,
+                "email": email,
+                "state": state,
+                "modules": modules,
+                "user_id": user_id
+            })
         self.conn.commit()
         return f"User '{username}' has been updated successfully."
         
@@ -291,15 +310,22 @@ class UserService:
             str: A message indicating success.
         """
         with self.conn.cursor() as cur:
-            cur.execute(f"""
+            cur.execute("""
                 UPDATE USERS SET 
-                    USER_NAME      = '{name}',
-                    USER_PASSWORD  = '{password}',
-                    USER_LAST_NAME = '{last_name}',
-                    USER_EMAIL     = '{email}',
-                    USER_STATE     = {state}
-                WHERE USER_ID      = {user_id}
-            """)
+                    USER_NAME      = :name,
+                    USER_PASSWORD  = :password,
+                    USER_LAST_NAME = :last_name,
+                    USER_EMAIL     = :email,
+                    USER_STATE     = :state
+                WHERE USER_ID      = :user_id
+            """, {
+                "name": name,
+                "password": password,
+                "last_name": last_name,
+                "email": email,
+                "state": state,
+                "user_id": user_id
+            })
         self.conn.commit()
         return f"User '{username}' has been updated successfully."
         
@@ -315,11 +341,11 @@ class UserService:
             str: A message indicating success.
         """
         with self.conn.cursor() as cur:
-            cur.execute(f"""
+            cur.execute("""
                 UPDATE USERS SET 
-                    USER_MODULES = '{modules}'
-                WHERE USER_ID    = {user_id}
-            """)
+                    USER_MODULES = :modules
+                WHERE USER_ID    = :user_id
+            """, {"modules": modules, "user_id": user_id})
         self.conn.commit()
         return f"User has been updated successfully."
 
@@ -342,13 +368,14 @@ class UserService:
 
             # 3. Eliminar AGENTS si ya no tienen más relaciones en AGENT_USER
             if agent_ids:
+                agent_binds = {f"agent_id_{i}": agent_id for i, agent_id in enumerate(agent_ids)}
                 cur.execute(f"""
                     DELETE FROM agents
-                    WHERE agent_id IN ({','.join(map(str, agent_ids))})
+                    WHERE agent_id IN ({','.join(':' + name for name in agent_binds)})
                     AND NOT EXISTS (
                         SELECT 1 FROM agent_user WHERE agent_id = agents.agent_id
                     )
-                """)
+                """, agent_binds)
 
             # 4. Obtener file_ids relacionados al usuario
             cur.execute("""
@@ -363,22 +390,23 @@ class UserService:
 
             # 6. Eliminar DOCS de archivos si ya no están relacionados a ningún usuario
             if file_ids:
+                file_binds = {f"file_id_{i}": file_id for i, file_id in enumerate(file_ids)}
                 cur.execute(f"""
                     DELETE FROM docs
-                    WHERE file_id IN ({','.join(map(str, file_ids))})
+                    WHERE file_id IN ({','.join(':' + name for name in file_binds)})
                     AND NOT EXISTS (
                         SELECT 1 FROM file_user WHERE file_id = docs.file_id
                     )
-                """)
+                """, file_binds)
 
                 # 7. Eliminar FILES si ya no están asociados a ningún usuario
                 cur.execute(f"""
                     DELETE FROM files
-                    WHERE file_id IN ({','.join(map(str, file_ids))})
+                    WHERE file_id IN ({','.join(':' + name for name in file_binds)})
                     AND NOT EXISTS (
                         SELECT 1 FROM file_user WHERE file_id = files.file_id
                     )
-                """)
+                """, file_binds)
 
             # 8. Eliminar al usuario
             cur.execute("""
@@ -407,7 +435,7 @@ class UserService:
         Returns:
             pd.DataFrame: A DataFrame containing module information.
         """
-        query = f"""
+        query = """
             SELECT
                 A.USER_GROUP_ID,
                 A.USER_GROUP_NAME,
@@ -514,7 +542,7 @@ class UserService:
 
     @st.cache_data
     def get_all_user_group_shared(_self, user_id):
-        query = f"""
+        query = """
             SELECT
                 A.USER_ID,
                 A.USER_GROUP_ID,
@@ -530,13 +558,13 @@ class UserService:
                 ON A.USER_GROUP_ID = B.USER_GROUP_ID
             WHERE
                 A.USER_STATE <> 0
-                AND A.USER_ID <> {user_id}
+                AND A.USER_ID <> :user_id
                 AND A.USER_GROUP_ID = (
-                    SELECT USER_GROUP_ID FROM USERS WHERE USER_ID = {user_id}
+                    SELECT USER_GROUP_ID FROM USERS WHERE USER_ID = :user_id
                 )
             ORDER BY A.USER_ID DESC
         """
-        return pd.read_sql(query, con=_self.conn)
+        return pd.read_sql(query, con=_self.conn, params={"user_id": user_id})
 
     def get_users_by_module_cache(self, module_id, force_update=False):
         """
@@ -557,7 +585,7 @@ class UserService:
         Returns:
             pd.DataFrame: A DataFrame containing user information with access to the module.
         """
-        query = f"""
+        query = """
             SELECT
                 A.USER_ID,
                 A.USER_GROUP_ID,
@@ -584,8 +612,8 @@ class UserService:
                             MODULE_ID NUMBER PATH '$'
                         )
                     ) JT
-                    WHERE JT.MODULE_ID = {module_id}
+                    WHERE JT.MODULE_ID = :module_id
                 )
             ORDER BY A.USER_ID ASC
         """
-        return pd.read_sql(query, con=_self.conn)
\ No newline at end of file
+        return pd.read_sql(query, con=_self.conn, params={"module_id": module_id})
\ No newline at end of file
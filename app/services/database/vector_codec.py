@@ -0,0 +1,119 @@
+import os
+import array
+
+import numpy as np
+from dotenv import load_dotenv
+
+load_dotenv()
+
+# Formatos de almacenamiento de DOCS.embedding (columna VECTOR flexible)
+#   float32 : 4 bytes por dimensión, COSINE
+#   int8    : 1 byte por dimensión, escala por vector (la distancia COSINE no depende de la norma)
+#   binary  : 1 bit por dimensión (signo), solo distancias HAMMING / JACCARD
+VECTOR_FORMATS = {
+    "float32": {"typecode": "f", "dtype": np.float32, "distance": "COSINE"},
+    "int8":    {"typecode": "b", "dtype": np.int8,    "distance": "COSINE"},
+    "binary":  {"typecode": "B", "dtype": np.uint8,   "distance": "HAMMING"},
+}
+
+
+def get_vector_format(vector_format=None):
+    """
+    Returns the configured storage format (``CON_ADB_VS_FORMAT``, float32 by default).
+    """
+    vector_format = (vector_format or os.getenv('CON_ADB_VS_FORMAT', 'float32')).lower()
+    if vector_format not in VECTOR_FORMATS:
+        raise ValueError(f"vector format must be one of {tuple(VECTOR_FORMATS)}")
+    return vector_format
+
+
+def get_distance(vector_format=None):
+    """
+    Distance metric compatible with the storage format.
+    """
+    return VECTOR_FORMATS[get_vector_format(vector_format)]["distance"]
+
+
+def _as_float32(embedding):
+    """
+    Contiguous float32 ndarray without copying when the input already is one.
+    """
+    return np.ascontiguousarray(embedding, dtype=np.float32)
+
+
+def encode(embedding, vector_format=None):
+    """
+    Encodes an embedding as the ``array.array`` python-oracledb binds as DB_TYPE_VECTOR.
+
+    NumPy inputs are copied buffer to buffer (``frombytes``), never through Python lists.
+
+    Args:
+        embedding (list | tuple | array.array | np.ndarray): The embedding.
+        vector_format (str, optional): float32, int8 or binary.
+
+    Returns:
+        array.array: 'f' (FLOAT32), 'b' (INT8) or 'B' (BINARY) array.
+    """
+    vector_format = get_vector_format(vector_format)
+    spec = VECTOR_FORMATS[vector_format]
+
+    if vector_format == "float32":
+        if isinstance(embedding, array.array) and embedding.typecode == "f":
+            return embedding
+        if isinstance(embedding, (list, tuple)):
+            return array.array("f", embedding)
+        data = _as_float32(embedding)
+    elif vector_format == "int8":
+        values = _as_float32(embedding)
+        scale = float(np.abs(values).max()) or 1.0
+        data = np.rint(values * (127.0 / scale)).astype(np.int8)
+    else:
+        values = _as_float32(embedding)
+        if values.size % 8:
+            raise ValueError("binary vectors need a dimension multiple of 8")
+        data = np.packbits(values > 0)
+
+    result = array.array(spec["typecode"])
+    result.frombytes(data)
+    return result
+
+
+def encode_many(embeddings, vector_format=None):
+    """
+    Encodes a batch of embeddings (list of vectors or 2-D ndarray).
+    """
+    return [encode(embedding, vector_format) for embedding in embeddings]
+
+
+def decode(vector):
+    """
+    Zero-copy NumPy view of a fetched VECTOR value (``array.array``).
+
+    Returns:
+        np.ndarray: float32, int8 or uint8 (packed bits) array.
+    """
+    dtypes = {spec["typecode"]: spec["dtype"] for spec in VECTOR_FORMATS.values()}
+    if isinstance(vector, array.array) and vector.typecode in dtypes:
+        return np.frombuffer(vector, dtype=dtypes[vector.typecode])
+    return np.asarray(vector, dtype=np.float32)
+
+
+def to_dense(vector):
+    """
+    float32 ndarray of a VECTOR value for similarity math; binary vectors are
+    unpacked to -1 / +1 per dimension.
+    """
+    values = decode(vector)
+    if values.dtype == np.uint8:
+        return np.unpackbits(values).astype(np.float32) * 2 - 1
+    return values.astype(np.float32, copy=False)
+
+
+def get_nbytes(dimension, vector_format=None):
+    """
+    Storage bytes of one vector payload in the given format.
+    """
+    vector_format = get_vector_format(vector_format)
+    if vector_format == "binary":
+        return dimension // 8
+    return dimension * np.dtype(VECTOR_FORMATS[vector_format]["dtype"]).itemsize
@@ -0,0 +1,223 @@
+import os
+import time
+import logging
+import threading
+from collections import OrderedDict
+from contextlib import contextmanager
+
+import oci
+from oci.generative_ai_inference import GenerativeAiInferenceClient
+from oci.retry import NoneRetryStrategy
+from dotenv import load_dotenv
+
+load_dotenv()
+
+logger = logging.getLogger("OCI_GenAI")
+
+
+class GenAIClientRegistry:
+    """
+    Process-wide registry of OCI Generative AI inference clients and LLM instances.
+
+    - Signers / config are created once per auth type and shared by every client.
+    - Clients are pooled by (auth type, endpoint): a thread checks a client out with
+      lease_client and returns it when the call ends, so a client is never used by two
+      threads at once (same rule as DocPipelineService) but its HTTP session survives
+      across threads, e.g. Streamlit reruns.
+    - LLM instances are keyed by their full configuration (model, generation params...) and
+      shared by every thread; they lease a client on every call.
+    - ``CON_GEN_AI_CLIENT_CACHE_SIZE`` caps the LLM map (LRU) and the idle clients kept
+      per (auth type, endpoint).
+    - Principal signers (RESOURCE_PRINCIPAL / INSTANCE_PRINCIPAL) refresh their security
+      token in a background thread every ``CON_GEN_AI_TOKEN_REFRESH_INTERVAL`` seconds,
+      so no request pays for the token fetch.
+    """
+    _instance = None
+    _lock = threading.Lock()
+
+    def __new__(cls):
+        if cls._instance is None:
+            with cls._lock:
+                if cls._instance is None:
+                    instance = super(GenAIClientRegistry, cls).__new__(cls)
+                    instance.maxsize  = int(os.getenv('CON_GEN_AI_CLIENT_CACHE_SIZE', 16))
+                    instance.interval = int(os.getenv('CON_GEN_AI_TOKEN_REFRESH_INTERVAL', 900))
+                    instance._signers = {}
+                    instance._clients = {}
+                    instance._leased  = 0
+                    instance._generation = 0
+                    instance._llms    = OrderedDict()
+                    instance._stats   = {"client_hits": 0, "client_misses": 0, "llm_hits": 0, "llm_misses": 0, "evictions": 0}
+                    instance._mutex   = threading.RLock()
+                    instance._refresher = None
+                    cls._instance = instance
+        return cls._instance
+
+    @staticmethod
+    def get_auth_type(auth_type=None):
+        return auth_type or os.getenv("CON_GEN_AI_AUTH_TYPE", "RESOURCE_PRINCIPAL")
+
+    def _get_signer(self, auth_type):
+        """
+        Signer (or config for API_KEY) of an auth type, created on first use.
+
+        Returns:
+            tuple: (config, signer) arguments for the client constructor.
+        """
+        with self._mutex:
+            if auth_type not in self._signers:
+                if auth_type == "RESOURCE_PRINCIPAL":
+                    self._signers[auth_type] = ({}, oci.auth.signers.get_resource_principals_signer())
+                elif auth_type == "INSTANCE_PRINCIPAL":
+                    self._signers[auth_type] = ({}, oci.auth.signers.InstancePrincipalsSecurityTokenSigner())
+                else:
+                    # API_KEY - config file
+                    config = oci.config.from_file()
+                    oci.config.validate_config(config)
+                    self._signers[auth_type] = (config, None)
+                if self._signers[auth_type][1] is not None:
+                    self._start_refresher()
+            return self._signers[auth_type]
+
+    def _start_refresher(self):
+        if self._refresher is not None or self.interval <= 0:
+            return
+        self._refresher = threading.Thread(target=self._refresh_loop, name="genai-token-refresh", daemon=True)
+        self._refresher.start()
+
+    def _refresh_loop(self):
+        while True:
+            time.sleep(self.interval)
+            with self._mutex:
+                signers = [(auth_type, signer) for auth_type, (_, signer) in self._signers.items() if signer is not None]
+            for auth_type, signer in signers:
+                refresh = getattr(signer, "refresh_security_token", None)
+                if refresh is None:
+                    continue
+                try:
+                    refresh()
+                except Exception as e:
+                    # El signer vuelve a intentarlo solo al expirar el token
+                    logger.warning(f"⚠️ Token refresh failed (auth={auth_type}): {e}")
+
+    def _put(self, items, key, value):
+        items[key] = value
+        items.move_to_end(key)
+        while len(items) > self.maxsize:
+            items.popitem(last=False)
+            self._stats["evictions"] += 1
+
+    def get_client(self, auth_type=None, endpoint=None):
+        """
+        Checks out an inference client of an auth type and endpoint; the caller owns it
+        until it is given back with put_client (prefer lease_client).
+
+        Args:
+            auth_type (str, optional): RESOURCE_PRINCIPAL, INSTANCE_PRINCIPAL or API_KEY.
+                Defaults to ``CON_GEN_AI_AUTH_TYPE``.
+            endpoint (str, optional): Service endpoint. Defaults to ``CON_GEN_AI_SERVICE_ENDPOINT``.
+
+        Returns:
+            GenerativeAiInferenceClient: The client.
+        """
+        key = self._get_key(auth_type, endpoint)
+        with self._mutex:
+            idle = self._clients.get(key)
+            if idle:
+                self._stats["client_hits"] += 1
+                self._leased += 1
+                return idle.pop()
+
+        auth_type, endpoint = key
+        config, signer = self._get_signer(auth_type)
+        kwargs = {"signer": signer} if signer is not None else {}
+        client = GenerativeAiInferenceClient(
+            config=config,
+            service_endpoint=endpoint,
+            retry_strategy=NoneRetryStrategy(),
+            timeout=(10, 240),
+            **kwargs
+        )
+        client._genai_generation = self._generation
+        with self._mutex:
+            self._stats["client_misses"] += 1
+            self._leased += 1
+        logger.info(f"✅ Cliente OCI GenAI inicializado (auth={auth_type}, thread={threading.current_thread().name})")
+        return client
+
+    def put_client(self, client, auth_type=None, endpoint=None):
+        """
+        Returns a client checked out with get_client to the idle pool of its key
+        (dropped if the pool is full or clear() ran meanwhile).
+        """
+        key = self._get_key(auth_type, endpoint)
+        with self._mutex:
+            self._leased -= 1
+            if getattr(client, "_genai_generation", None) != self._generation:
+                return
+            idle = self._clients.setdefault(key, [])
+            if len(idle) < self.maxsize:
+                idle.append(client)
+            else:
+                self._stats["evictions"] += 1
+
+    @contextmanager
+    def lease_client(self, auth_type=None, endpoint=None):
+        """
+        Context manager over get_client / put_client: the client is this thread's until
+        the block ends, then it goes back to the pool for the next caller.
+
+        Yields:
+            GenerativeAiInferenceClient: The client.
+        """
+        client = self.get_client(auth_type, endpoint)
+        try:
+            yield client
+        finally:
+            self.put_client(client, auth_type, endpoint)
+
+    def _get_key(self, auth_type, endpoint):
+        return (self.get_auth_type(auth_type), endpoint or os.getenv("CON_GEN_AI_SERVICE_ENDPOINT"))
+
+    def get_llm(self, key, factory):
+        """
+        Returns the LLM registered under ``key``, building it with ``factory()`` on a miss.
+
+        Args:
+            key (tuple): Hashable configuration (auth type, endpoint, model, params...).
+            factory (callable): Builds the LLM instance.
+        """
+        with self._mutex:
+            llm = self._llms.get(key)
+            if llm is not None:
+                self._llms.move_to_end(key)
+                self._stats["llm_hits"] += 1
+                return llm
+
+        llm = factory()
+        with self._mutex:
+            self._stats["llm_misses"] += 1
+            self._put(self._llms, key, llm)
+        return llm
+
+    def get_stats(self):
+        """
+        Hit/miss counters and sizes of the registry (``clients``: idle, ``leased``: in use).
+        """
+        with self._mutex:
+            stats = dict(self._stats)
+            stats["clients"] = sum(len(idle) for idle in self._clients.values())
+            stats["leased"]  = self._leased
+            stats["llms"] = len(self._llms)
+        return stats
+
+    def clear(self):
+        """
+        Drops every cached client, LLM and signer (e.g. after rotating credentials).
+        Leased clients are dropped when they are returned.
+        """
+        with self._mutex:
+            self._generation += 1
+            self._clients.clear()
+            self._llms.clear()
+            self._signers.clear()
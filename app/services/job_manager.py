@@ -0,0 +1,233 @@
+import os
+import time
+import random
+import logging
+import threading
+from contextlib import contextmanager
+from concurrent.futures import ThreadPoolExecutor
+
+from dotenv import load_dotenv
+
+import services.database as database
+from services.database.connection import Connection
+
+load_dotenv()
+
+logger = logging.getLogger(__name__)
+
+
+class JobTimeoutError(TimeoutError):
+    """
+    Raised when an OCI job does not finish before its timeout.
+    """
+
+
+def get_backoff(attempt, initial=None, maximum=None):
+    """
+    Seconds to wait before poll number ``attempt`` (0-based): exponential with jitter,
+    from ``CON_JOB_POLL_INITIAL`` up to ``CON_JOB_POLL_MAX``.
+    """
+    initial = float(initial or os.getenv('CON_JOB_POLL_INITIAL', 2))
+    maximum = float(maximum or os.getenv('CON_JOB_POLL_MAX', 60))
+    delay   = min(maximum, initial * 2 ** attempt)
+    return delay * random.uniform(0.8, 1.0)
+
+
+def wait_for_state(get_state, oci_job_id, timeout=None, on_poll=None):
+    """
+    Polls an OCI job with exponential backoff until it reaches a terminal state.
+
+    Args:
+        get_state (callable): ``get_state(oci_job_id)`` -> lifecycle state.
+        oci_job_id (str): The OCI job OCID.
+        timeout (float, optional): Seconds before giving up (``CON_JOB_TIMEOUT`` by default).
+        on_poll (callable, optional): ``on_poll(attempt, state)`` after every poll.
+
+    Returns:
+        str: SUCCEEDED.
+
+    Raises:
+        JobTimeoutError: The job did not finish in time.
+        RuntimeError: The job ended FAILED or CANCELED.
+    """
+    timeout  = float(timeout or os.getenv('CON_JOB_TIMEOUT', 3600))
+    deadline = time.monotonic() + timeout
+    attempt  = 0
+    while True:
+        state = get_state(oci_job_id)
+        if on_poll is not None:
+            on_poll(attempt, state)
+        if state == "SUCCEEDED":
+            return state
+        if state in ("FAILED", "CANCELED", "CANCELING"):
+            raise RuntimeError(f"OCI job {oci_job_id} ended {state}")
+
+        delay = get_backoff(attempt)
+        if time.monotonic() + delay > deadline:
+            raise JobTimeoutError(f"OCI job {oci_job_id} did not finish in {int(timeout)} s (last state {state})")
+        time.sleep(delay)
+        attempt += 1
+
+
+class JobManager:
+    """
+    Background manager of long-running OCI jobs (Document Understanding, Speech).
+
+    Jobs are persisted in JOBS (SUBMITTED → RUNNING → SUCCEEDED | FAILED). A worker
+    thread submits the OCI job, polls it with exponential backoff and a timeout, and
+    runs the completion (extraction, vector store) outside the Streamlit script run.
+    Each worker holds a lease on its job; jobs whose lease expired (e.g. the process
+    restarted) are resumed by the next JobManager that starts.
+
+    Handlers are registered per job type with three callables:
+        - ``start(params)`` -> OCI job id, or None when there is nothing to wait for.
+        - ``get_state(oci_job_id)`` -> lifecycle state.
+        - ``complete(params, oci_job_id)`` -> dict with message, pages and characters.
+
+    Exported as ``services.JobManager``; service modules register their handlers on import.
+    """
+    _instance = None
+    _lock = threading.Lock()
+
+    def __new__(cls):
+        if cls._instance is None:
+            with cls._lock:
+                if cls._instance is None:
+                    instance = super(JobManager, cls).__new__(cls)
+                    instance.handlers = {}
+                    instance.timeout  = int(os.getenv('CON_JOB_TIMEOUT', 3600))
+                    instance.lease    = int(os.getenv('CON_JOB_LEASE', 300))
+                    instance.executor = ThreadPoolExecutor(
+                        max_workers        = int(os.getenv('CON_JOB_WORKERS', 4)),
+                        thread_name_prefix = "jobs",
+                        initializer        = lambda: Connection().require_scope()
+                    )
+                    instance.db_job_service  = database.JobService()
+                    instance.db_file_service = database.FileService()
+                    instance._resumed = False
+                    cls._instance = instance
+        return cls._instance
+
+    def register(self, job_type, start, get_state, complete):
+        """
+        Registers the handler of a job type.
+        """
+        self.handlers[job_type] = {"start": start, "get_state": get_state, "complete": complete}
+
+    def submit(self, job_type, user_id, file_id, params):
+        """
+        Persists a job and runs it in the background.
+
+        Args:
+            job_type (str): Registered handler name.
+            user_id (int): Owner of the job.
+            file_id (int): File processed by the job.
+            params (dict): Handler parameters. ``file_trg_obj_name`` and ``file_trg_language``
+                are used to update FILES when the job succeeds.
+
+        Returns:
+            int: The JOB_ID.
+        """
+        if job_type not in self.handlers:
+            raise ValueError(f"Unknown job type: {job_type}")
+        job_id = self.db_job_service.insert_job(user_id, file_id, job_type, params, self.timeout)
+        self.executor.submit(self._run, job_id)
+        return job_id
+
+    def resume(self):
+        """
+        Resumes orphan jobs (active with an expired lease) once per process.
+        """
+        with self._lock:
+            if self._resumed:
+                return
+            self._resumed = True
+        try:
+            for job_id in self.db_job_service.get_orphan_jobs():
+                self.executor.submit(self._run, job_id)
+        except Exception as e:
+            logger.warning(f"⚠️ Jobs not resumed: {e}")
+
+    def _run(self, job_id):
+        # Sin conexión durante start y el sondeo (pueden durar hasta CON_JOB_TIMEOUT):
+        # cada llamada a JobService toma y devuelve la suya
+        if not self.db_job_service.claim_job(job_id, self.lease):
+            return
+
+        job = self.db_job_service.get_job(job_id)
+        handler = self.handlers.get(job["JOB_TYPE"]) if job else None
+        if handler is None:
+            self.db_job_service.update_job(job_id, "FAILED", job_message=f"No handler for {job and job['JOB_TYPE']}")
+            return
+
+        start_time = time.monotonic()
+        params     = job["JOB_PARAMS"]
+        oci_job_id = job["JOB_OCI_ID"]
+        try:
+            if job["TIMED_OUT"]:
+                raise JobTimeoutError(f"Job {job_id} timed out")
+
+            if oci_job_id is None:
+                # start puede completar params (p. ej. páginas en caché); se guardan para retomar el job
+                oci_job_id = handler["start"](params)
+                self.db_job_service.update_job(
+                    job_id, "RUNNING", job_oci_id=oci_job_id, lease=self.lease, job_params=params
+                )
+
+            if oci_job_id is not None:
+                def on_poll(attempt, state):
+                    # Renueva el lease en cada consulta para que ningún otro worker lo retome
+                    self.db_job_service.update_job(
+                        job_id, "RUNNING", job_message=f"OCI state: {state}", job_attempts=attempt + 1, lease=self.lease
+                    )
+
+                wait_for_state(handler["get_state"], oci_job_id, self.timeout, on_poll)
+
+            # La conexión se presta solo para la completación (extracción, vector store) y FILES
+            with self._renew_lease(job_id), Connection().acquire():
+                result = handler["complete"](params, oci_job_id)
+
+                elapsed = int(time.monotonic() - start_time)
+                self.db_file_service.update_file(
+                    job["FILE_ID"],
+                    params.get("file_trg_obj_name"),
+                    result.get("pages", 1),
+                    result.get("characters", 0),
+                    time.strftime("%H:%M:%S", time.gmtime(elapsed)),
+                    params.get("file_trg_language")
+                )
+            self.db_job_service.update_job(job_id, "SUCCEEDED", job_message=result.get("message"))
+            logger.info(f"[Jobs] {job['JOB_TYPE']} job {job_id} succeeded in {elapsed} s")
+
+        except Exception as e:
+            logger.warning(f"⚠️ [Jobs] {job['JOB_TYPE']} job {job_id} failed: {e}")
+            self.db_job_service.update_job(job_id, "FAILED", job_oci_id=oci_job_id, job_message=str(e))
+
+    @contextmanager
+    def _renew_lease(self, job_id):
+        """
+        Renews the lease of a job every third of ``CON_JOB_LEASE`` while the block runs,
+        so a completion longer than the lease is not taken over by another worker.
+        """
+        stop = threading.Event()
+
+        def renew():
+            while not stop.wait(self.lease / 3):
+                try:
+                    self.db_job_service.update_job(job_id, "RUNNING", lease=self.lease)
+                except Exception as e:
+                    logger.warning(f"⚠️ [Jobs] Lease of job {job_id} not renewed: {e}")
+
+        thread = threading.Thread(target=renew, name=f"jobs-lease-{job_id}", daemon=True)
+        thread.start()
+        try:
+            yield
+        finally:
+            stop.set()
+            thread.join()
+
+    def get_jobs(self, user_id, limit=20):
+        """
+        Latest jobs of a user, read from JOBS (any worker may be running them).
+        """
+        return self.db_job_service.get_jobs(user_id, limit)
@@ -158,21 +158,27 @@ class BucketService:
             target_object_name (str): The name of the target object where the file will be moved.
 
         Returns:
-            dict: A summary of the move operation with status messages.
+            bool: True if the object was moved; False if it could not be read or uploaded
+            (the source is kept).
         """
         try:
             name_from_path = utl_function_service.get_name_from_path(source_object_name)
             
             # Step 1: Retrieve the source object
             object = self.get_object(source_object_name)
+            if object is None:
+                return False
             
             # Step 2: Upload the file to the target location
-            self.upload_file(target_object_name, object)
+            if not self.upload_file(target_object_name, object):
+                return False
 
             # Step 3: Delete the source file
             self.delete_object(source_object_name)
 
             component.get_toast(f"The object '{name_from_path}' was moved successfully.", ":material/move_up:") if msg else None
+            return True
             
         except Exception as e:
             component.get_error(f"[Error] Moving Object:\n {e}")
+            return False
@@ -3,9 +3,13 @@ import os
 import oci
 import fitz
 import base64
+import logging
+import tempfile
+import threading
+import multiprocessing
+from concurrent.futures import ProcessPoolExecutor, ThreadPoolExecutor, as_completed
 from PIL import Image
 import streamlit as st
-import shutil
 
 #from langchain_community.chat_models import ChatOCIGenAI
 from langchain_oci import ChatOCIGenAI
@@ -19,19 +23,65 @@ import components as component
 import services as service
 import services.database as database
 import utils as utils
+from utils import page_render
 
 # Initialize services
 config               = oci.config.from_file(profile_name=os.getenv('CON_OCI_PROFILE_NAME', 'DEFAULT'))
 bucket_service       = service.BucketService()
+page_cache_service   = service.PageCacheService()
 file_service         = database.FileService()
 doc_service          = database.DocService()
 utl_function_service = utils.FunctionService()
 
 load_dotenv()
 
+logger = logging.getLogger(__name__)
+
 # Initialize the service
 db_agent_service = database.AgentService()
 
+# Imágenes por tarea del pool de renderizado (cada tarea abre el PDF una vez)
+RENDER_CHUNK_SIZE = 4
+
+# Pool de procesos de renderizado y semáforos por modelo, compartidos por todo el proceso
+_render_pool = None
+_model_slots = {}
+_pool_lock   = threading.Lock()
+
+
+def _get_render_pool():
+    """
+    Pool de procesos de rasterización (``CON_GEN_AI_MM_RENDER_WORKERS``, 0 = en el hilo actual).
+    Usa ``spawn``: los procesos no heredan hilos ni conexiones del servidor de Streamlit.
+    """
+    global _render_pool
+    workers = int(os.getenv("CON_GEN_AI_MM_RENDER_WORKERS", min(4, os.cpu_count() or 1)))
+    if workers <= 0:
+        return None
+    with _pool_lock:
+        if _render_pool is None:
+            _render_pool = ProcessPoolExecutor(max_workers=workers, mp_context=multiprocessing.get_context("spawn"))
+        return _render_pool
+
+
+def _get_model_setting(name, model_id, default):
+    """
+    Valor por modelo de ``{name}_MODELS`` ("modelo:valor,modelo:valor") o, si no está, de ``name``.
+    """
+    for item in os.getenv(f"{name}_MODELS", "").split(","):
+        key, _, value = item.strip().rpartition(":")
+        if key == model_id and value:
+            return value
+    return os.getenv(name, default)
+
+
+def _get_model_slots(model_id, concurrency):
+    with _pool_lock:
+        if model_id not in _model_slots:
+            _model_slots[model_id] = threading.BoundedSemaphore(concurrency)
+        return _model_slots[model_id]
+
+
 class DocumentMultimodalService:
         
     def __init__(self):
@@ -47,7 +97,8 @@ class DocumentMultimodalService:
             agent_id,
             file_id,
             username,
-            trg_type
+            trg_type,
+            progress=None
         ):
         """
         Sends a document to the OCI Document Understanding service for processing.
@@ -57,6 +108,8 @@ class DocumentMultimodalService:
             prefix (str)      : The output prefix for processed files.
             language (str)    : The language of the document (e.g., 'English', 'Spanish').
             file_id (str)     : The ID of the file to associate with the vector store.
+            progress (callable, optional): Vector store progress callback. When given, the caller
+                draws the UI (e.g. an ingest worker): no toasts or progress bar are created here.
 
         Returns:
             tuple: A success message and extracted data, or an error message.
@@ -64,21 +117,17 @@ class DocumentMultimodalService:
         # Obtener la extensión del archivo
         file_extension = object_name.split(".")[-1].lower()
 
-        # Definir la carpeta de salida
-        output_directory = f"files/{username}"
+        # Resolución e imagen según el modelo de visión del agente
+        df_agents = db_agent_service.get_all_agents_cache(user_id)[lambda df: df["AGENT_ID"] == agent_id]
+        options   = DocumentMultimodalService.get_render_options(str(df_agents["AGENT_MODEL_NAME"].values[0]))
 
-        # Eliminar la carpeta si existe y crearla nuevamente
-        if os.path.exists(output_directory):
-            shutil.rmtree(output_directory)
-        os.makedirs(output_directory, exist_ok=True)
+        # Strategy: las páginas se renderizan en memoria y pasan al LLM a medida que están listas
+        if strategy == "Double" and file_extension == "pdf":
+            pages = DocumentMultimodalService.doble_page(object_name, options=options)
+        else:
+            pages = DocumentMultimodalService.single_page(object_name, file_extension, options=options)
 
-        # Strategy
-        if strategy == "Double":
-            DocumentMultimodalService.doble_page(object_name, output_directory)
-        elif strategy == "Single":
-            DocumentMultimodalService.single_page(object_name, file_extension, output_directory)
-
-        data = DocumentMultimodalService.get_extraction(user_id, agent_id, output_directory)
+        data = DocumentMultimodalService.get_extraction(user_id, agent_id, pages)
 
         # Construct paths for processed objects
         processed_object = f"{object_name.rsplit('.', 1)[0]}_trg.{trg_type.lower()}"
@@ -91,79 +140,149 @@ class DocumentMultimodalService:
         
         # Process file extraction
         msg = file_service.update_extraction(file_id, data)
-        component.get_toast(msg, ":material/database:")
+        component.get_toast(msg, ":material/database:") if progress is None else None
         
         # Process Vector Store
-        msg = doc_service.vector_store(file_id)
-        component.get_toast(msg, ":material/database:")
+        msg = doc_service.vector_store(file_id, progress or component.get_progress())
+        component.get_toast(msg, ":material/database:") if progress is None else None
         
         mg = f"[AI Document Multimodal][{processed_object}] Module executed successfully."
         return mg, data
 
-    def single_page(object_name, file_extension, output_directory, msg: bool = False):
+    @staticmethod
+    def get_render_options(model_id):
+        """
+        Parámetros de preparación de imágenes para un modelo de visión (ver page_render.render_groups).
+
+        - ``CON_GEN_AI_MM_DPI``: "auto" (según densidad de texto) o un DPI fijo.
+        - ``CON_GEN_AI_MM_MIN_DPI`` / ``CON_GEN_AI_MM_MAX_DPI``: rango del modo automático.
+        - ``CON_GEN_AI_MM_MAX_SIDE`` (o ``_MODELS`` por modelo): lado mayor útil; el modelo
+          reescala por encima de ese tamaño, así que enviar más solo cuesta bytes.
+        - ``CON_GEN_AI_MM_JPEG_QUALITY`` y ``CON_GEN_AI_MM_GRAYSCALE``.
+
+        Returns:
+            dict: Argumentos con nombre de page_render.render_groups.
         """
-        Procesa un archivo PDF o una imagen y guarda las páginas o imágenes en formato JPEG en una carpeta específica.
+        dpi = os.getenv("CON_GEN_AI_MM_DPI", "auto")
+        return {
+            "dpi"       : None if dpi.lower() == "auto" else int(dpi),
+            "min_dpi"   : int(os.getenv("CON_GEN_AI_MM_MIN_DPI", page_render.MIN_DPI)),
+            "max_dpi"   : int(os.getenv("CON_GEN_AI_MM_MAX_DPI", page_render.MAX_DPI)),
+            "max_side"  : int(_get_model_setting("CON_GEN_AI_MM_MAX_SIDE", model_id, 2048)) or None,
+            "quality"   : int(os.getenv("CON_GEN_AI_MM_JPEG_QUALITY", page_render.JPEG_QUALITY)),
+            "grayscale" : os.getenv("CON_GEN_AI_MM_GRAYSCALE", "True").lower() in ("true", "1", "yes")
+        }
+
+    @staticmethod
+    def _render(object_name, strategy="Single", file_extension="pdf", options=None):
+        """
+        Renderiza el documento y entrega cada imagen apenas está lista.
+
+        Los PDF se reparten en bloques de ``RENDER_CHUNK_SIZE`` imágenes entre los procesos
+        del pool de renderizado: el PDF se escribe una vez en un archivo temporal y cada
+        tarea recibe su ruta y sus páginas, no el contenido. Las imágenes sueltas se
+        recodifican en este hilo.
+
+        Args:
+            options (dict, optional): Resultado de get_render_options.
+
+        Yields:
+            tuple[int, bytes]: (índice de la imagen, JPEG) en orden de finalización.
+        """
+        options = options or {}
+        object  = bucket_service.get_object(object_name)
+        if not object:
+            return
+
+        if file_extension in ["png", "jpeg", "jpg"]:
+            image = page_render.prepare_image(
+                Image.open(io.BytesIO(object)), options.get("max_side"), options.get("grayscale", True)
+            )
+            yield 0, page_render.encode_jpeg(image, options.get("quality", page_render.JPEG_QUALITY))
+            return
+
+        with fitz.open(stream=object, filetype="pdf") as pdf_document:
+            page_count = len(pdf_document)
+        groups = page_render.get_page_groups(page_count, strategy)
+        chunks = [
+            (start, groups[start:start + RENDER_CHUNK_SIZE])
+            for start in range(0, len(groups), RENDER_CHUNK_SIZE)
+        ]
+
+        pool = _get_render_pool()
+        if pool is None:
+            for start, chunk in chunks:
+                for offset, image in enumerate(page_render.render_groups(object, chunk, **options)):
+                    yield start + offset, image
+            return
+
+        with tempfile.NamedTemporaryFile(suffix=".pdf") as pdf_file:
+            pdf_file.write(object)
+            pdf_file.flush()
+            futures = {pool.submit(page_render.render_groups, pdf_file.name, chunk, **options): start for start, chunk in chunks}
+            try:
+                for future in as_completed(futures):
+                    for offset, image in enumerate(future.result()):
+                        yield futures[future] + offset, image
+            finally:
+                # Si el consumidor se detiene antes, no se renderizan los bloques pendientes
+                for future in futures:
+                    future.cancel()
+
+    @staticmethod
+    def single_page(object_name, file_extension, msg: bool = False, options=None):
+        """
+        Renderiza un archivo PDF (una imagen por página) o una imagen como JPEG en memoria.
 
         Args:
             object_name (str): Nombre del archivo en el bucket.
-            username (str): Nombre del usuario para crear una carpeta específica.
+            file_extension (str): Extensión del archivo (pdf, png, jpeg, jpg).
             msg (bool): Si se debe mostrar un mensaje de éxito o no.
+            options (dict, optional): DPI, tamaño y compresión (get_render_options).
 
-        Returns:
-            None
+        Yields:
+            tuple[int, bytes]: (índice de la página, JPEG) a medida que se renderizan.
         """
-        #try:
-        # Procesar archivos basados en su extensión
-        
-        if file_extension == "pdf":
-            # Obtener el archivo PDF desde el bucket
-            object = bucket_service.get_object(object_name)
-            if object:
-                # Abrir el documento PDF desde el stream binario
-                pdf_document = fitz.open(stream=object, filetype="pdf")
-
-                # Iterar sobre cada página del documento
-                for page_num in range(len(pdf_document)):
-                    # Cargar la página actual
-                    page = pdf_document[page_num]
-
-                    # Convertir la página a un objeto pixmap
-                    pix = page.get_pixmap(dpi=300, colorspace="rgb")
-
-                    # Convertir el pixmap a un objeto PIL.Image
-                    image = Image.frombytes("RGB", [pix.width, pix.height], pix.samples)
-
-                    # Guardar la imagen en formato JPEG
-                    image_path = os.path.join(output_directory, f"doc_{page_num + 1}.jpeg")
-                    image.save(image_path, format="JPEG", quality=95, optimize=True, progressive=True)
-
-                # Cerrar el documento PDF
-                pdf_document.close()
-        
-
-        elif file_extension in ["png", "jpeg", "jpg"]:
-            # Guardar la imagen directamente
-            object = bucket_service.get_object(object_name)
-            if object:
-                # Obtener el archivo PDF desde el bucket
-                image = Image.open(io.BytesIO(object))
-                if image.mode == 'RGBA':
-                    image = image.convert('RGB')
-                image_path = os.path.join(output_directory, f"img_1.jpeg")
-                image.save(image_path, format="JPEG", quality=95, optimize=True, progressive=True)
+        yield from DocumentMultimodalService._render(object_name, "Single", file_extension, options)
 
         # Mostrar mensaje de éxito si se solicita
         if msg:
             component.get_toast("The file was processed successfully.", ":material/description:")
-            
+
     @staticmethod
-    def get_extraction(user_id, agent_id, output_directory):
+    def get_concurrency(model_id):
+        """
+        Llamadas simultáneas al modelo de visión: ``CON_GEN_AI_MM_CONCURRENCY_MODELS``
+        ("modelo:n,modelo:n") o ``CON_GEN_AI_MM_CONCURRENCY`` por defecto.
+        """
+        return max(1, int(_get_model_setting("CON_GEN_AI_MM_CONCURRENCY", model_id, 4)))
+
+    @staticmethod
+    def get_extraction(user_id, agent_id, pages):
+        """
+        Extrae el contenido de cada imagen con el modelo de visión del agente.
+
+        Cada imagen se envía al LLM apenas llega (el renderizado y la extracción se
+        solapan), con a lo sumo ``get_concurrency(model_id)`` llamadas simultáneas por
+        modelo en todo el proceso. Las páginas ya extraídas con la misma imagen, prompt y
+        modelo salen de PageCacheService. El Markdown se reensambla en orden de página.
+
+        Args:
+            user_id (int): The ID of the user.
+            agent_id (int): The ID of the agent.
+            pages (iterable[tuple[int, bytes]]): (índice, JPEG) como los entrega single_page / doble_page.
+
+        Returns:
+            str: Markdown combinado de todas las páginas.
+        """
         # Filter modules by user and conditions
         df_agents = df_agents = db_agent_service.get_all_agents_cache(user_id, force_update=True)[lambda df: (df["AGENT_ID"].isin([agent_id]))]
+        model_id  = str(df_agents["AGENT_MODEL_NAME"].values[0])
+        prompt    = str(df_agents["AGENT_PROMPT_SYSTEM"].values[0])
         
         # Initialize the LLM model with configuration from the selected agent
         llm = ChatOCIGenAI(
-            model_id         = str(df_agents["AGENT_MODEL_NAME"].values[0]),
+            model_id         = model_id,
             service_endpoint = os.getenv("CON_GEN_AI_SERVICE_ENDPOINT"),
             compartment_id   = os.getenv("CON_COMPARTMENT_ID"),
             provider         = str(df_agents["AGENT_MODEL_PROVIDER"].values[0]),
@@ -182,7 +301,7 @@ class DocumentMultimodalService:
         #
         prompt_template = ChatPromptTemplate.from_messages(
             [
-                ("system", str(df_agents["AGENT_PROMPT_SYSTEM"].values[0])),
+                ("system", prompt),
                 ("user",
                     [
                         {
@@ -198,96 +317,54 @@ class DocumentMultimodalService:
         #
         chain = prompt_template | llm | StrOutputParser()
 
-        #
-        base64_images = utl_function_service.encode_images_to_base64(output_directory)
-
-        result = chain.batch(
-            [{"input_imagen": input_imagen} for input_imagen in base64_images],
-            max_concurrency=2
-        )
+        concurrency = DocumentMultimodalService.get_concurrency(model_id)
+        slots       = _get_model_slots(model_id, concurrency)
+
+        def extract(image, key):
+            # El semáforo limita las llamadas al modelo entre todas las ingestas del proceso
+            with slots:
+                content = chain.invoke({"input_imagen": base64.b64encode(image).decode("utf-8")})
+            page_cache_service.put(key, {"content": content})
+            return content
+
+        # Las imágenes se envían a medida que el generador las entrega
+        results = {}
+        with ThreadPoolExecutor(max_workers=concurrency, thread_name_prefix="mm-extract") as executor:
+            futures = {}
+            for index, image in pages:
+                key    = page_cache_service.get_key(page_cache_service.get_hash(image), prompt, model_id)
+                cached = page_cache_service.get(key)
+                if cached is not None:
+                    results[index] = cached["content"]
+                else:
+                    futures[executor.submit(extract, image, key)] = index
+            for future in as_completed(futures):
+                results[futures[future]] = future.result()
+
+        if futures or results:
+            logger.info(f"[Multimodal] {len(results) - len(futures)} of {len(results)} pages from the page cache")
 
         # Combine Markdown content from all pages
-        markdown_output = "".join(result)
+        markdown_output = "".join(results[index] for index in sorted(results))
         
         return markdown_output
 
-
-    def doble_page(object_name, output_directory, msg: bool = False):
+    @staticmethod
+    def doble_page(object_name, msg: bool = False, options=None):
         """
         Combina las páginas de un archivo PDF en pares, generando imágenes combinadas.
-        Si el PDF tiene una sola página, se procesa como una única imagen.
+        Si el PDF tiene una cantidad impar de páginas, la última va sola.
 
         Args:
             object_name (str): Nombre del objeto PDF en el bucket.
             msg (bool): Si se debe mostrar un mensaje de éxito o no.
+            options (dict, optional): DPI, tamaño y compresión (get_render_options).
 
-        Returns:
-            list: Una lista de imágenes combinadas (o únicas) en formato base64.
+        Yields:
+            tuple[int, bytes]: (índice del par, JPEG) a medida que se renderizan.
         """
-        data = []
-
-        # Obtener el archivo PDF desde el bucket
-        object = bucket_service.get_object(object_name)
-        if object:
-            # Abrir el documento PDF desde el stream binario
-            pdf_document = fitz.open(stream=object, filetype="pdf")
-
-            # Caso especial: si el PDF tiene solo una página
-            if len(pdf_document) == 1:
-                page = pdf_document[0]
-                pix = page.get_pixmap(dpi=300, colorspace="rgb") 
-                image = Image.frombytes("RGB", [pix.width, pix.height], pix.samples)
-
-                # Guardar la imagen en un buffer
-                buffer = io.BytesIO()
-                image.save(buffer, format="JPEG", quality=95, optimize=True, progressive=True)
-                buffer.seek(0)
-
-                # Codificar la imagen en base64
-                encoded_image = base64.b64encode(buffer.read()).decode("utf-8")
-                data.append(encoded_image)
-
-            else:
-                # Iterar sobre las páginas del documento en pares
-                page_num = 0
-                while page_num < len(pdf_document) - 1:
-                    # Cargar las dos páginas actuales
-                    page1 = pdf_document[page_num]
-                    page2 = pdf_document[page_num + 1]
-
-                    # Convertir las páginas a imágenes
-                    pix1 = page1.get_pixmap(dpi=300)
-                    pix2 = page2.get_pixmap(dpi=300)
-
-                    # Convertir pixmaps a objetos PIL.Image
-                    image1 = Image.frombytes("RGB", [pix1.width, pix1.height], pix1.samples)
-                    image2 = Image.frombytes("RGB", [pix2.width, pix2.height], pix2.samples)
-
-                    # Calcular el tamaño de la imagen combinada
-                    combined_width = max(image1.width, image2.width)
-                    combined_height = image1.height + image2.height
-
-                    # Crear una nueva imagen combinada
-                    combined_image = Image.new("RGB", (combined_width, combined_height))
-
-                    # Pegar las dos imágenes en la imagen combinada
-                    combined_image.paste(image1, (0, 0))
-                    combined_image.paste(image2, (0, image1.height))
-
-                    # Guardar la imagen en formato JPEG
-                    image_path = os.path.join(output_directory, f"doc_{page_num + 1}.jpeg")
-                    combined_image.save(image_path, format="JPEG", quality=95, optimize=True, progressive=True)
-
-                    # Avanzar al siguiente par de páginas
-                    page_num += 2
-
-            # Cerrar el documento PDF
-            pdf_document.close()
+        yield from DocumentMultimodalService._render(object_name, "Double", "pdf", options)
 
         # Mostrar mensaje de éxito si se solicita
         if msg:
             component.get_toast("The PDF was processed successfully.", ":material/description:")
-
-        return data
-
- 
@@ -2,16 +2,21 @@ import os
 import oci
 import uuid
 import fitz
+import base64
+import hashlib
 
 from dotenv import load_dotenv
 import components as component
 import services as service
 import services.database as database
 import utils as utils
+from services.job_manager import JobManager, wait_for_state
 
 # Initialize services
 config               = oci.config.from_file(profile_name=os.getenv('CON_OCI_PROFILE_NAME', 'DEFAULT'))
 bucket_service       = service.BucketService()
+page_cache_service   = service.PageCacheService()
+job_manager          = JobManager()
 file_service         = database.FileService()
 doc_service          = database.DocService()
 utl_function_service = utils.FunctionService()
@@ -21,116 +26,386 @@ language_map         = {
     "English"    : "en"
 }
 
+# Page cache: "model" and configuration of the processor job
+DU_MODEL_ID         = "oci-ai-document/general"
+DU_PROCESSOR_CONFIG = "text-extraction|searchable-pdf"
+# Background job type (JOBS.JOB_TYPE)
+JOB_TYPE            = "DOCUMENT_UNDERSTANDING"
+
 load_dotenv()
 
 class DocumentUnderstandingService:
 
+    @staticmethod
+    def _get_page_hash(pdf_document, page):
+        """
+        Hash of what a page draws: geometry, content streams, the raw data of its images
+        and form XObjects, its fonts (type, base font and encoding), its annotations and
+        the values of its form fields. Unlike a low resolution render, a one-digit edit
+        always changes it.
+        """
+        digest = hashlib.sha256(f"{tuple(page.rect)}|{page.rotation}".encode("utf-8"))
+        digest.update(page.read_contents())
+        xrefs = [image[0] for image in page.get_images(full=True)] + [xobject[0] for xobject in page.get_xobjects()]
+        for xref in xrefs:
+            digest.update(pdf_document.xref_stream_raw(xref) or b"")
+        # get_fonts(full=True): (xref, ext, type, basefont, name, encoding, referencer)
+        for font in page.get_fonts(full=True):
+            digest.update(f"|{font[2]}|{font[3]}|{font[5]}".encode("utf-8"))
+        # Anotaciones: su diccionario (contenido, /V de los widgets) y su apariencia
+        for annot in page.annots():
+            digest.update(pdf_document.xref_object(annot.xref, compressed=True).encode("utf-8"))
+            appearance = pdf_document.xref_get_key(annot.xref, "AP/N")
+            if appearance[0] == "xref":
+                digest.update(pdf_document.xref_stream_raw(int(appearance[1].split()[0])) or b"")
+        # Valor de los campos de formulario (puede estar en el campo padre, no en el widget)
+        for widget in page.widgets():
+            digest.update(f"|{widget.field_name}|{widget.field_value}".encode("utf-8"))
+        return digest.hexdigest()
+
+    @staticmethod
+    def _get_page_keys(pdf_bytes, language):
+        """
+        Page cache keys of a PDF: content hash of each page (_get_page_hash) plus the
+        processor configuration (features and language).
+        """
+        config = f"{DU_PROCESSOR_CONFIG}|{language}"
+        keys   = []
+        with fitz.open(stream=pdf_bytes, filetype="pdf") as pdf_document:
+            for page in pdf_document:
+                page_hash = DocumentUnderstandingService._get_page_hash(pdf_document, page)
+                keys.append(page_cache_service.get_key(page_hash, config, DU_MODEL_ID))
+        return keys
+
+    @staticmethod
+    def _get_page_pdf(pdf_document, page_num):
+        """
+        A single page of a document as PDF bytes.
+        """
+        page_document = fitz.open()
+        try:
+            page_document.insert_pdf(pdf_document, from_page=page_num, to_page=page_num)
+            return page_document.tobytes(garbage=3, deflate=True)
+        finally:
+            page_document.close()
+
+    @staticmethod
+    def _get_subset_pdf(pdf_bytes, page_nums):
+        """
+        PDF with only the given pages (0-based), in that order.
+        """
+        with fitz.open(stream=pdf_bytes, filetype="pdf") as pdf_document:
+            subset = fitz.open()
+            try:
+                for page_num in page_nums:
+                    subset.insert_pdf(pdf_document, from_page=page_num, to_page=page_num)
+                return subset.tobytes(garbage=3, deflate=True)
+            finally:
+                subset.close()
+
+    @staticmethod
+    def _stitch_pdf(page_count, cached, fresh_document=None, missing=()):
+        """
+        Rebuilds the searchable PDF in page order from cached pages and the pages of a new job.
+
+        Args:
+            page_count (int): Pages of the source document.
+            cached (dict[int, dict]): Cache values ({"pdf": base64}) by page number.
+            fresh_document (fitz.Document, optional): Searchable PDF of the job (only the missing pages).
+            missing (list[int]): Page numbers processed by the job, in job order.
+
+        Returns:
+            bytes: The stitched PDF.
+        """
+        fresh  = {page_num: position for position, page_num in enumerate(missing)}
+        output = fitz.open()
+        try:
+            for page_num in range(page_count):
+                if page_num in fresh:
+                    output.insert_pdf(fresh_document, from_page=fresh[page_num], to_page=fresh[page_num])
+                else:
+                    with fitz.open(stream=base64.b64decode(cached[page_num]["pdf"]), filetype="pdf") as page_document:
+                        output.insert_pdf(page_document)
+            return output.tobytes(garbage=3, deflate=True)
+        finally:
+            output.close()
+
+    @staticmethod
+    def prepare_job(params):
+        """
+        Looks the PDF pages up in the page cache and decides what the OCI job must process.
+
+        Sets in ``params``: ``keys`` (page cache key of each page, PDF only), ``missing``
+        (pages not cached) and ``job_object_name`` (object sent to the job: the original,
+        a delta PDF with the missing pages, or None when every page is cached).
+        """
+        object_name = params["object_name"]
+        base_path, file_name = object_name.rsplit("/", 1)
+        file_name = file_name.rsplit(".", 1)[0]
+
+        # Page cache (PDF only): pages with the same image and configuration are reused
+        source, keys, cached = None, [], []
+        if page_cache_service.is_enabled() and object_name.lower().endswith(".pdf"):
+            source = bucket_service.get_object(object_name)
+            if source:
+                keys   = DocumentUnderstandingService._get_page_keys(source, params["language"])
+                cached = [page_num for page_num, key in enumerate(keys) if page_cache_service.get(key) is not None]
+        missing = [page_num for page_num in range(len(keys)) if page_num not in cached]
+
+        job_object_name = object_name
+        if keys and not missing:
+            # Every page is cached: no job at all
+            job_object_name = None
+        elif cached:
+            # Only the new pages go to the job
+            job_object_name = f"{base_path}/{file_name}_delta.pdf"
+            bucket_service.upload_file(job_object_name, DocumentUnderstandingService._get_subset_pdf(source, missing))
+
+        params.update({"keys": keys, "missing": missing, "job_object_name": job_object_name})
+        return params
+
+    @staticmethod
+    def start_job(params):
+        """
+        Prepares (prepare_job) and submits the processor job without waiting for it.
+
+        Args:
+            params (dict): object_name, prefix, language (code) and file_id.
+
+        Returns:
+            str | None: The processor job OCID, or None when every page is cached.
+        """
+        DocumentUnderstandingService.prepare_job(params)
+        if params["job_object_name"] is None:
+            return None
+
+        # Configure input and output locations
+        object_location = oci.ai_document.models.ObjectLocation(
+            namespace_name = os.getenv('CON_ADB_BUK_NAMESPACENAME'),
+            bucket_name    = os.getenv('CON_ADB_BUK_NAME'),
+            object_name    = params["job_object_name"]
+        )
+        output_location = oci.ai_document.models.OutputLocation(
+            namespace_name = os.getenv('CON_ADB_BUK_NAMESPACENAME'),
+            bucket_name    = os.getenv('CON_ADB_BUK_NAME'),
+            prefix         = params["prefix"]
+        )
+
+        # Configure processor job details
+        processor_job_details = oci.ai_document.models.CreateProcessorJobDetails(
+            display_name     = str(uuid.uuid4()),
+            compartment_id   = os.getenv('CON_COMPARTMENT_ID'),
+            input_location   = oci.ai_document.models.ObjectStorageLocations(object_locations=[object_location]),
+            output_location  = output_location,
+            processor_config = oci.ai_document.models.GeneralProcessorConfig(
+                features =[
+                    oci.ai_document.models.DocumentTextExtractionFeature(generate_searchable_pdf=True),
+                    #oci.ai_document.models.DocumentTableExtractionFeature(),
+                    #oci.ai_document.models.DocumentKeyValueExtractionFeature(),
+                    #oci.ai_document.models.DocumentLanguageClassificationFeature(),
+                ],
+                language = params["language"]
+            )
+        )
+
+        # Create the processor job (the caller polls it with get_job_state)
+        response = oci.ai_document.AIServiceDocumentClient(config).create_processor_job(
+            create_processor_job_details=processor_job_details
+        )
+        return response.data.id
+
+    @staticmethod
+    def get_job_state(processor_job_id):
+        """
+        Lifecycle state of a processor job (ACCEPTED, IN_PROGRESS, SUCCEEDED, FAILED...).
+        """
+        return oci.ai_document.AIServiceDocumentClient(config).get_processor_job(processor_job_id).data.lifecycle_state
+
+    @staticmethod
+    def complete_job(params, processor_job_id, progress=None):
+        """
+        Collects the results of a finished job: stitches the searchable PDF with the cached
+        pages, extracts the text and loads the vector store. Safe to run outside Streamlit.
+
+        Args:
+            params (dict): Result of prepare_job plus file_id and prefix.
+            processor_job_id (str | None): The processor job OCID (None if every page was cached).
+            progress (callable, optional): Vector store progress callback.
+
+        Returns:
+            dict: message, data (process_pdf output), pages, characters and cached (pages reused).
+
+        Raises:
+            RuntimeError: If the job output is missing or no text could be extracted, so the
+                job is marked FAILED instead of storing an empty extraction.
+        """
+        object_name     = params["object_name"]
+        keys            = params["keys"]
+        missing         = params["missing"]
+        job_object_name = params["job_object_name"]
+
+        # Extract base path and filename without extension
+        base_path, file_name = object_name.rsplit("/", 1)
+        file_name = file_name.rsplit(".", 1)[0]
+        object_name_pdf  = f"{base_path}/{file_name}_trg.pdf"
+        object_name_json = f"{base_path}/{file_name}_trg.json"
+
+        cached = {}
+        for page_num in range(len(keys)):
+            if page_num not in missing:
+                cached[page_num] = page_cache_service.get(keys[page_num])
+                if cached[page_num] is None:
+                    raise RuntimeError(f"Page {page_num + 1} was evicted from the page cache; process the file again.")
+
+        if job_object_name is None:
+            if not bucket_service.upload_file(object_name_pdf, DocumentUnderstandingService._stitch_pdf(len(keys), cached)):
+                raise RuntimeError(f"Could not upload '{object_name_pdf}'.")
+        else:
+            # Construct paths for processed objects
+            namespace_bucket      = f"{os.getenv('CON_ADB_BUK_NAMESPACENAME')}_{os.getenv('CON_ADB_BUK_NAME')}"
+            processed_object_base = f"{params['prefix']}/{processor_job_id}"
+            processed_object_pdf  = f"{processed_object_base}/{namespace_bucket}/searchablePdf/{job_object_name}.pdf"
+            processed_object_json = f"{processed_object_base}/{namespace_bucket}/results/{job_object_name}.json"
+
+            if keys:
+                # Cache the new pages and stitch them with the cached ones
+                searchable_pdf = bucket_service.get_object(processed_object_pdf)
+                if not searchable_pdf:
+                    raise RuntimeError(f"Searchable PDF '{processed_object_pdf}' not found in the job output.")
+                with fitz.open(stream=searchable_pdf, filetype="pdf") as fresh_document:
+                    for position, page_num in enumerate(missing):
+                        page_pdf = DocumentUnderstandingService._get_page_pdf(fresh_document, position)
+                        page_cache_service.put(keys[page_num], {"pdf": base64.b64encode(page_pdf).decode("utf-8")})
+                    if cached:
+                        searchable_pdf = DocumentUnderstandingService._stitch_pdf(len(keys), cached, fresh_document, missing)
+                if not bucket_service.upload_file(object_name_pdf, searchable_pdf):
+                    raise RuntimeError(f"Could not upload '{object_name_pdf}'.")
+            else:
+                # Move PDF file
+                if not bucket_service.move_object(processed_object_pdf, object_name_pdf):
+                    raise RuntimeError(f"Searchable PDF '{processed_object_pdf}' not found in the job output.")
+
+            # Move JSON file
+            if not bucket_service.move_object(processed_object_json, object_name_json):
+                raise RuntimeError(f"Results '{processed_object_json}' not found in the job output.")
+
+            # List and delete all objects in the processed folder
+            list_objects = bucket_service.list_objects(processed_object_base)
+            for obj_name in list_objects:
+                bucket_service.delete_object(obj_name)
+
+            if job_object_name != object_name:
+                bucket_service.delete_object(job_object_name)
+
+        # Build the new name for the processed file
+        object_name_trg = f"{object_name.rsplit('.', 1)[0]}_trg.pdf"
+        
+        # Process the PDF and extract data
+        data = DocumentUnderstandingService.process_pdf(object_name_trg)
+        if not data:
+            raise RuntimeError(f"No text could be extracted from '{object_name_trg}'.")
+        
+        # Process file extraction
+        file_trg_extraction = "\n".join([str(page["content"]) for page in data if "content" in page]) if data else ""
+        file_service.update_extraction(params["file_id"], file_trg_extraction)
+        
+        # Process Vector Store
+        doc_service.vector_store(params["file_id"], progress)
+
+        return {
+            "message"    : f"[AI Document Understanding] Module executed successfully.",
+            "data"       : data,
+            "pages"      : data[-1].get('page_number', 0) if data else 0,
+            "characters" : sum(page.get('characters', 0) for page in data) if data else 0,
+            "cached"     : len(cached)
+        }
+
     @staticmethod
     def create(
             object_name,
             prefix,
             language,
-            file_id
+            file_id,
+            progress=None,
+            raise_errors=False
         ):
         """
-        Sends a document to the OCI Document Understanding service for processing.
+        Sends a document to the OCI Document Understanding service for processing and waits for it.
+
+        PDF pages already processed with the same language are taken from PageCacheService:
+        only the new or changed pages are sent to the job, and the searchable PDF is
+        stitched back in page order (the ``_trg.json`` result then covers only those pages).
+        The job is polled with exponential backoff up to ``CON_JOB_TIMEOUT``; use submit_job to
+        run it in the background instead.
 
         Args:
             object_name (str) : The name of the object in the OCI bucket.
             prefix (str)      : The output prefix for processed files.
             language (str)    : The language of the document (e.g., 'English', 'Spanish').
             file_id (str)     : The ID of the file to associate with the vector store.
+            progress (callable, optional): Vector store progress callback. When given, the caller
+                draws the UI (e.g. an ingest worker): no toasts or progress bar are created here.
+            raise_errors (bool): If True, errors are raised instead of shown with get_error.
 
         Returns:
             tuple: A success message and extracted data, or an error message.
         """
         try:
-            # Map language to code
-            language = language_map.get(language)
-            
-            # Configure input and output locations
-            object_location = oci.ai_document.models.ObjectLocation(
-                namespace_name = os.getenv('CON_ADB_BUK_NAMESPACENAME'),
-                bucket_name    = os.getenv('CON_ADB_BUK_NAME'),
-                object_name    = object_name
-            )
-            output_location = oci.ai_document.models.OutputLocation(
-                namespace_name = os.getenv('CON_ADB_BUK_NAMESPACENAME'),
-                bucket_name    = os.getenv('CON_ADB_BUK_NAME'),
-                prefix         = prefix
-            )
+            params = {
+                "object_name" : object_name,
+                "prefix"      : prefix,
+                "language"    : language_map.get(language),
+                "file_id"     : file_id
+            }
+            processor_job_id = DocumentUnderstandingService.start_job(params)
+            if processor_job_id is not None:
+                wait_for_state(DocumentUnderstandingService.get_job_state, processor_job_id)
 
-            # Configure processor job details
-            processor_job_details = oci.ai_document.models.CreateProcessorJobDetails(
-                display_name     = str(uuid.uuid4()),
-                compartment_id   = os.getenv('CON_COMPARTMENT_ID'),
-                input_location   = oci.ai_document.models.ObjectStorageLocations(object_locations=[object_location]),
-                output_location  = output_location,
-                processor_config = oci.ai_document.models.GeneralProcessorConfig(
-                    features =[
-                        oci.ai_document.models.DocumentTextExtractionFeature(generate_searchable_pdf=True),
-                        #oci.ai_document.models.DocumentTableExtractionFeature(),
-                        #oci.ai_document.models.DocumentKeyValueExtractionFeature(),
-                        #oci.ai_document.models.DocumentLanguageClassificationFeature(),
-                    ],
-                    language = language
-                )
-            )
-
-            # Create the processor job and wait for completion
-            aiservicedocument_client = oci.ai_document.AIServiceDocumentClientCompositeOperations(
-                oci.ai_document.AIServiceDocumentClient(config)
-            )
-            response = aiservicedocument_client.create_processor_job_and_wait_for_state(
-                create_processor_job_details=processor_job_details,
-                wait_for_states=[oci.ai_document.models.ProcessorJob.LIFECYCLE_STATE_SUCCEEDED]
-            )
-            processor_job = response.data
-        
-            if processor_job:
+            msg    = progress is None
+            result = DocumentUnderstandingService.complete_job(params, processor_job_id, progress or component.get_progress())
+            if result["cached"]:
+                component.get_toast(f"{result['cached']} page(s) reused from the page cache.", ":material/cached:") if msg else None
+            component.get_toast(f"File extraction has been updated successfully.", ":material/database:") if msg else None
+            return result["message"], result["data"]
 
-                # Construct paths for processed objects
-                processed_object_base = f"{prefix}/{processor_job.id}"
-                processed_object_pdf  = f"{processed_object_base}/{output_location.namespace_name}_{output_location.bucket_name}/searchablePdf/{object_name}.pdf"
-                processed_object_json = f"{processed_object_base}/{output_location.namespace_name}_{output_location.bucket_name}/results/{object_name}.json"
+        except Exception as e:
+            if raise_errors:
+                raise
+            component.get_error(f"[Error] Creating Document Understanding:\n{e}")
 
-                # Extract base path and filename without extension
-                base_path, file_name = object_name.rsplit("/", 1)
-                file_name = file_name.rsplit(".", 1)[0]
+    @staticmethod
+    def submit_job(
+            object_name,
+            prefix,
+            language,
+            file_id,
+            user_id,
+            file_trg_obj_name,
+            file_trg_language
+        ):
+        """
+        Runs create in the background job manager and returns immediately.
 
-                # Move PDF file
-                object_name_pdf = f"{base_path}/{file_name}_trg.pdf"                
-                bucket_service.move_object(processed_object_pdf, object_name_pdf)
-
-                # Move JSON file
-                object_name_json = f"{base_path}/{file_name}_trg.json"
-                bucket_service.move_object(processed_object_json, object_name_json)
-
-                # List and delete all objects in the processed folder
-                list_objects = bucket_service.list_objects(processed_object_base)
-                for obj_name in list_objects:
-                    bucket_service.delete_object(obj_name)
-
-                # Build the new name for the processed file
-                object_name_trg = f"{object_name.rsplit('.', 1)[0]}_trg.pdf"
-                
-                # Process the PDF and extract data
-                data = DocumentUnderstandingService.process_pdf(object_name_trg)
-                
-                # Process file extraction
-                file_trg_extraction = "\n".join([str(page["content"]) for page in data if "content" in page]) if data else ""
-                msg = file_service.update_extraction(file_id, file_trg_extraction)
-                component.get_toast(msg, ":material/database:")
-                
-                # Process Vector Store
-                msg = doc_service.vector_store(file_id)
-                component.get_toast(msg, ":material/database:")
-                
-                mg = f"[AI Document Understanding] Module executed successfully."
-                return mg, data
+        Args:
+            object_name (str)       : The name of the object in the OCI bucket.
+            prefix (str)            : The output prefix for processed files.
+            language (str)          : The language of the document (e.g., 'English', 'Spanish').
+            file_id (int)           : The ID of the file to associate with the vector store.
+            user_id (int)           : Owner of the job.
+            file_trg_obj_name (str) : Target object name stored in FILES when the job succeeds.
+            file_trg_language (str) : Language stored in FILES when the job succeeds.
 
-        except Exception as e:
-            component.get_error(f"[Error] Creating Document Understanding:\n{e}")
+        Returns:
+            int: The JOB_ID (see JobManager).
+        """
+        return job_manager.submit(JOB_TYPE, user_id, file_id, {
+            "object_name"       : object_name,
+            "prefix"            : prefix,
+            "language"          : language_map.get(language),
+            "file_id"           : int(file_id),
+            "file_trg_obj_name" : file_trg_obj_name,
+            "file_trg_language" : file_trg_language
+        })
         
     @staticmethod
     def process_pdf(object_name, msg: bool = False):
@@ -176,4 +451,13 @@ class DocumentUnderstandingService:
 
         except Exception as e:
             component.get_error(f"[Error] Processing PDF:\n{e}")
-            return []
\ No newline at end of file
+            return []
+
+
+# Handler of the background job manager
+job_manager.register(
+    JOB_TYPE,
+    DocumentUnderstandingService.start_job,
+    DocumentUnderstandingService.get_job_state,
+    DocumentUnderstandingService.complete_job
+)
@@ -5,11 +5,16 @@
 # ============================================================
 
 import os
+import re
+import json
+import math
+import time
+import asyncio
 import logging
-from typing import List, Optional, Any
+from concurrent.futures import ThreadPoolExecutor, TimeoutError as FuturesTimeoutError
+from typing import List, Optional, Iterator, AsyncIterator
 
 # OCI SDK - Igual que ENTEL
-import oci
 from oci.generative_ai_inference import GenerativeAiInferenceClient
 from oci.generative_ai_inference.models import (
     OnDemandServingMode,
@@ -22,21 +27,24 @@ from oci.generative_ai_inference.models import (
     ImageContent,
     ImageUrl,
 )
-from oci.retry import NoneRetryStrategy
+
+from services.genai_registry import GenAIClientRegistry
 
 # LangChain Core (para RAG, prompts, chains - NO para el LLM)
 from langchain_core.language_models.chat_models import BaseChatModel
-from langchain_core.messages import BaseMessage, HumanMessage, AIMessage, SystemMessage as LCSystemMessage
-from langchain_core.outputs import ChatResult, ChatGeneration
+from langchain_core.messages import BaseMessage, HumanMessage, AIMessage, AIMessageChunk, SystemMessage as LCSystemMessage
+from langchain_core.outputs import ChatResult, ChatGeneration, ChatGenerationChunk
+from langchain_core.documents import Document
 from langchain_core.prompts import ChatPromptTemplate, MessagesPlaceholder, PromptTemplate
 from langchain_core.prompts.chat import SystemMessagePromptTemplate
 from langchain_core.runnables import RunnablePassthrough, RunnableBranch, RunnableLambda
 from langchain_core.output_parsers import StrOutputParser
-from langchain_core.callbacks.manager import CallbackManagerForLLMRun
+from langchain_core.callbacks.manager import CallbackManagerForLLMRun, AsyncCallbackManagerForLLMRun
 from pydantic import Field
 
 import components as component
 import services.database as database
+from services.database.connection import Connection
 from dotenv import load_dotenv
 
 # Initialize
@@ -58,42 +66,12 @@ def get_oci_genai_client() -> GenerativeAiInferenceClient:
     """
     Cliente OCI para Generative AI.
     Soporta: RESOURCE_PRINCIPAL, INSTANCE_PRINCIPAL, API_KEY
+
+    El cliente sale del pool de GenAIClientRegistry y queda en manos de quien llama
+    (no vuelve al pool); para llamadas puntuales usar GenAIClientRegistry().lease_client().
     """
-    auth_type = os.getenv("CON_GEN_AI_AUTH_TYPE", "RESOURCE_PRINCIPAL")
-    endpoint = os.getenv("CON_GEN_AI_SERVICE_ENDPOINT")
-    
     try:
-        if auth_type == "RESOURCE_PRINCIPAL":
-            signer = oci.auth.signers.get_resource_principals_signer()
-            client = GenerativeAiInferenceClient(
-                config={},
-                signer=signer,
-                service_endpoint=endpoint,
-                retry_strategy=NoneRetryStrategy(),
-                timeout=(10, 240),
-            )
-        elif auth_type == "INSTANCE_PRINCIPAL":
-            signer = oci.auth.signers.InstancePrincipalsSecurityTokenSigner()
-            client = GenerativeAiInferenceClient(
-                config={},
-                signer=signer,
-                service_endpoint=endpoint,
-                retry_strategy=NoneRetryStrategy(),
-                timeout=(10, 240),
-            )
-        else:
-            # API_KEY - config file
-            config = oci.config.from_file()
-            oci.config.validate_config(config)
-            client = GenerativeAiInferenceClient(
-                config=config,
-                service_endpoint=endpoint,
-                retry_strategy=NoneRetryStrategy(),
-                timeout=(10, 240),
-            )
-        
-        logger.info(f"✅ Cliente OCI GenAI inicializado (auth={auth_type})")
-        return client
+        return GenAIClientRegistry().get_client()
         
     except Exception as e:
         logger.error(f"❌ Error inicializando cliente OCI: {e}")
@@ -128,44 +106,12 @@ class ChatOCIGenAIDirect(BaseChatModel):
     top_p: float = Field(default=0.9)
     auth_type: str = Field(default="RESOURCE_PRINCIPAL")
     
-    _client: Any = None
-    
-    def model_post_init(self, __context: Any) -> None:
-        """Inicializa el cliente OCI después de la validación."""
-        self._client = self._create_client()
-    
-    def _create_client(self) -> GenerativeAiInferenceClient:
-        """Crea el cliente OCI GenAI."""
-        auth_type = self.auth_type or os.getenv("CON_GEN_AI_AUTH_TYPE", "RESOURCE_PRINCIPAL")
-        endpoint = self.service_endpoint or os.getenv("CON_GEN_AI_SERVICE_ENDPOINT")
-        
-        if auth_type == "RESOURCE_PRINCIPAL":
-            signer = oci.auth.signers.get_resource_principals_signer()
-            return GenerativeAiInferenceClient(
-                config={},
-                signer=signer,
-                service_endpoint=endpoint,
-                retry_strategy=NoneRetryStrategy(),
-                timeout=(10, 240),
-            )
-        elif auth_type == "INSTANCE_PRINCIPAL":
-            signer = oci.auth.signers.InstancePrincipalsSecurityTokenSigner()
-            return GenerativeAiInferenceClient(
-                config={},
-                signer=signer,
-                service_endpoint=endpoint,
-                retry_strategy=NoneRetryStrategy(),
-                timeout=(10, 240),
-            )
-        else:
-            config = oci.config.from_file()
-            oci.config.validate_config(config)
-            return GenerativeAiInferenceClient(
-                config=config,
-                service_endpoint=endpoint,
-                retry_strategy=NoneRetryStrategy(),
-                timeout=(10, 240),
-            )
+    def _lease_client(self):
+        """
+        Presta un cliente OCI GenAI del pool (GenAIClientRegistry) durante una llamada: la
+        instancia del LLM se comparte entre sesiones, el cliente no se usa en dos hilos a la vez.
+        """
+        return GenAIClientRegistry().lease_client(self.auth_type, self.service_endpoint)
     
     @property
     def _llm_type(self) -> str:
@@ -207,18 +153,8 @@ class ChatOCIGenAIDirect(BaseChatModel):
         
         return oci_messages
     
-    def _generate(
-        self,
-        messages: List[BaseMessage],
-        stop: Optional[List[str]] = None,
-        run_manager: Optional[CallbackManagerForLLMRun] = None,
-        **kwargs
-    ) -> ChatResult:
-        """Genera respuesta usando OCI SDK directamente."""
-        
-        if self._client is None:
-            self._client = self._create_client()
-        
+    def _chat_details(self, messages: List[BaseMessage], is_stream: bool = False) -> ChatDetails:
+        """Arma el ChatDetails del request (is_stream=True: respuesta como eventos SSE)."""
         oci_messages = self._convert_messages(messages)
         
         # Crear request - IGUAL QUE ENTEL
@@ -228,16 +164,29 @@ class ChatOCIGenAIDirect(BaseChatModel):
             max_tokens=self.max_tokens,
             temperature=self.temperature,
             top_p=self.top_p,
+            is_stream=is_stream,
         )
         
-        chat_details = ChatDetails(
+        return ChatDetails(
             compartment_id=self.compartment_id,
             serving_mode=OnDemandServingMode(model_id=self.model_id),
             chat_request=chat_request,
         )
+
+    def _generate(
+        self,
+        messages: List[BaseMessage],
+        stop: Optional[List[str]] = None,
+        run_manager: Optional[CallbackManagerForLLMRun] = None,
+        **kwargs
+    ) -> ChatResult:
+        """Genera respuesta usando OCI SDK directamente."""
+        
+        chat_details = self._chat_details(messages)
         
         # Llamar API
-        response = self._client.chat(chat_details)
+        with self._lease_client() as client:
+            response = client.chat(chat_details)
         
         # Extraer texto - IGUAL QUE ENTEL
         text = ""
@@ -258,6 +207,70 @@ class ChatOCIGenAIDirect(BaseChatModel):
             ]
         )
     
+    def _stream(
+        self,
+        messages: List[BaseMessage],
+        stop: Optional[List[str]] = None,
+        run_manager: Optional[CallbackManagerForLLMRun] = None,
+        **kwargs
+    ) -> Iterator[ChatGenerationChunk]:
+        """
+        Genera la respuesta token a token con el modo streaming de OCI GenAI (SSE).
+        Registra el tiempo al primer token (TTFT) junto a la latencia total.
+        """
+        start = time.perf_counter()
+        ttft = None
+        
+        chat_details = self._chat_details(messages, is_stream=True)
+        # El cliente queda prestado hasta consumir el stream (la respuesta usa su sesión HTTP)
+        with self._lease_client() as client:
+            response = client.chat(chat_details)
+
+            for event in response.data.events():
+                data = json.loads(event.data)
+                # Formato GENERIC: {"message": {"content": [{"type": "TEXT", "text": "..."}]}}
+                message = data.get("message") or {}
+                text = "".join(
+                    part.get("text", "") for part in message.get("content") or [] if isinstance(part, dict)
+                )
+                if not text:
+                    continue
+
+                if ttft is None:
+                    ttft = time.perf_counter() - start
+                chunk = ChatGenerationChunk(message=AIMessageChunk(content=text))
+                if run_manager:
+                    run_manager.on_llm_new_token(text, chunk=chunk)
+                yield chunk
+
+        total = time.perf_counter() - start
+        logger.info(
+            f"✅ Stream {self.model_id}: TTFT {ttft if ttft is not None else total:.2f} s, total {total:.2f} s"
+        )
+
+    async def _astream(
+        self,
+        messages: List[BaseMessage],
+        stop: Optional[List[str]] = None,
+        run_manager: Optional[AsyncCallbackManagerForLLMRun] = None,
+        **kwargs
+    ) -> AsyncIterator[ChatGenerationChunk]:
+        """
+        Versión async de _stream: el SDK de OCI es síncrono, así que cada evento SSE
+        se lee en el executor por defecto sin bloquear el event loop.
+        """
+        loop = asyncio.get_running_loop()
+        iterator = self._stream(messages, stop=stop, **kwargs)
+        done = object()
+        
+        while True:
+            chunk = await loop.run_in_executor(None, next, iterator, done)
+            if chunk is done:
+                break
+            if run_manager:
+                await run_manager.on_llm_new_token(chunk.text, chunk=chunk)
+            yield chunk
+
     @property
     def _identifying_params(self) -> dict:
         return {
@@ -272,11 +285,17 @@ class ChatOCIGenAIDirect(BaseChatModel):
 # =============================================================================
 from langchain_core.runnables import RunnableLambda
 
-def create_stuff_documents_chain(llm, prompt):
+def create_stuff_documents_chain(llm, prompt, stream=False):
     """
     Recreación de create_stuff_documents_chain.
-    Retorna el texto de respuesta del LLM.
+    Retorna el texto de respuesta del LLM (con ``stream=True``, un generador de
+    fragmentos de texto para ``st.write_stream``).
     """
+    def stream_answer(messages):
+        for chunk in llm.stream(messages):
+            if chunk.content:
+                yield chunk.content
+
     def format_docs(inputs):
         docs = inputs.get("context", [])
         if isinstance(docs, list) and len(docs) > 0:
@@ -292,6 +311,8 @@ def create_stuff_documents_chain(llm, prompt):
         
         # Ejecutar prompt -> llm
         messages = prompt.invoke(prompt_inputs)
+        if stream:
+            return stream_answer(messages)
         response = llm.invoke(messages)
         
         # Extraer texto
@@ -302,29 +323,135 @@ def create_stuff_documents_chain(llm, prompt):
     return RunnableLambda(run_chain)
 
 
-def create_history_aware_retriever(llm, retriever, prompt):
+# always: reformula siempre que haya historial
+# auto: el clasificador decide si la pregunta depende del historial
+# race: como auto, pero la búsqueda con la pregunta original corre en paralelo y se usa
+#       si la reformulación no termina antes de CON_GEN_AI_REPHRASE_DEADLINE segundos
+REPHRASE_MODES = ("always", "auto", "race")
+
+# Anáforas y referencias al turno anterior (es / en)
+FOLLOW_UP_WORDS = {
+    "eso", "esto", "aquello", "ese", "esa", "esos", "esas", "este", "esta", "estos", "estas",
+    "ello", "ellos", "ellas", "anterior", "anteriores", "mismo", "misma", "mismos", "mismas",
+    "dicho", "dicha", "arriba", "último", "última",
+    "it", "its", "that", "this", "those", "these", "they", "them", "their",
+    "he", "she", "him", "her", "previous", "above", "same", "former", "latter",
+}
+FOLLOW_UP_PREFIXES = ("y ", "e ", "pero ", "entonces ", "también ", "and ", "also ", "what about ", "how about ")
+FOLLOW_UP_MAX_WORDS = 3
+
+_rephrase_executor = ThreadPoolExecutor(max_workers=8, thread_name_prefix="rephrase", initializer=lambda: Connection().require_scope())
+
+
+def _cosine(a, b):
+    dot = sum(x * y for x, y in zip(a, b))
+    norm = math.sqrt(sum(x * x for x in a)) * math.sqrt(sum(y * y for y in b))
+    return dot / norm if norm else 0.0
+
+
+def needs_rephrase(question, history, embedding_function=None, threshold=0.75, turns=2):
+    """
+    Clasificador rápido: ¿la pregunta necesita el historial para entenderse?
+
+    1. Heurísticas: pronombres/demostrativos, conectores iniciales ("y ...", "what about ...")
+       o preguntas de pocas palabras ("¿y en 2021?").
+    2. Similitud de embeddings con las últimas preguntas del usuario: un tema nuevo
+       (similitud baja) no necesita reformulación. Los embeddings salen de
+       QueryEmbeddingCache, así que normalmente no hay llamadas extra.
+
+    Returns:
+        bool: True si conviene reformular con el LLM.
+    """
+    if not history:
+        return False
+
+    text  = " ".join(str(question).lower().replace("¿", " ").split())
+    words = re.findall(r"\w+", text)
+    if len(words) <= FOLLOW_UP_MAX_WORDS or text.startswith(FOLLOW_UP_PREFIXES):
+        return True
+    if FOLLOW_UP_WORDS.intersection(words):
+        return True
+
+    if embedding_function is None:
+        return False
+
+    previous = [
+        msg.content for msg in history
+        if isinstance(msg, HumanMessage) and isinstance(msg.content, str)
+    ][-turns:]
+    if not previous:
+        return False
+
+    query_cache = database.QueryEmbeddingCache()
+    question_embedding = query_cache.get_or_embed(embedding_function, question)
+    similarity = max(
+        _cosine(question_embedding, query_cache.get_or_embed(embedding_function, content))
+        for content in previous
+    )
+    return similarity >= threshold
+
+
+def create_history_aware_retriever(llm, retriever, prompt, rephrase_mode="always", embedding_function=None):
     """
     Recreación de create_history_aware_retriever.
     Si hay historial, reformula la pregunta antes de buscar.
+
+    Con ``rephrase_mode`` "auto" o "race" la llamada de reformulación (una respuesta
+    completa del LLM) se omite cuando ``needs_rephrase`` indica que la pregunta se
+    entiende sola.
     """
+    if rephrase_mode not in REPHRASE_MODES:
+        raise ValueError(f"rephrase_mode must be one of {REPHRASE_MODES}")
+    threshold = float(os.getenv("CON_GEN_AI_REPHRASE_THRESHOLD", 0.75))
+    deadline  = float(os.getenv("CON_GEN_AI_REPHRASE_DEADLINE", 2.5))
+
+    def rephrase_and_retrieve(inputs):
+        messages = prompt.invoke(inputs)
+        response = llm.invoke(messages)
+        
+        if hasattr(response, 'content'):
+            rephrased = response.content
+        else:
+            rephrased = str(response)
+        
+        # Buscar con pregunta reformulada
+        return retriever.invoke(rephrased)
+
     def run_retriever(inputs):
         chat_history = inputs.get("chat_history", inputs.get("history", []))
+        question     = inputs.get("input", "")
         
-        if chat_history and len(chat_history) > 0:
-            # Reformular pregunta con contexto del historial
-            messages = prompt.invoke(inputs)
-            response = llm.invoke(messages)
-            
-            if hasattr(response, 'content'):
-                rephrased = response.content
-            else:
-                rephrased = str(response)
-            
-            # Buscar con pregunta reformulada
-            return retriever.invoke(rephrased)
-        else:
+        if not chat_history:
             # Sin historial, buscar directamente
-            return retriever.invoke(inputs.get("input", ""))
+            return retriever.invoke(question)
+
+        if rephrase_mode != "always":
+            start = time.perf_counter()
+            rephrase = needs_rephrase(question, chat_history, embedding_function, threshold)
+            logger.info(f"[RAG] rephrase={rephrase} ({(time.perf_counter() - start) * 1000:.1f} ms)")
+            if not rephrase:
+                return retriever.invoke(question)
+
+        if rephrase_mode != "race":
+            # Reformular pregunta con contexto del historial
+            return rephrase_and_retrieve(inputs)
+
+        def scoped(leg, value):
+            # Cada rama con su propia conexión del pool: la perdedora puede seguir corriendo
+            # después de que termine el run del script
+            with Connection().acquire():
+                return leg(value)
+
+        rephrased_future = _rephrase_executor.submit(scoped, rephrase_and_retrieve, inputs)
+        raw_future       = _rephrase_executor.submit(scoped, retriever.invoke, question)
+        try:
+            return rephrased_future.result(timeout=deadline)
+        except FuturesTimeoutError:
+            logger.info(f"[RAG] rephrase exceeded {deadline} s, using the original question")
+            return raw_future.result()
+        except Exception as e:
+            logger.warning(f"⚠️ [RAG] rephrase failed, using the original question: {e}")
+            return raw_future.result()
     
     return RunnableLambda(run_retriever)
 
@@ -378,24 +505,43 @@ class GenerativeAIService:
         model_name = str(df_agents["AGENT_MODEL_NAME"].values[0])
         temperature = float(df_agents["AGENT_TEMPERATURE"].values[0])
         
-        # Usar ChatOCIGenAIDirect para TODOS los proveedores
-        # (google, cohere, meta, xai - todos funcionan igual)
-        llm = ChatOCIGenAIDirect(
-            model_id=model_name,
-            service_endpoint=os.getenv("CON_GEN_AI_SERVICE_ENDPOINT"),
-            compartment_id=os.getenv("CON_COMPARTMENT_ID"),
-            auth_type=os.getenv("CON_GEN_AI_AUTH_TYPE", "RESOURCE_PRINCIPAL"),
-            temperature=temperature,
-            max_tokens=4096,
-        )
+        params = {
+            "model_id": model_name,
+            "service_endpoint": os.getenv("CON_GEN_AI_SERVICE_ENDPOINT"),
+            "compartment_id": os.getenv("CON_COMPARTMENT_ID"),
+            "auth_type": os.getenv("CON_GEN_AI_AUTH_TYPE", "RESOURCE_PRINCIPAL"),
+            "temperature": temperature,
+            "max_tokens": 4096,
+        }
+        
+        def create_llm():
+            # Usar ChatOCIGenAIDirect para TODOS los proveedores
+            # (google, cohere, meta, xai - todos funcionan igual)
+            llm = ChatOCIGenAIDirect(**params)
+            logger.info(f"✅ LLM inicializado: {model_name} (provider={provider})")
+            return llm
         
-        logger.info(f"✅ LLM inicializado: {model_name} (provider={provider})")
-        return llm
+        # Una instancia por configuración, reutilizada entre preguntas y sesiones
+        return GenAIClientRegistry().get_llm(tuple(sorted(params.items())), create_llm)
 
     @staticmethod
-    def get_chain(file_id, user_id, agent_id, history, input, input_imagen):
+    def get_chain(file_id, user_id, agent_id, history, input, input_imagen, hybrid=False, stream=False):
         """
         Crea una cadena RAG para el agente.
+
+        Con ``hybrid=True`` la recuperación combina búsqueda léxica y vectorial (RRF)
+        con los pesos AGENT_VECTOR_WEIGHT / AGENT_LEXICAL_WEIGHT del agente.
+
+        Con ``CON_ADB_VS_RERANK`` se recuperan CON_ADB_VS_RERANK_CANDIDATES chunks y solo
+        los CON_ADB_VS_RERANK_TOP_N mejores llegan al LLM; la duración de cada etapa
+        queda en ``result["timings"]`` (ms).
+
+        Con ``stream=True`` la recuperación se completa antes de retornar y
+        ``result["answer"]`` es un generador de fragmentos de texto (``st.write_stream``).
+
+        Con ``CON_GEN_AI_ANSWER_CACHE`` las preguntas que no dependen del historial se
+        buscan antes en ANSWER_CACHE (mismo agente, archivos y FILE_VERSION, similitud
+        >= umbral); ``result["cache"]`` indica si hubo acierto.
         """
         df_agents = db_agent_service.get_all_agents_cache(user_id)[
             lambda df: df["AGENT_ID"] == agent_id
@@ -403,17 +549,69 @@ class GenerativeAIService:
         
         llm = GenerativeAIService.get_llm(user_id, agent_id)
         
-        # Vector store
-        vector_store = db_doc_service.get_vector_store()
-        
-        # Retriever
-        context_retriever = vector_store.as_retriever(
-            search_type="similarity",
-            search_kwargs={
-                "k": 5,
-                "filter": {"file_id": file_id}
-            }
+        # DOCS guarda una copia de cada chunk por usuario del archivo
+        docs_filter = {"file_id": file_id, "user_id": user_id}
+        rerank      = os.getenv('CON_ADB_VS_RERANK', 'True').lower() in ('true', '1', 'yes')
+        candidates  = int(os.getenv('CON_ADB_VS_RERANK_CANDIDATES', 30))
+        timings     = {}
+        embedding_function = db_doc_service.get_embeddings()
+
+        # Caché semántica de respuestas: solo preguntas autocontenidas y sin imagen
+        file_ids     = list(file_id) if isinstance(file_id, (list, tuple)) else [file_id]
+        answer_cache = database.AnswerCacheService()
+        use_cache    = answer_cache.is_enabled() and not input_imagen and not needs_rephrase(
+            input, history, embedding_function, float(os.getenv("CON_GEN_AI_REPHRASE_THRESHOLD", 0.75))
         )
+        if use_cache:
+            try:
+                question_embedding = database.QueryEmbeddingCache().get_or_embed(embedding_function, input)
+                files_version = answer_cache.get_files_version(file_ids)
+                cached = answer_cache.get(agent_id, file_ids, question_embedding, files_version)
+            except Exception as e:
+                logger.warning(f"⚠️ Answer cache not available: {e}")
+                use_cache, cached = False, None
+
+            if cached:
+                logger.info(
+                    f"[RAG] answer cache hit (similarity {cached['similarity']:.3f}, "
+                    f"{cached['answer_tokens']} tokens saved)"
+                )
+                return {
+                    "input": input,
+                    "context": [Document(**doc) for doc in cached["context"]],
+                    "answer": iter([cached["answer"]]) if stream else cached["answer"],
+                    "chat_history": history,
+                    "timings": timings,
+                    "cache": {"hit": True, "similarity": cached["similarity"], "saved_tokens": cached["answer_tokens"]}
+                }
+
+        # Retriever
+        if hybrid:
+            context_retriever = db_doc_service.get_hybrid_retriever(
+                k              = candidates if rerank else 5,
+                filter         = docs_filter,
+                vector_weight  = df_agents["AGENT_VECTOR_WEIGHT"].values[0],
+                lexical_weight = df_agents["AGENT_LEXICAL_WEIGHT"].values[0]
+            )
+        else:
+            context_retriever = None
+
+        if rerank:
+            context_retriever = db_doc_service.get_rerank_retriever(
+                filter         = docs_filter,
+                base_retriever = context_retriever,
+                candidates     = candidates,
+                on_timing      = lambda stage, ms: timings.__setitem__(stage, round(ms, 1))
+            )
+        elif context_retriever is None:
+            vector_store = db_doc_service.get_vector_store()
+            context_retriever = vector_store.as_retriever(
+                search_type="similarity",
+                search_kwargs={
+                    "k": 5,
+                    "filter": docs_filter
+                }
+            )
         
         # Prompt de reformulación
         reformulation_prompt = ChatPromptTemplate.from_messages([
@@ -425,7 +623,9 @@ class GenerativeAIService:
         history_aware_retriever = create_history_aware_retriever(
             llm,
             context_retriever,
-            reformulation_prompt
+            reformulation_prompt,
+            rephrase_mode      = os.getenv("CON_GEN_AI_REPHRASE_MODE", "auto"),
+            embedding_function = embedding_function
         )
         
         # Prompt de Q&A
@@ -451,7 +651,7 @@ class GenerativeAIService:
                 ("human", "{input}")
             ])
         
-        combine_docs_chain = create_stuff_documents_chain(llm, question_answer_prompt)
+        combine_docs_chain = create_stuff_documents_chain(llm, question_answer_prompt, stream=stream)
         
         chain = create_retrieval_chain(
             retriever=history_aware_retriever,
@@ -470,13 +670,47 @@ class GenerativeAIService:
                 "input": input,
                 "history": history
             })
-        
+
+        if timings:
+            logger.info(f"[RAG] retrieval timings (ms): {timings}")
+        result["timings"] = timings
+        result["cache"] = {"hit": False}
+
+        if use_cache:
+            context = result.get("context", [])
+
+            def store(answer):
+                if not answer:
+                    return
+                try:
+                    answer_cache.put(
+                        agent_id, file_ids, files_version, input, question_embedding,
+                        answer, context, len(llm.get_token_ids(answer))
+                    )
+                except Exception as e:
+                    logger.warning(f"⚠️ Answer not cached: {e}")
+
+            if stream:
+                # Se guarda al terminar de consumir el stream
+                def cache_stream(chunks):
+                    parts = []
+                    for chunk in chunks:
+                        parts.append(chunk)
+                        yield chunk
+                    store("".join(parts))
+
+                result["answer"] = cache_stream(result["answer"])
+            else:
+                store(result["answer"])
+
         return result
 
     @staticmethod
-    def get_agent(user_id, agent_id, input):
+    def get_agent(user_id, agent_id, input, stream=False):
         """
         Invocación directa al LLM sin RAG.
+
+        Con ``stream=True`` retorna un generador de fragmentos de texto (``st.write_stream``).
         """
         df_agents = db_agent_service.get_all_agents_cache(user_id)[
             lambda df: df["AGENT_ID"] == agent_id
@@ -490,6 +724,13 @@ class GenerativeAIService:
             template="{system_text}\n{query}"
         )
         chain = system_prompt | llm
+
+        if stream:
+            return (
+                chunk.content
+                for chunk in chain.stream({"system_text": system_text, "query": input})
+                if chunk.content
+            )
         
         response = chain.invoke({"system_text": system_text, "query": input})
         
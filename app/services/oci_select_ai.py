@@ -158,6 +158,8 @@ class SelectAIService:
             )
 
             db_select_ai_service.get_tables_cache(user_id, force_update=True)
+            # Las respuestas cacheadas no conocen la nueva tabla
+            db_select_ai_service.invalidate_chat_cache(profile_name)
 
             return f"[Select AI]: Module executed successfully."
         except Exception as e:
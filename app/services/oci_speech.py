@@ -2,40 +2,207 @@ import os
 import oci
 import uuid
 import json
-import time
 
 from dotenv import load_dotenv
 import components as component
 import services as service
 import services.database as database
 import utils as utils
+from services.job_manager import JobManager, wait_for_state
 
 # Initialize services
 config               = oci.config.from_file(profile_name=os.getenv('CON_OCI_PROFILE_NAME', 'DEFAULT'))
 bucket_service       = service.BucketService()
 db_file_service      = database.FileService()
 db_doc_service       = database.DocService()
+job_manager          = JobManager()
 utl_function_service = utils.FunctionService()
 language_map         = {
     "Spanish"    : "es",
     "Portuguese" : "pt",
     "English"    : "en"
 }
+# Background job type (JOBS.JOB_TYPE)
+JOB_TYPE             = "SPEECH"
 
 load_dotenv()
 
 class SpeechService:
 
+    @staticmethod
+    def start_job(params):
+        """
+        Submits the transcription job without waiting for it.
+
+        Args:
+            params (dict): object_name, prefix and language (code).
+
+        Returns:
+            str: The transcription job OCID.
+        """
+        # Configure input and output locations
+        object_location = oci.ai_speech.models.ObjectLocation(
+            namespace_name = os.getenv('CON_ADB_BUK_NAMESPACENAME'),
+            bucket_name    = os.getenv('CON_ADB_BUK_NAME'),
+            object_names   = [params["object_name"]]
+        )
+        input_location = oci.ai_speech.models.ObjectListInlineInputLocation(
+            location_type    = "OBJECT_LIST_INLINE_INPUT_LOCATION",
+            object_locations = [object_location],
+        )
+        output_location = oci.ai_speech.models.OutputLocation(
+            namespace_name = os.getenv('CON_ADB_BUK_NAMESPACENAME'),
+            bucket_name    = os.getenv('CON_ADB_BUK_NAME'),
+            prefix         = params["prefix"]
+        )
+        normalization = oci.ai_speech.models.TranscriptionNormalization(
+            is_punctuation_enabled = True
+        )
+        diarization = oci.ai_speech.models.Diarization(
+            is_diarization_enabled = True,
+            number_of_speakers     = 2,
+        )
+        transcription_settings = oci.ai_speech.models.TranscriptionSettings(
+            diarization = diarization
+        )
+        model_details = oci.ai_speech.models.TranscriptionModelDetails(
+            language_code = params["language"],
+            model_type    = "WHISPER_MEDIUM",
+            transcription_settings = transcription_settings,
+        )
+        
+        # Configure processor job details
+        transcription_job_details = oci.ai_speech.models.CreateTranscriptionJobDetails(
+            display_name    = str(uuid.uuid4()),
+            compartment_id  = os.getenv('CON_COMPARTMENT_ID'),
+            description     = "App",
+            model_details   = model_details,
+            input_location  = input_location,
+            additional_transcription_formats=["SRT"],
+            normalization   = normalization,
+            output_location = output_location
+        )
+
+        # Create the transcription job (the caller polls it with get_job_state)
+        response = oci.ai_speech.AIServiceSpeechClient(config).create_transcription_job(
+            create_transcription_job_details=transcription_job_details
+        )
+        return response.data.id
+
+    @staticmethod
+    def get_job_state(transcription_job_id):
+        """
+        Lifecycle state of a transcription job (ACCEPTED, IN_PROGRESS, SUCCEEDED, FAILED...).
+        """
+        return oci.ai_speech.AIServiceSpeechClient(config).get_transcription_job(
+            transcription_job_id = transcription_job_id
+        ).data.lifecycle_state
+
+    @staticmethod
+    def complete_job(params, transcription_job_id, progress=None):
+        """
+        Collects the results of a finished transcription job: moves the JSON and SRT,
+        uploads the TXT, updates the extraction and loads the vector store. Safe to run
+        outside Streamlit.
+
+        Args:
+            params (dict): object_name, file_id and trg_type ('SRT' or 'TXT').
+            transcription_job_id (str): The transcription job OCID.
+            progress (callable, optional): Vector store progress callback.
+
+        Returns:
+            dict: message, data, pages and characters.
+
+        Raises:
+            RuntimeError: If the transcription output is missing or empty, so the job is
+                marked FAILED instead of storing an empty extraction.
+        """
+        object_name = params["object_name"]
+        transcription_job = oci.ai_speech.AIServiceSpeechClient(config).get_transcription_job(
+            transcription_job_id = transcription_job_id
+        ).data
+
+        # Construct paths for processed objects                
+        transcription_object_base = transcription_job.output_location.prefix[:-1]
+        namespace_bucket          = f"{os.getenv('CON_ADB_BUK_NAMESPACENAME')}_{os.getenv('CON_ADB_BUK_NAME')}"
+
+        transcription_object_json = f"{transcription_object_base}/{namespace_bucket}_{object_name}.json"
+        transcription_object_srt  = f"{transcription_object_base}/{namespace_bucket}_{object_name}.srt"
+        
+        # Extract base path and filename without extension
+        base_path, file_name = object_name.rsplit("/", 1)
+        file_name = file_name.rsplit(".", 1)[0]
+
+        # Move JSON file
+        object_name_json = f"{base_path}/{file_name}_trg.json"
+        if not bucket_service.move_object(transcription_object_json, object_name_json):
+            raise RuntimeError(f"Transcription '{transcription_object_json}' not found in the job output.")
+        
+        # Move SRT file
+        object_name_srt = f"{base_path}/{file_name}_trg.srt"
+        if not bucket_service.move_object(transcription_object_srt, object_name_srt):
+            raise RuntimeError(f"Subtitles '{transcription_object_srt}' not found in the job output.")
+
+        # List and delete all objects in the processed folder
+        list_objects = bucket_service.list_objects(transcription_object_base)
+        for obj_name in list_objects:
+            bucket_service.delete_object(obj_name)
+
+        # Build the new name for the processed file
+        object_name_trg_srt  = f"{object_name.rsplit('.', 1)[0]}_trg.srt"
+        object_name_trg_json = f"{object_name.rsplit('.', 1)[0]}_trg.json"
+        object_name_trg_txt  = f"{object_name.rsplit('.', 1)[0]}_trg.txt"
+
+        # Process
+        data_srt  = SpeechService.process_file(object_name_trg_srt)
+        data_json = SpeechService.process_file(object_name_trg_json)
+        if not data_srt or not data_json:
+            raise RuntimeError(f"The transcription of '{object_name}' could not be read.")
+        data_txt  = SpeechService.process_transcriptions(data_json)
+
+        # Upload file to Bucket
+        if not bucket_service.upload_file(
+            object_name     = object_name_trg_txt,
+            put_object_body = data_txt
+        ):
+            raise RuntimeError(f"Could not upload '{object_name_trg_txt}'.")
+
+        data = None
+
+        if params["trg_type"] == "SRT":
+            data = data_srt
+        elif params["trg_type"] == "TXT":
+            data = data_txt
+        
+        # Process file extraction
+        file_trg_extraction = str(data)
+        db_file_service.update_extraction(params["file_id"], file_trg_extraction)
+        
+        # Process Vector Store
+        db_doc_service.vector_store(params["file_id"], progress)
+
+        return {
+            "message"    : f"[AI Speech] Module executed successfully.",
+            "data"       : data,
+            "pages"      : 1,
+            "characters" : len(file_trg_extraction)
+        }
+
     @staticmethod
     def create_job(
             object_name,
             prefix,
             language,
             file_id,
-            trg_type
+            trg_type,
+            progress=None,
+            raise_errors=False
         ):
         """
-        Sends a document to the OCI Document Understanding service for processing.
+        Sends an audio file to the OCI Speech service for transcription and waits for it.
+
+        The job is polled with exponential backoff up to ``CON_JOB_TIMEOUT``; use submit_job
+        to run it in the background instead.
 
         Args:
             object_name (str) : The name of the object in the OCI bucket.
@@ -43,144 +210,79 @@ class SpeechService:
             language (str)    : The language of the document (e.g., 'English', 'Spanish').
             file_id (str)     : The ID of the file to associate with the vector store.
             trg_type (str)    : The type of target processing (e.g., 'SRT', 'TXT').
+            progress (callable, optional): Vector store progress callback. When given, the caller
+                draws the UI (e.g. an ingest worker): no toasts or progress bar are created here.
+            raise_errors (bool): If True, errors are raised instead of shown with get_error.
 
         Returns:
             tuple: A success message and extracted data, or an error message.
         """
         try:
-             # Map language to code
-            language = language_map.get(language)
-
-            # Configure input and output locations
-            object_location = oci.ai_speech.models.ObjectLocation(
-                namespace_name = os.getenv('CON_ADB_BUK_NAMESPACENAME'),
-                bucket_name    = os.getenv('CON_ADB_BUK_NAME'),
-                object_names   = [object_name]
-            )
-            input_location = oci.ai_speech.models.ObjectListInlineInputLocation(
-                location_type    = "OBJECT_LIST_INLINE_INPUT_LOCATION",
-                object_locations = [object_location],
-            )
-            output_location = oci.ai_speech.models.OutputLocation(
-                namespace_name = os.getenv('CON_ADB_BUK_NAMESPACENAME'),
-                bucket_name    = os.getenv('CON_ADB_BUK_NAME'),
-                prefix         = prefix
-            )
-            normalization = oci.ai_speech.models.TranscriptionNormalization(
-                is_punctuation_enabled = True
-            )
-            diarization = oci.ai_speech.models.Diarization(
-                is_diarization_enabled = True,
-                number_of_speakers     = 2,
-            )
-            transcription_settings = oci.ai_speech.models.TranscriptionSettings(
-                diarization = diarization
-            )
-            model_details = oci.ai_speech.models.TranscriptionModelDetails(
-                language_code = language,
-                model_type    = "WHISPER_MEDIUM",
-                transcription_settings = transcription_settings,
-            )
-            
-            # Configure processor job details
-            transcription_job_details = oci.ai_speech.models.CreateTranscriptionJobDetails(
-                display_name    = str(uuid.uuid4()),
-                compartment_id  = os.getenv('CON_COMPARTMENT_ID'),
-                description     = "App",
-                model_details   = model_details,
-                input_location  = input_location,
-                additional_transcription_formats=["SRT"],
-                normalization   = normalization,
-                output_location = output_location
-            )
-
-            # Create the processor job and wait for completion
-            aiservicespeech_client = oci.ai_speech.AIServiceSpeechClient(config)
-            response = aiservicespeech_client.create_transcription_job(
-                create_transcription_job_details=transcription_job_details
-            )
-            transcription_job = response.data
-
-            if transcription_job:
-                
-                while True:
-                    get_transcription_job_response = aiservicespeech_client.get_transcription_job(
-                        transcription_job_id = transcription_job.id)
-                    
-                    if get_transcription_job_response.data.lifecycle_state == "SUCCEEDED":
-                        break
-                    time.sleep(5)
-                
-                # Construct paths for processed objects                
-                transcription_object_base = transcription_job.output_location.prefix[:-1]
-                #object_name = transcription_job.input_location.object_locations.object_names
-
-                transcription_object_json  = f"{transcription_object_base}/{output_location.namespace_name}_{output_location.bucket_name}_{object_name}.json"
-                transcription_object_srt = f"{transcription_object_base}/{output_location.namespace_name}_{output_location.bucket_name}_{object_name}.srt"
-                
-                # Extract base path and filename without extension
-                base_path, file_name = object_name.rsplit("/", 1)
-                file_name = file_name.rsplit(".", 1)[0]
-
-                # Move JSON file
-                object_name_json = f"{base_path}/{file_name}_trg.json"
-                bucket_service.move_object(transcription_object_json, object_name_json)
-                
-                # Move SRT file
-                object_name_srt = f"{base_path}/{file_name}_trg.srt"
-                bucket_service.move_object(transcription_object_srt, object_name_srt)
-
-                # List and delete all objects in the processed folder
-                list_objects = bucket_service.list_objects(transcription_object_base)
-                for obj_name in list_objects:
-                    bucket_service.delete_object(obj_name)
-
-                # Build the new name for the processed file
-                object_name_trg_srt  = f"{object_name.rsplit('.', 1)[0]}_trg.srt"
-                object_name_trg_json = f"{object_name.rsplit('.', 1)[0]}_trg.json"
-                object_name_trg_txt  = f"{object_name.rsplit('.', 1)[0]}_trg.txt"
-
-                # Process
-                data_srt  = SpeechService.process_file(object_name_trg_srt)
-                data_json = SpeechService.process_file(object_name_trg_json)
-                data_txt  = SpeechService.process_transcriptions(data_json)
-
-                # Upload file to Bucket
-                bucket_service.upload_file(
-                    object_name     = object_name_trg_txt,
-                    put_object_body = data_txt,
-                    msg             = True
-                )
-
-                data = None
-
-                if trg_type == "SRT":
-                    data = data_srt
-                elif trg_type == "TXT":
-                    data = data_txt
-                
-                # Process file extraction
-                file_trg_extraction = str(data)
-                msg = db_file_service.update_extraction(file_id, file_trg_extraction)
-                component.get_toast(msg, ":material/database:")
-                
-                # Process Vector Store
-                msg = db_doc_service.vector_store(file_id)
-                component.get_toast(msg, ":material/database:")
-                
-                mg = f"[AI Speech] Module executed successfully."
-                return mg, data
+            params = {
+                "object_name" : object_name,
+                "prefix"      : prefix,
+                "language"    : language_map.get(language),
+                "file_id"     : file_id,
+                "trg_type"    : trg_type
+            }
+            transcription_job_id = SpeechService.start_job(params)
+            wait_for_state(SpeechService.get_job_state, transcription_job_id)
+
+            result = SpeechService.complete_job(params, transcription_job_id, progress or component.get_progress())
+            component.get_toast(f"File extraction has been updated successfully.", ":material/database:") if progress is None else None
+            return result["message"], result["data"]
 
         except Exception as e:
+            if raise_errors:
+                raise
             component.get_error(f"[Error] Creating Speech:\n{e}")
 
+    @staticmethod
+    def submit_job(
+            object_name,
+            prefix,
+            language,
+            file_id,
+            trg_type,
+            user_id,
+            file_trg_obj_name,
+            file_trg_language
+        ):
+        """
+        Runs create_job in the background job manager and returns immediately.
+
+        Args:
+            object_name (str)       : The name of the object in the OCI bucket.
+            prefix (str)            : The output prefix for processed files.
+            language (str)          : The language of the document (e.g., 'English', 'Spanish').
+            file_id (int)           : The ID of the file to associate with the vector store.
+            trg_type (str)          : The type of target processing (e.g., 'SRT', 'TXT').
+            user_id (int)           : Owner of the job.
+            file_trg_obj_name (str) : Target object name stored in FILES when the job succeeds.
+            file_trg_language (str) : Language stored in FILES when the job succeeds.
+
+        Returns:
+            int: The JOB_ID (see JobManager).
+        """
+        return job_manager.submit(JOB_TYPE, user_id, file_id, {
+            "object_name"       : object_name,
+            "prefix"            : prefix,
+            "language"          : language_map.get(language),
+            "file_id"           : int(file_id),
+            "trg_type"          : trg_type,
+            "file_trg_obj_name" : file_trg_obj_name,
+            "file_trg_language" : file_trg_language
+        })
+
     @staticmethod
     def create(
             object_name,
             prefix,
             language,
             file_id,
-            trg_type
+            trg_type,
+            progress=None,
+            raise_errors=False
         ):
         """
         Sends a document to the OCI Document Understanding service for processing.
@@ -191,6 +293,9 @@ class SpeechService:
             language (str)    : The language of the document (e.g., 'English', 'Spanish').
             file_id (str)     : The ID of the file to associate with the vector store.
             trg_type (str)    : The type of target processing (e.g., 'SRT', 'TXT').
+            progress (callable, optional): Vector store progress callback. When given, the caller
+                draws the UI (e.g. an ingest worker): no toasts or progress bar are created here.
+            raise_errors (bool): If True, errors are raised instead of shown with get_error.
 
         Returns:
             tuple: A success message and extracted data, or an error message.
@@ -210,22 +315,24 @@ class SpeechService:
             bucket_service.upload_file(
                 object_name     = object_name_trg,
                 put_object_body = data,
-                msg             = True
+                msg             = progress is None
             )
             
             # Process file extraction
             file_trg_extraction = str(data)
             msg = db_file_service.update_extraction(file_id, file_trg_extraction)
-            component.get_toast(msg, ":material/database:")
+            component.get_toast(msg, ":material/database:") if progress is None else None
             
             # Process Vector Store
-            msg = db_doc_service.vector_store(file_id)
-            component.get_toast(msg, ":material/database:")
+            msg = db_doc_service.vector_store(file_id, progress or component.get_progress())
+            component.get_toast(msg, ":material/database:") if progress is None else None
             
             mg = f"[AI Speech to Text Real-Time] Module executed successfully."
             return mg, data
 
         except Exception as e:
+            if raise_errors:
+                raise
             component.get_error(f"[Error] Creating Speech:\n{e}")
 
 
@@ -294,3 +401,12 @@ class SpeechService:
                 transcriptions.append(transcription_text)
 
         return " ".join(transcriptions)
+
+
+# Handler of the background job manager
+job_manager.register(
+    JOB_TYPE,
+    SpeechService.start_job,
+    SpeechService.get_job_state,
+    SpeechService.complete_job
+)
@@ -34,8 +34,26 @@ class AnalyzerEngineService:
             language,
             file_id,
             text,
-            trg_type
+            trg_type,
+            progress=None,
+            raise_errors=False
         ):
+        """
+        Anonymizes the PII of an extraction (Presidio) and loads it as the file's vector store.
+
+        Args:
+            object_name (str) : The name of the source object in the OCI bucket.
+            language (str)    : The language of the document.
+            file_id (str)     : The ID of the PII file to associate with the vector store.
+            text (str)        : The extraction to anonymize.
+            trg_type (str)    : The type of target processing (e.g., 'SRT', 'TXT').
+            progress (callable, optional): Vector store progress callback. When given, the caller
+                draws the UI (e.g. an ingest worker): no toasts or progress bar are created here.
+            raise_errors (bool): If True, errors are raised instead of shown with get_error.
+
+        Returns:
+            tuple: A success message and the anonymized data (False on a shown error).
+        """
         try:
             # Configura spaCy para español
             nlp_config = {
@@ -138,7 +156,7 @@ class AnalyzerEngineService:
                 bucket_service.upload_file(
                     object_name     = f"{base_path}/{file_name}_trg_pii.srt",
                     put_object_body = data,
-                    msg             = True
+                    msg             = progress is None
                 )
             elif trg_type == "TXT":
                 # Inicializa Anonymizer
@@ -172,22 +190,24 @@ class AnalyzerEngineService:
                 bucket_service.upload_file(
                     object_name     = f"{base_path}/{file_name}_trg_pii.txt",
                     put_object_body = data,
-                    msg             = True
+                    msg             = progress is None
                 )
             
 
             # Process file extraction
             file_trg_extraction = data
             msg = db_file_service.update_extraction(file_id, file_trg_extraction)
-            component.get_toast(msg, ":material/database:")
+            component.get_toast(msg, ":material/database:") if progress is None else None
 
             # Process Vector Store
-            msg = db_doc_service.vector_store(file_id)
-            component.get_toast(msg, ":material/database:")
+            msg = db_doc_service.vector_store(file_id, progress or component.get_progress())
+            component.get_toast(msg, ":material/database:") if progress is None else None
             
             mg = f"[Analyzer Engine] Module executed successfully."
             return mg, data
 
         except Exception as e:
+            if raise_errors:
+                raise
             component.get_error(f"[Error] Presidio-Anonymizer PII:\n{e}")
             return False
\ No newline at end of file
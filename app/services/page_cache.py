@@ -0,0 +1,209 @@
+import os
+import json
+import hashlib
+import logging
+import threading
+
+from dotenv import load_dotenv
+
+from .client import ClientService
+
+load_dotenv()
+
+logger = logging.getLogger(__name__)
+
+# Cada cuántas escrituras se revisa el tamaño del caché en Object Storage
+BUCKET_EVICTION_EVERY = 50
+
+
+class PageCacheService:
+    """
+    Content-addressed cache of page-level extraction results, shared by every worker.
+
+    Entries are keyed by (page image hash, prompt/config hash, model id), so re-processing
+    a file after a prompt tweak or a version bump only pays for the pages that changed.
+
+    - ``CON_GEN_AI_PAGE_CACHE``: ``local`` (directory ``CON_GEN_AI_PAGE_CACHE_DIR``),
+      ``bucket`` (prefix ``CON_GEN_AI_PAGE_CACHE_DIR`` in the app bucket) or ``off``.
+    - ``CON_GEN_AI_PAGE_CACHE_MAX_MB``: size cap; least recently used entries (local) or
+      oldest entries (bucket) are evicted first.
+    """
+    _instance = None
+    _lock = threading.Lock()
+
+    def __new__(cls):
+        if cls._instance is None:
+            with cls._lock:
+                if cls._instance is None:
+                    instance = super(PageCacheService, cls).__new__(cls)
+                    instance.backend   = os.getenv('CON_GEN_AI_PAGE_CACHE', 'local').lower()
+                    instance.directory = os.getenv('CON_GEN_AI_PAGE_CACHE_DIR', 'files/page_cache').rstrip("/")
+                    instance.max_bytes = int(float(os.getenv('CON_GEN_AI_PAGE_CACHE_MAX_MB', 512)) * 1024 ** 2)
+                    instance._size     = None
+                    instance._puts     = 0
+                    instance._stats    = {"hits": 0, "misses": 0, "evictions": 0}
+                    instance._mutex    = threading.Lock()
+                    cls._instance = instance
+        return cls._instance
+
+    def is_enabled(self):
+        return self.backend in ("local", "bucket")
+
+    @staticmethod
+    def get_hash(data):
+        """
+        SHA-256 of bytes or text.
+        """
+        return hashlib.sha256(data if isinstance(data, bytes) else str(data).encode("utf-8")).hexdigest()
+
+    @staticmethod
+    def get_key(image_hash, prompt, model_id):
+        """
+        Cache key of a page: image hash, hash of the prompt (or processor config) and model id.
+        """
+        return PageCacheService.get_hash(f"{image_hash}|{PageCacheService.get_hash(prompt)}|{model_id}")
+
+    def _get_path(self, key):
+        return os.path.join(self.directory, key[:2], key)
+
+    def _get_object_name(self, key):
+        return f"{self.directory}/{key[:2]}/{key}"
+
+    def get(self, key):
+        """
+        Returns the cached value of a key or None (errors count as a miss).
+
+        Returns:
+            dict | None: The stored JSON value.
+        """
+        if not self.is_enabled():
+            return None
+        try:
+            if self.backend == "local":
+                path = self._get_path(key)
+                with open(path, "rb") as f:
+                    data = f.read()
+                # mtime = último uso, para desalojar por LRU
+                os.utime(path)
+            else:
+                response = ClientService().get_client().get_object(
+                    namespace_name = os.getenv('CON_ADB_BUK_NAMESPACENAME'),
+                    bucket_name    = os.getenv('CON_ADB_BUK_NAME'),
+                    object_name    = self._get_object_name(key)
+                )
+                data = response.data.content
+            value = json.loads(data)
+        except FileNotFoundError:
+            value = None
+        except Exception as e:
+            if getattr(e, "status", None) != 404:
+                logger.warning(f"⚠️ Page cache read failed: {e}")
+            value = None
+
+        with self._mutex:
+            self._stats["hits" if value is not None else "misses"] += 1
+        return value
+
+    def put(self, key, value):
+        """
+        Stores a JSON-serializable value (errors are logged and ignored).
+        """
+        if not self.is_enabled():
+            return
+        data = json.dumps(value, ensure_ascii=False).encode("utf-8")
+        try:
+            if self.backend == "local":
+                path = self._get_path(key)
+                os.makedirs(os.path.dirname(path), exist_ok=True)
+                # Escritura atómica: otro worker nunca lee un archivo a medias
+                tmp_path = f"{path}.{os.getpid()}.{threading.get_ident()}.tmp"
+                with open(tmp_path, "wb") as f:
+                    f.write(data)
+                os.replace(tmp_path, path)
+                self._evict_local(len(data))
+            else:
+                ClientService().get_client().put_object(
+                    namespace_name  = os.getenv('CON_ADB_BUK_NAMESPACENAME'),
+                    bucket_name     = os.getenv('CON_ADB_BUK_NAME'),
+                    object_name     = self._get_object_name(key),
+                    put_object_body = data
+                )
+                self._evict_bucket()
+        except Exception as e:
+            logger.warning(f"⚠️ Page cache write failed: {e}")
+
+    def _list_local(self):
+        entries = []
+        for root, _, files in os.walk(self.directory):
+            for name in files:
+                path = os.path.join(root, name)
+                try:
+                    stat = os.stat(path)
+                except FileNotFoundError:
+                    continue
+                entries.append((stat.st_mtime, stat.st_size, path))
+        return entries
+
+    def _evict_local(self, added):
+        with self._mutex:
+            if self._size is None:
+                self._size = sum(size for _, size, _ in self._list_local())
+            else:
+                self._size += added
+            if self._size <= self.max_bytes:
+                return
+
+            # Se libera hasta el 90% del límite para no desalojar en cada escritura
+            entries = sorted(self._list_local())
+            self._size = sum(size for _, size, _ in entries)
+            for _, size, path in entries:
+                if self._size <= self.max_bytes * 0.9:
+                    break
+                try:
+                    os.remove(path)
+                    self._size -= size
+                    self._stats["evictions"] += 1
+                except FileNotFoundError:
+                    pass
+
+    def _evict_bucket(self):
+        with self._mutex:
+            self._puts += 1
+            if self._puts % BUCKET_EVICTION_EVERY:
+                return
+
+        client  = ClientService().get_client()
+        entries = []
+        start   = None
+        while True:
+            response = client.list_objects(
+                namespace_name = os.getenv('CON_ADB_BUK_NAMESPACENAME'),
+                bucket_name    = os.getenv('CON_ADB_BUK_NAME'),
+                prefix         = f"{self.directory}/",
+                fields         = "name,size,timeCreated",
+                start          = start
+            )
+            entries += [(obj.time_created, obj.size or 0, obj.name) for obj in response.data.objects]
+            start = response.data.next_start_with
+            if not start:
+                break
+
+        size = sum(entry[1] for entry in entries)
+        for _, entry_size, name in sorted(entries):
+            if size <= self.max_bytes * 0.9:
+                break
+            client.delete_object(
+                namespace_name = os.getenv('CON_ADB_BUK_NAMESPACENAME'),
+                bucket_name    = os.getenv('CON_ADB_BUK_NAME'),
+                object_name    = name
+            )
+            size -= entry_size
+            with self._mutex:
+                self._stats["evictions"] += 1
+
+    def get_stats(self):
+        """
+        Hit/miss/eviction counters of this process.
+        """
+        with self._mutex:
+            return dict(self._stats)
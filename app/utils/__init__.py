@@ -1,5 +1,12 @@
-from .functions import FunctionService
-
 __all__ = [
     "FunctionService"
-]
\ No newline at end of file
+]
+
+
+def __getattr__(name):
+    # Import diferido: los procesos del pool de renderizado importan utils.page_render
+    # sin cargar functions.py (oci, pandas, streamlit, graphviz, langchain_core)
+    if name == "FunctionService":
+        from .functions import FunctionService
+        return FunctionService
+    raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
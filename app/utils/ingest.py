@@ -0,0 +1,100 @@
+"""
+Ejecutor acotado para ingerir varios archivos en paralelo.
+
+Cada archivo recorre sus etapas (subida, registro, extracción, vector store) en un hilo
+del pool; los hilos informan el avance y sus mensajes por una cola y el hilo que llama (el
+script de Streamlit) los dibuja, de modo que la interfaz solo se actualiza desde un hilo.
+Los hilos del pool no reciben el contexto del script: a los servicios se les pasa un
+callback de avance basado en ``report`` (y ``raise_errors``) para que no dibujen por su cuenta
+y el error real de cada archivo llegue al resultado del lote.
+"""
+import os
+import queue
+from concurrent.futures import ThreadPoolExecutor, wait, FIRST_COMPLETED
+
+from dotenv import load_dotenv
+
+load_dotenv()
+
+# Etapas que informa cada archivo (ver app.py)
+STAGES = {
+    "queued"   : "Queued",
+    "upload"   : "Uploading",
+    "register" : "Registering",
+    "extract"  : "Extracting and vectorizing",
+    "pii"      : "Anonymizing",
+    "done"     : "Done",
+    "failed"   : "Failed"
+}
+
+
+def get_workers(item_count, max_workers=None):
+    """
+    Hilos a usar para un lote: ``CON_INGEST_WORKERS`` (4 por defecto), nunca más que archivos.
+    """
+    max_workers = int(max_workers or os.getenv('CON_INGEST_WORKERS', 4))
+    return max(1, min(max_workers, item_count))
+
+
+def run_ingestion(items, ingest, max_workers=None, on_update=None, initializer=None, poll=0.2):
+    """
+    Ejecuta ``ingest(index, item, report)`` para cada item con un máximo de hilos y
+    aislamiento de errores: la excepción de un archivo no detiene al resto del lote.
+
+    Con un solo hilo (o un solo item) todo corre en el hilo que llama, igual que el
+    procesamiento secuencial anterior.
+
+    Args:
+        items (list): Archivos a ingerir.
+        ingest (callable): ``ingest(index, item, report)``; ``report(stage, detail=None)``
+            informa la etapa actual (claves de STAGES) y un mensaje opcional. Su valor de
+            retorno queda en ``result``.
+        max_workers (int, optional): Límite de hilos (ver get_workers).
+        on_update (callable, optional): ``on_update(index, stage, detail)``, siempre en el hilo que llama.
+        initializer (callable, optional): Se ejecuta al iniciar cada hilo (p. ej. Connection().require_scope).
+        poll (float): Segundos entre lecturas de la cola de avance.
+
+    Returns:
+        list[dict]: Por item y en el mismo orden: ``index``, ``result`` y ``error`` (excepción o None).
+    """
+    on_update = on_update or (lambda index, stage, detail: None)
+    results   = [{"index": index, "result": None, "error": None} for index in range(len(items))]
+    workers   = get_workers(len(items), max_workers)
+
+    if workers == 1:
+        for index, item in enumerate(items):
+            report = lambda stage, detail=None, index=index: on_update(index, stage, detail)
+            _run_item(results[index], ingest, index, item, report)
+        return results
+
+    updates = queue.Queue()
+
+    def drain():
+        while True:
+            try:
+                on_update(*updates.get_nowait())
+            except queue.Empty:
+                return
+
+    with ThreadPoolExecutor(max_workers=workers, thread_name_prefix="ingest", initializer=initializer) as executor:
+        futures = set()
+        for index, item in enumerate(items):
+            on_update(index, "queued", None)
+            report = lambda stage, detail=None, index=index: updates.put((index, stage, detail))
+            futures.add(executor.submit(_run_item, results[index], ingest, index, item, report))
+
+        while futures:
+            _, futures = wait(futures, timeout=poll, return_when=FIRST_COMPLETED)
+            drain()
+    drain()
+    return results
+
+
+def _run_item(result, ingest, index, item, report):
+    try:
+        result["result"] = ingest(index, item, report)
+        report("done")
+    except Exception as e:
+        result["error"] = e
+        report("failed", str(e))
+
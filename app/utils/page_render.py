@@ -0,0 +1,180 @@
+"""
+Rasterización de páginas PDF a JPEG en memoria.
+
+Módulo liviano (solo fitz y PIL) para que los procesos del pool de renderizado de
+DocumentMultimodalService lo importen sin cargar servicios ni conexiones.
+"""
+import io
+
+import fitz
+from PIL import Image, ImageChops
+
+# Rasterización fija anterior (referencia de tool.benchmark.multimodal.py)
+RENDER_DPI   = 300
+# DPI adaptativo: páginas con poco texto → MIN_DPI, texto denso o pequeño → MAX_DPI
+MIN_DPI      = 110
+MAX_DPI      = 220
+# Caracteres por pulgada cuadrada considerados "poco texto" y "texto denso"
+SPARSE_DENSITY = 10
+DENSE_DENSITY  = 60
+# Altura mediana de palabra (pt) por debajo de la cual se usa MAX_DPI (tablas, notas al pie)
+SMALL_TEXT_PT  = 8
+JPEG_QUALITY   = 80
+# Diferencia entre canales RGB tolerada y fracción de píxeles con color para seguir siendo gris
+GRAY_TOLERANCE = 16
+GRAY_MAX_RATIO = 0.002
+
+
+def get_page_groups(page_count, strategy="Single"):
+    """
+    Agrupa las páginas que van en cada imagen: una por imagen (Single) o de a pares
+    apiladas verticalmente (Double). Una última página impar queda sola.
+
+    Returns:
+        list[tuple[int]]: Números de página (base 0) de cada imagen, en orden.
+    """
+    if strategy == "Double":
+        return [tuple(range(start, min(start + 2, page_count))) for start in range(0, page_count, 2)]
+    return [(page_num,) for page_num in range(page_count)]
+
+
+def choose_dpi(page, min_dpi=MIN_DPI, max_dpi=MAX_DPI):
+    """
+    DPI según la densidad de la capa de texto de la página.
+
+    Sin capa de texto (página escaneada) o con letra pequeña se usa ``max_dpi``; si no,
+    se interpola entre ``min_dpi`` y ``max_dpi`` según los caracteres por pulgada cuadrada.
+    """
+    words = page.get_text("words")
+    if not words:
+        return max_dpi
+
+    heights = sorted(word[3] - word[1] for word in words)
+    if heights[len(heights) // 2] < SMALL_TEXT_PT:
+        return max_dpi
+
+    area    = page.rect.width * page.rect.height / 72 ** 2
+    density = sum(len(word[4]) for word in words) / area if area else 0
+    ratio   = min(1.0, max(0.0, (density - SPARSE_DENSITY) / (DENSE_DENSITY - SPARSE_DENSITY)))
+    return int(round(min_dpi + ratio * (max_dpi - min_dpi)))
+
+
+def is_grayscale(image):
+    """
+    True si la imagen no tiene color apreciable (se evalúa sobre una miniatura).
+    """
+    thumbnail = image.convert("RGB").resize((128, 128))
+    red, green, blue = thumbnail.split()
+    diff = ImageChops.lighter(ImageChops.difference(red, green), ImageChops.difference(green, blue))
+    colored = sum(diff.histogram()[GRAY_TOLERANCE:])
+    return colored <= GRAY_MAX_RATIO * thumbnail.width * thumbnail.height
+
+
+def prepare_image(image, max_side=None, grayscale=True):
+    """
+    Reduce la imagen al lado máximo útil del modelo y la pasa a escala de grises si no tiene color.
+
+    Args:
+        image (PIL.Image.Image): Imagen de la página.
+        max_side (int, optional): Lado mayor máximo en píxeles (None = sin límite).
+        grayscale (bool): Convertir a "L" cuando la imagen no tiene color.
+
+    Returns:
+        PIL.Image.Image: La imagen preparada.
+    """
+    if image.mode not in ("RGB", "L"):
+        image = image.convert("RGB")
+    if max_side and max(image.size) > max_side:
+        scale = max_side / max(image.size)
+        image = image.resize((max(1, round(image.width * scale)), max(1, round(image.height * scale))), Image.LANCZOS)
+    if grayscale and image.mode == "RGB" and is_grayscale(image):
+        image = image.convert("L")
+    return image
+
+
+def encode_jpeg(image, quality=JPEG_QUALITY):
+    """
+    Codifica una imagen PIL como JPEG progresivo.
+
+    Returns:
+        bytes: La imagen JPEG.
+    """
+    if image.mode not in ("RGB", "L"):
+        image = image.convert("RGB")
+    buffer = io.BytesIO()
+    image.save(buffer, format="JPEG", quality=quality, optimize=True, progressive=True)
+    return buffer.getvalue()
+
+
+def render_group(pdf_document, group, dpi=None, max_side=None, min_dpi=MIN_DPI, max_dpi=MAX_DPI):
+    """
+    Renderiza las páginas de un grupo y, si son varias, las apila en una sola imagen.
+
+    Args:
+        dpi (int, optional): DPI fijo; None elige el DPI de cada página con choose_dpi.
+        max_side (int, optional): Evita rasterizar por encima del lado máximo de la imagen final.
+
+    Returns:
+        PIL.Image.Image: La imagen del grupo.
+    """
+    pages = [pdf_document[page_num] for page_num in group]
+    # Lado mayor (pt) de la imagen apilada: limita el DPI que vale la pena rasterizar
+    long_side = max(max(page.rect.width for page in pages), sum(page.rect.height for page in pages))
+
+    images = []
+    for page in pages:
+        page_dpi = dpi or choose_dpi(page, min_dpi, max_dpi)
+        if max_side and long_side:
+            page_dpi = max(36, min(page_dpi, int(max_side * 72 / long_side)))
+        pix = page.get_pixmap(dpi=page_dpi, colorspace="rgb")
+        images.append(Image.frombytes("RGB", [pix.width, pix.height], pix.samples))
+
+    if len(images) == 1:
+        return images[0]
+
+    combined_image = Image.new("RGB", (max(image.width for image in images), sum(image.height for image in images)), "white")
+    offset = 0
+    for image in images:
+        combined_image.paste(image, (0, offset))
+        offset += image.height
+    return combined_image
+
+
+def render_groups(
+        pdf,
+        groups,
+        dpi=None,
+        quality=JPEG_QUALITY,
+        max_side=None,
+        grayscale=True,
+        min_dpi=MIN_DPI,
+        max_dpi=MAX_DPI
+    ):
+    """
+    Tarea del pool de procesos: abre el PDF una vez y renderiza varios grupos.
+
+    Args:
+        pdf (bytes | str): Contenido del PDF o ruta a un archivo. El pool recibe la ruta,
+            así cada tarea no serializa el PDF completo por IPC y fitz lee solo sus páginas.
+        groups (list[tuple[int]]): Grupos de páginas (ver get_page_groups).
+        dpi (int, optional): DPI fijo; None = adaptativo (choose_dpi).
+        quality (int): Calidad JPEG.
+        max_side (int, optional): Lado mayor máximo útil para el modelo.
+        grayscale (bool): Enviar en escala de grises las imágenes sin color.
+        min_dpi (int): DPI mínimo del modo adaptativo.
+        max_dpi (int): DPI máximo del modo adaptativo.
+
+    Returns:
+        list[bytes]: Un JPEG por grupo, en el mismo orden.
+    """
+    pdf_document = fitz.open(pdf, filetype="pdf") if isinstance(pdf, str) else fitz.open(stream=pdf, filetype="pdf")
+    try:
+        return [
+            encode_jpeg(
+                prepare_image(render_group(pdf_document, group, dpi, max_side, min_dpi, max_dpi), max_side, grayscale),
+                quality
+            )
+            for group in groups
+        ]
+    finally:
+        pdf_document.close()
@@ -47,4 +47,16 @@
     --
 
     GRANT EXECUTE on DBMS_CLOUD_PIPELINE to u_s_e_r_n_a_m_e;
+    --
+
+    GRANT CTXAPP TO u_s_e_r_n_a_m_e;
+    --
+
+    GRANT SELECT ON V_$SQLAREA TO u_s_e_r_n_a_m_e;
+    --
+
+    GRANT SELECT ON V_$MYSTAT TO u_s_e_r_n_a_m_e;
+    --
+
+    GRANT SELECT ON V_$STATNAME TO u_s_e_r_n_a_m_e;
     --
\ No newline at end of file
@@ -10,6 +10,8 @@
         agent_top_k             NUMBER (3,0) DEFAULT 15 NOT NULL,
         agent_frequency_penalty NUMBER (3,2) DEFAULT 0.3 NOT NULL,
         agent_presence_penalty  NUMBER (3,2) DEFAULT 0.1 NOT NULL,
+        agent_vector_weight     NUMBER (3,2) DEFAULT 1 NOT NULL,
+        agent_lexical_weight    NUMBER (3,2) DEFAULT 1 NOT NULL,
         agent_prompt_system     VARCHAR(4000)NOT NULL,
         agent_prompt_message    VARCHAR(4000),
         agent_state             NUMBER DEFAULT 1 NOT NULL,
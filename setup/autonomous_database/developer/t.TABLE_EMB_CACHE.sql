@@ -0,0 +1,9 @@
+    CREATE TABLE emb_cache (
+        model_id        VARCHAR2(250) NOT NULL,
+        chunk_hash      VARCHAR2(64) NOT NULL,
+        embedding       VECTOR NOT NULL,
+        emb_cache_date  TIMESTAMP(6) DEFAULT SYSDATE NOT NULL,
+        CONSTRAINT pk_emb_cache PRIMARY KEY (model_id, chunk_hash)
+        ENABLE
+    );
+    --
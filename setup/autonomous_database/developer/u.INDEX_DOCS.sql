@@ -0,0 +1,2 @@
+    CREATE INDEX docs_file_id_idx ON docs(file_id);
+    --
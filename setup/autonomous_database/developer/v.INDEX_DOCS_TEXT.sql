@@ -0,0 +1,4 @@
+    CREATE INDEX docs_text_idx ON docs(text)
+    INDEXTYPE IS CTXSYS.CONTEXT
+    PARAMETERS ('SYNC (ON COMMIT)');
+    --
@@ -0,0 +1,33 @@
+    CREATE TABLE answer_cache (
+        answer_cache_id     NUMBER NOT NULL,
+        agent_id            NUMBER NOT NULL,
+        files_key           VARCHAR2(4000) NOT NULL,
+        files_version       VARCHAR2(4000) NOT NULL,
+        question            VARCHAR2(4000) NOT NULL,
+        embedding           VECTOR NOT NULL,
+        answer              CLOB NOT NULL,
+        context             CLOB,
+        answer_tokens       NUMBER DEFAULT 0 NOT NULL,
+        hits                NUMBER DEFAULT 0 NOT NULL,
+        last_hit_date       TIMESTAMP(6),
+        answer_cache_date   TIMESTAMP(6) DEFAULT SYSDATE NOT NULL,
+        CONSTRAINT pk_answer_cache_id PRIMARY KEY (answer_cache_id)
+        ENABLE
+    );
+    --
+
+    CREATE SEQUENCE answer_cache_id_seq START WITH 1 INCREMENT BY 1 NOCACHE;
+    --
+
+    CREATE OR REPLACE TRIGGER trg_answer_cache_id
+        BEFORE INSERT ON answer_cache
+        FOR EACH ROW
+        WHEN (NEW.answer_cache_id IS NULL)
+    BEGIN
+        :NEW.answer_cache_id := answer_cache_id_seq.NEXTVAL;
+    END;
+    /
+    --
+
+    CREATE INDEX answer_cache_key_idx ON answer_cache(agent_id, files_key, files_version);
+    --
@@ -0,0 +1,39 @@
+    CREATE TABLE jobs (
+        job_id              NUMBER NOT NULL,
+        user_id             NUMBER NOT NULL,
+        file_id             NUMBER,
+        job_type            VARCHAR2(50) NOT NULL,
+        job_state           VARCHAR2(20) DEFAULT 'SUBMITTED' NOT NULL,
+        job_params          CLOB,
+        job_oci_id          VARCHAR2(255),
+        job_message         VARCHAR2(4000),
+        job_attempts        NUMBER DEFAULT 0 NOT NULL,
+        job_lease_date      TIMESTAMP(6),
+        job_timeout_date    TIMESTAMP(6),
+        job_end_date        TIMESTAMP(6),
+        job_update_date     TIMESTAMP(6) DEFAULT SYSDATE NOT NULL,
+        job_date            TIMESTAMP(6) DEFAULT SYSDATE NOT NULL,
+        CONSTRAINT pk_job_id PRIMARY KEY (job_id)
+        ENABLE,
+        CONSTRAINT chk_job_state CHECK (job_state IN ('SUBMITTED', 'RUNNING', 'SUCCEEDED', 'FAILED'))
+    );
+    --
+
+    CREATE SEQUENCE job_id_seq START WITH 1 INCREMENT BY 1 NOCACHE;
+    --
+
+    CREATE OR REPLACE TRIGGER trg_job_id
+        BEFORE INSERT ON jobs
+        FOR EACH ROW
+        WHEN (NEW.job_id IS NULL)
+    BEGIN
+        :NEW.job_id := job_id_seq.NEXTVAL;
+    END;
+    /
+    --
+
+    CREATE INDEX jobs_user_idx ON jobs(user_id, job_date);
+    --
+
+    CREATE INDEX jobs_state_idx ON jobs(job_state);
+    --
@@ -0,0 +1,23 @@
+    DECLARE
+        v_count NUMBER;
+    BEGIN
+        SELECT COUNT(*) INTO v_count
+        FROM user_tab_columns
+        WHERE table_name = 'AGENTS'
+        AND column_name = 'AGENT_VECTOR_WEIGHT';
+
+        IF v_count = 0 THEN
+            EXECUTE IMMEDIATE 'ALTER TABLE agents ADD (agent_vector_weight NUMBER (3,2) DEFAULT 1 NOT NULL)';
+        END IF;
+
+        SELECT COUNT(*) INTO v_count
+        FROM user_tab_columns
+        WHERE table_name = 'AGENTS'
+        AND column_name = 'AGENT_LEXICAL_WEIGHT';
+
+        IF v_count = 0 THEN
+            EXECUTE IMMEDIATE 'ALTER TABLE agents ADD (agent_lexical_weight NUMBER (3,2) DEFAULT 1 NOT NULL)';
+        END IF;
+    END;
+    /
+    --
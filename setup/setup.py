@@ -293,6 +293,24 @@ def main():
 
     exec('developer', 's.SP_VECTOR_STORE.sql',
         '[OK][S] CREATE PROCEDURE VECTOS STORRE.......................[ CREATE_VIEW ]')
+
+    exec('developer', 't.TABLE_EMB_CACHE.sql',
+        '[OK][T] CREATE TABLE EMB_CACHE...............................[ CREATE_TABLE ]')
+
+    exec('developer', 'u.INDEX_DOCS.sql',
+        '[OK][U] CREATE INDEX DOCS FILE_ID............................[ CREATE_INDEX ]')
+
+    exec('developer', 'v.INDEX_DOCS_TEXT.sql',
+        '[OK][V] CREATE TEXT INDEX DOCS TEXT..........................[ CREATE_INDEX ]')
+
+    exec('developer', 'w.TABLE_ANSWER_CACHE.sql',
+        '[OK][W] CREATE TABLE ANSWER_CACHE............................[ CREATE_TABLE ]')
+
+    exec('developer', 'x.TABLE_JOBS.sql',
+        '[OK][X] CREATE TABLE JOBS....................................[ CREATE_TABLE ]')
+
+    exec('developer', 'y.ALTER_AGENTS_WEIGHTS.sql',
+        '[OK][Y] ALTER TABLE AGENTS WEIGHTS...........................[ ALTER_TABLE ]')
     
 
     # Copiar .streamlit (Windows: C:\Users\<usuario>\.streamlit, mac: /Users/<usuario>/.streamlit)
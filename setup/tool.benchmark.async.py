@@ -0,0 +1,69 @@
+import os
+import sys
+import time
+import statistics
+from dotenv import load_dotenv
+
+# Cambiar al directorio `app/`
+os.chdir(os.path.normpath(os.path.abspath(os.path.join(os.getcwd(), "..", "app"))))
+print(f"[INFO] Directorio actual: {os.getcwd()}")
+sys.path.insert(0, os.getcwd())
+
+# Cargar variables de entorno desde .env en `app/`
+env_path = os.path.join(os.getcwd(), ".env")
+load_dotenv(dotenv_path=env_path)
+
+import services.database as database
+from services.database.connection_async import AsyncConnection
+
+# Parámetros: python tool.benchmark.async.py <user_id> <iterations> "<query>"
+user_id    = int(sys.argv[1]) if len(sys.argv) > 1 else 0
+iterations = int(sys.argv[2]) if len(sys.argv) > 2 else 10
+query      = sys.argv[3] if len(sys.argv) > 3 else "¿Qué es Oracle AI Vector Search?"
+
+db_file_service  = database.FileService()
+db_agent_service = database.AgentService()
+db_doc_service   = database.DocService()
+
+async_connection    = AsyncConnection()
+async_file_service  = database.AsyncFileService()
+async_agent_service = database.AsyncAgentService()
+async_doc_service   = database.AsyncDocService()
+
+def render_sync():
+    # Sin caché de Streamlit para medir las consultas reales
+    db_file_service.get_all_files.clear()
+    db_agent_service.get_all_agents.clear()
+    db_file_service.get_all_files(user_id)
+    db_agent_service.get_all_agents(user_id)
+    db_doc_service.get_vector_store().similarity_search(query, k=5)
+
+def render_async():
+    async_connection.gather(
+        async_file_service.get_all_files(user_id),
+        async_agent_service.get_all_agents(user_id),
+        async_doc_service.similarity_search(query, k=5)
+    )
+
+def measure(fn):
+    fn()  # warm-up (pool, statement cache, embeddings client)
+    samples = []
+    for _ in range(iterations):
+        start = time.perf_counter()
+        fn()
+        samples.append((time.perf_counter() - start) * 1000)
+    return samples
+
+try:
+    sync_ms  = measure(render_sync)
+    async_ms = measure(render_async)
+
+    print(f"[OK] Page render with 3 lookups (files, agents, vector search) x {iterations}")
+    print(f"  > sync  (serial)       p50={statistics.median(sync_ms):8.2f} ms  max={max(sync_ms):8.2f} ms")
+    print(f"  > async (gather)       p50={statistics.median(async_ms):8.2f} ms  max={max(async_ms):8.2f} ms")
+    print(f"  > speed-up (p50)       {statistics.median(sync_ms) / statistics.median(async_ms):.2f}x")
+
+except Exception as e:
+    sys.exit(e)
+finally:
+    async_connection.close_pool()
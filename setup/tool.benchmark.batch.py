@@ -0,0 +1,59 @@
+import os
+import sys
+import time
+from dotenv import load_dotenv
+
+# Cambiar al directorio `app/`
+os.chdir(os.path.normpath(os.path.abspath(os.path.join(os.getcwd(), "..", "app"))))
+print(f"[INFO] Directorio actual: {os.getcwd()}")
+sys.path.insert(0, os.getcwd())
+
+# Cargar variables de entorno desde .env en `app/`
+env_path = os.path.join(os.getcwd(), ".env")
+load_dotenv(dotenv_path=env_path)
+
+import services.database as database
+from services.database.connection import Connection
+from services.database.query_embedding_cache import QueryEmbeddingCache
+
+# Parámetros: python tool.benchmark.batch.py <queries> <k> <batch_size>
+# Sin CON_GEN_AI_EMB_QUERY_CACHE_DIR para que ambos caminos paguen los embeddings.
+total      = int(sys.argv[1]) if len(sys.argv) > 1 else 200
+k          = int(sys.argv[2]) if len(sys.argv) > 2 else 5
+batch_size = int(sys.argv[3]) if len(sys.argv) > 3 else 16
+
+topics  = ["vector search", "autonomous database", "select ai", "document understanding", "speech to text"]
+queries = [f"Question {i}: how does {topics[i % len(topics)]} handle case {i}?" for i in range(total)]
+
+connection     = Connection()
+query_cache    = QueryEmbeddingCache()
+db_doc_service = database.DocService()
+
+try:
+    vector_store = db_doc_service.get_vector_store()
+
+    query_cache.clear()
+    start = time.perf_counter()
+    looped = [vector_store.similarity_search(query, k=k) for query in queries]
+    looped_s = time.perf_counter() - start
+
+    query_cache.clear()
+    start = time.perf_counter()
+    batched = vector_store.similarity_search_batch(queries, k=k, batch_size=batch_size)
+    batched_s = time.perf_counter() - start
+
+    same = sum(
+        [d.page_content for d in a] == [d.page_content for d in b]
+        for a, b in zip(looped, batched)
+    )
+
+    print(f"[OK] {total} retrievals, k={k}, batch_size={batch_size}")
+    print(f"  > looped similarity_search   {looped_s:8.2f} s  ({looped_s / total * 1000:8.2f} ms/query)")
+    print(f"  > similarity_search_batch    {batched_s:8.2f} s  ({batched_s / total * 1000:8.2f} ms/query)")
+    print(f"  > speed-up                   {looped_s / batched_s:.2f}x")
+    print(f"  > identical rankings         {same}/{total}")
+
+except Exception as e:
+    sys.exit(e)
+finally:
+    connection.close_connection()
@@ -0,0 +1,97 @@
+import os
+import sys
+import time
+from dotenv import load_dotenv
+
+# Cambiar al directorio `app/`
+os.chdir(os.path.normpath(os.path.abspath(os.path.join(os.getcwd(), "..", "app"))))
+print(f"[INFO] Directorio actual: {os.getcwd()}")
+sys.path.insert(0, os.getcwd())
+
+# Cargar variables de entorno desde .env en `app/`
+env_path = os.path.join(os.getcwd(), ".env")
+load_dotenv(dotenv_path=env_path)
+
+import services.database as database
+from services.database.connection import Connection
+
+# Parámetros: python tool.benchmark.clob.py <file_id> "<sizes>"
+# El contenido original de FILE_TRG_EXTRACTION se restaura al finalizar.
+file_id = int(sys.argv[1]) if len(sys.argv) > 1 else 1
+sizes   = sys.argv[2] if len(sys.argv) > 2 else "100K,1M,10M"
+
+units = {"K": 1024, "M": 1024 * 1024}
+
+connection      = Connection()
+db_file_service = database.FileService()
+
+# Misma sesión para la escritura y para V$MYSTAT
+conn = connection.get_connection()
+
+def redo_size():
+    with conn.cursor() as cur:
+        cur.execute("""
+            SELECT S.VALUE
+            FROM V$MYSTAT S
+            JOIN V$STATNAME N ON N.STATISTIC# = S.STATISTIC#
+            WHERE N.NAME = 'redo size'
+        """)
+        return cur.fetchone()[0]
+
+def reset_extraction(value=None):
+    with conn.cursor() as cur:
+        cur.execute("UPDATE FILES SET FILE_TRG_EXTRACTION = NULL WHERE FILE_ID = :file_id", {"file_id": file_id})
+    conn.commit()
+    if value:
+        db_file_service.update_extraction(file_id, value)
+
+def write_concat(text):
+    # Implementación anterior: UPDATE ... CONCAT + commit por cada 4000 caracteres
+    for i in range(0, len(text), 4000):
+        with conn.cursor() as cur:
+            cur.execute("""
+                UPDATE FILES SET
+                    FILE_TRG_EXTRACTION = CONCAT(FILE_TRG_EXTRACTION, :chunk)
+                WHERE FILE_ID = :file_id
+            """, {"chunk": text[i:i + 4000], "file_id": file_id})
+        conn.commit()
+
+def write_stream(text):
+    db_file_service.update_extraction(file_id, text)
+
+def measure(fn, text):
+    reset_extraction()
+    redo_start = redo_size()
+    start = time.perf_counter()
+    fn(text)
+    elapsed = time.perf_counter() - start
+    return elapsed, redo_size() - redo_start
+
+try:
+    with conn.cursor() as cur:
+        cur.execute("SELECT FILE_TRG_EXTRACTION FROM FILES WHERE FILE_ID = :file_id", {"file_id": file_id})
+        row = cur.fetchone()
+        if row is None:
+            sys.exit(f"[ERROR] File {file_id} not found")
+        original = row[0].read() if row[0] is not None else None
+
+    try:
+        for size in sizes.split(","):
+            size  = size.strip().upper()
+            chars = int(size[:-1]) * units[size[-1]] if size[-1] in units else int(size)
+            text  = ("Oracle AI Vector Search ñáé 0123456789 " * (chars // 38 + 1))[:chars]
+
+            concat_s, concat_redo = measure(write_concat, text)
+            stream_s, stream_redo = measure(write_stream, text)
+
+            print(f"[OK] Extraction {size} ({chars:,} characters)")
+            print(f"  > concat (4000 + commit)  time={concat_s:8.2f} s  redo={concat_redo / 1024 / 1024:10.2f} MB")
+            print(f"  > stream (locator)        time={stream_s:8.2f} s  redo={stream_redo / 1024 / 1024:10.2f} MB")
+            print(f"  > speed-up                {concat_s / stream_s:.2f}x")
+    finally:
+        reset_extraction(original)
+
+except Exception as e:
+    sys.exit(e)
+finally:
+    connection.close_connection()
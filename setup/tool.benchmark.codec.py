@@ -0,0 +1,115 @@
+import os
+import sys
+import time
+import statistics
+import numpy as np
+from dotenv import load_dotenv
+
+# Cambiar al directorio `app/`
+os.chdir(os.path.normpath(os.path.abspath(os.path.join(os.getcwd(), "..", "app"))))
+print(f"[INFO] Directorio actual: {os.getcwd()}")
+sys.path.insert(0, os.getcwd())
+
+# Cargar variables de entorno desde .env en `app/`
+env_path = os.path.join(os.getcwd(), ".env")
+load_dotenv(dotenv_path=env_path)
+
+import oracledb
+from services.database import vector_codec
+from services.database.connection import Connection
+from services.database.oracle_vs import OracleVS
+
+# Parámetros: python tool.benchmark.codec.py <rows> <dimension> <queries> <k> "<formats>"
+# Crea la tabla sintética DOCS_CODEC por formato (sin índice vectorial: búsqueda exacta) y la elimina al finalizar.
+rows      = int(sys.argv[1]) if len(sys.argv) > 1 else 50000
+dimension = int(sys.argv[2]) if len(sys.argv) > 2 else 1024
+queries   = int(sys.argv[3]) if len(sys.argv) > 3 else 50
+k         = int(sys.argv[4]) if len(sys.argv) > 4 else 5
+formats   = sys.argv[5] if len(sys.argv) > 5 else "float32,int8,binary"
+
+table_name = "docs_codec"
+batch_size = 5000
+sql_types  = {"float32": "FLOAT32", "int8": "INT8", "binary": "BINARY"}
+
+connection = Connection()
+conn       = connection.get_connection()
+rng        = np.random.default_rng(42)
+
+def execute(sql, ignore=None):
+    try:
+        with conn.cursor() as cur:
+            cur.execute(sql)
+    except oracledb.DatabaseError as e:
+        if not ignore or ignore not in str(e):
+            raise
+
+def drop_table():
+    execute(f"DROP TABLE {table_name} PURGE", ignore="ORA-00942")
+
+def load_corpus(matrix, vector_format):
+    drop_table()
+    execute(f"""
+        CREATE TABLE {table_name} (
+            id         NUMBER PRIMARY KEY,
+            text       CLOB,
+            embedding  VECTOR({dimension}, {sql_types[vector_format]}) NOT NULL
+        )
+    """)
+    encode_s = insert_s = 0.0
+    with conn.cursor() as cur:
+        for offset in range(0, len(matrix), batch_size):
+            start = time.perf_counter()
+            vectors = vector_codec.encode_many(matrix[offset:offset + batch_size], vector_format)
+            encode_s += time.perf_counter() - start
+            batch = [(offset + i, f"chunk {offset + i}", vector) for i, vector in enumerate(vectors)]
+            start = time.perf_counter()
+            cur.executemany(f"INSERT INTO {table_name} VALUES (:1, :2, :3)", batch)
+            insert_s += time.perf_counter() - start
+    conn.commit()
+    return encode_s, insert_s
+
+def search(vector_store, vectors):
+    results, samples = [], []
+    with conn.cursor() as cur:
+        for vector in vectors:
+            sql, binds = vector_store._search_sql(vector, k)
+            start = time.perf_counter()
+            cur.execute(sql, binds)
+            results.append([row[0] for row in cur.fetchall()])
+            samples.append((time.perf_counter() - start) * 1000)
+    return results, samples
+
+try:
+    matrix  = rng.standard_normal((rows, dimension), dtype=np.float32)
+    vectors = matrix[rng.choice(rows, queries, replace=False)] + rng.normal(0, 0.1, (queries, dimension)).astype(np.float32)
+    print(f"[OK] Corpus {rows:,} vectors x {dimension} dims, k={k}, {queries} queries")
+
+    truth = None
+    for vector_format in formats.split(","):
+        vector_format = vector_codec.get_vector_format(vector_format)
+        encode_s, insert_s = load_corpus(matrix, vector_format)
+
+        vector_store = OracleVS(
+            client             = conn,
+            embedding_function = None,
+            table_name         = table_name,
+            search_mode        = "exact",
+            vector_format      = vector_format,
+            distance_strategy  = vector_codec.get_distance(vector_format)
+        )
+        search(vector_store, vectors[:1])  # warm-up
+        found, query_ms = search(vector_store, vectors)
+        if truth is None:
+            truth = found
+        recall = statistics.mean(len(set(a) & set(t)) / len(t) for a, t in zip(found, truth) if t)
+
+        nbytes = vector_codec.get_nbytes(dimension, vector_format)
+        print(f"  > {vector_format:<8} {nbytes:>6} B/vector  {nbytes * rows / 1024 ** 2:8.1f} MB"
+              f"  encode={encode_s:6.2f} s  insert={rows / insert_s:9.0f} rows/s"
+              f"  p50={statistics.median(query_ms):8.2f} ms  recall@{k} vs first={recall:.3f}")
+
+except Exception as e:
+    sys.exit(e)
+finally:
+    drop_table()
+    connection.close_connection()
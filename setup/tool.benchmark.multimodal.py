@@ -0,0 +1,94 @@
+import os
+import re
+import sys
+import glob
+import time
+import base64
+from collections import Counter
+from dotenv import load_dotenv
+
+# Cambiar al directorio `app/`
+os.chdir(os.path.normpath(os.path.abspath(os.path.join(os.getcwd(), "..", "app"))))
+print(f"[INFO] Directorio actual: {os.getcwd()}")
+sys.path.insert(0, os.getcwd())
+
+# Cargar variables de entorno desde .env en `app/`
+env_path = os.path.join(os.getcwd(), ".env")
+load_dotenv(dotenv_path=env_path)
+
+import fitz
+import services as service
+import services.database as database
+from services.database.connection import Connection
+from utils import page_render
+
+# Parámetros: python tool.benchmark.multimodal.py <user_id> <agent_id> <pdf_dir> <max_pages> <extract>
+# Compara la rasterización fija anterior (300 DPI, calidad 95, RGB) con la adaptativa de
+# get_render_options: bytes enviados y, con extract=1, exactitud de la extracción del agente
+# (F1 de palabras contra la capa de texto del PDF; los PDF escaneados no tienen referencia).
+user_id   = int(sys.argv[1]) if len(sys.argv) > 1 else 0
+agent_id  = int(sys.argv[2]) if len(sys.argv) > 2 else 0
+pdf_dir   = sys.argv[3] if len(sys.argv) > 3 else os.path.join("..", "setup", "samples")
+max_pages = int(sys.argv[4]) if len(sys.argv) > 4 else 10
+extract   = (sys.argv[5] if len(sys.argv) > 5 else "1") == "1"
+
+connection = Connection()
+df_agents  = database.AgentService().get_all_agents_cache(user_id)[lambda df: df["AGENT_ID"] == agent_id]
+model_id   = str(df_agents["AGENT_MODEL_NAME"].values[0])
+
+profiles = {
+    "fixed-300": {"dpi": page_render.RENDER_DPI, "quality": 95, "max_side": None, "grayscale": False},
+    "adaptive" : service.DocumentMultimodalService.get_render_options(model_id)
+}
+
+def get_words(text):
+    return Counter(re.findall(r"\w+", (text or "").lower()))
+
+def get_f1(reference, extraction):
+    reference, extraction = get_words(reference), get_words(extraction)
+    common = sum((reference & extraction).values())
+    if not common:
+        return 0.0
+    precision = common / sum(extraction.values())
+    recall    = common / sum(reference.values())
+    return 2 * precision * recall / (precision + recall)
+
+try:
+    files = sorted(glob.glob(os.path.join(pdf_dir, "*.pdf")))
+    if not files:
+        sys.exit(f"[ERROR] No PDF files in {pdf_dir}")
+    print(f"[OK] {len(files)} PDF files, model {model_id}, up to {max_pages} pages each")
+
+    totals = {name: {"pages": 0, "bytes": 0, "render_s": 0.0, "extract_s": 0.0, "f1": []} for name in profiles}
+    for path in files:
+        with open(path, "rb") as f:
+            pdf_bytes = f.read()
+        with fitz.open(stream=pdf_bytes, filetype="pdf") as pdf_document:
+            page_count = min(len(pdf_document), max_pages)
+            reference  = "".join(pdf_document[page_num].get_text() for page_num in range(page_count))
+        groups = page_render.get_page_groups(page_count)
+
+        for name, options in profiles.items():
+            start  = time.perf_counter()
+            images = page_render.render_groups(pdf_bytes, groups, **options)
+            totals[name]["render_s"] += time.perf_counter() - start
+            totals[name]["pages"]    += len(images)
+            totals[name]["bytes"]    += sum(len(base64.b64encode(image)) for image in images)
+
+            if extract:
+                start = time.perf_counter()
+                markdown = service.DocumentMultimodalService.get_extraction(user_id, agent_id, enumerate(images))
+                totals[name]["extract_s"] += time.perf_counter() - start
+                if reference.strip():
+                    totals[name]["f1"].append(get_f1(reference, markdown))
+
+    for name, total in totals.items():
+        f1 = f"{sum(total['f1']) / len(total['f1']):.3f}" if total["f1"] else "n/a"
+        print(f"  > {name:<10} {total['pages']:>4} pages  {total['bytes'] / 1024 ** 2:8.2f} MB sent"
+              f"  {total['bytes'] / 1024 / max(1, total['pages']):8.1f} KB/page"
+              f"  render={total['render_s']:6.2f} s  extract={total['extract_s']:7.2f} s  word F1={f1}")
+
+except Exception as e:
+    sys.exit(e)
+finally:
+    connection.close_connection()
@@ -0,0 +1,50 @@
+import os
+import sys
+import time
+from dotenv import load_dotenv
+
+# Cambiar al directorio `app/`
+os.chdir(os.path.normpath(os.path.abspath(os.path.join(os.getcwd(), "..", "app"))))
+print(f"[INFO] Directorio actual: {os.getcwd()}")
+sys.path.insert(0, os.getcwd())
+
+# Cargar variables de entorno desde .env en `app/`
+env_path = os.path.join(os.getcwd(), ".env")
+load_dotenv(dotenv_path=env_path)
+
+import services.database as database
+from services.database.connection import Connection
+
+# Parámetros: python tool.benchmark.parse.py <user_id> <iterations>
+user_id    = int(sys.argv[1]) if len(sys.argv) > 1 else 0
+iterations = int(sys.argv[2]) if len(sys.argv) > 2 else 200
+
+connection       = Connection()
+db_file_service  = database.FileService()
+db_agent_service = database.AgentService()
+db_user_service  = database.UserService()
+
+try:
+    start = time.perf_counter()
+    for _ in range(iterations):
+        # Sin caché de Streamlit para que cada llamada ejecute la sentencia
+        db_file_service.get_all_files.clear()
+        db_agent_service.get_all_agents.clear()
+        db_user_service.get_user.clear()
+        db_file_service.get_all_files(user_id)
+        db_agent_service.get_all_agents(user_id)
+        db_user_service.get_user(user_id)
+    elapsed = time.perf_counter() - start
+
+    print(f"[OK] {iterations * 3} executions in {elapsed:.2f} s (stmtcachesize={connection._pool_config['stmtcachesize']})")
+
+    df = connection.get_statement_stats(limit=10)
+    if df.empty:
+        print("[WARN] V$SQLAREA not accessible, grant SELECT ON V_$SQLAREA to the app user")
+    for _, row in df.iterrows():
+        print(f"  > {row['SQL_ID']}  parses={row['PARSE_CALLS']:>8}  executions={row['EXECUTIONS']:>8}  loads={row['LOADS']:>4}  ratio={row['PARSE_RATIO']}")
+
+except Exception as e:
+    sys.exit(e)
+finally:
+    connection.close_connection()
@@ -0,0 +1,120 @@
+import os
+import sys
+import time
+import array
+import random
+import statistics
+from dotenv import load_dotenv
+
+# Cambiar al directorio `app/`
+os.chdir(os.path.normpath(os.path.abspath(os.path.join(os.getcwd(), "..", "app"))))
+print(f"[INFO] Directorio actual: {os.getcwd()}")
+sys.path.insert(0, os.getcwd())
+
+# Cargar variables de entorno desde .env en `app/`
+env_path = os.path.join(os.getcwd(), ".env")
+load_dotenv(dotenv_path=env_path)
+
+import oracledb
+from services.database.connection import Connection
+from services.database.oracle_vs import OracleVS
+
+# Parámetros: python tool.benchmark.vector.py "<sizes>" <dimension> <queries> <k> "<accuracies>"
+# Crea la tabla sintética DOCS_BENCH (misma estructura que DOCS) y la elimina al finalizar.
+sizes      = sys.argv[1] if len(sys.argv) > 1 else "10000,100000,1000000"
+dimension  = int(sys.argv[2]) if len(sys.argv) > 2 else 1024
+queries    = int(sys.argv[3]) if len(sys.argv) > 3 else 50
+k          = int(sys.argv[4]) if len(sys.argv) > 4 else 5
+accuracies = sys.argv[5] if len(sys.argv) > 5 else "80,90,95,99"
+
+table_name = "docs_bench"
+batch_size = 5000
+
+connection = Connection()
+conn       = connection.get_connection()
+rng        = random.Random(42)
+
+def random_vector():
+    return array.array("f", (rng.gauss(0, 1) for _ in range(dimension)))
+
+def execute(sql, ignore=None):
+    try:
+        with conn.cursor() as cur:
+            cur.execute(sql)
+    except oracledb.DatabaseError as e:
+        if not ignore or ignore not in str(e):
+            raise
+
+def drop_table():
+    execute(f"DROP TABLE {table_name} PURGE", ignore="ORA-00942")
+
+def load_corpus(rows):
+    drop_table()
+    execute(f"""
+        CREATE TABLE {table_name} (
+            id         NUMBER PRIMARY KEY,
+            file_id    NUMBER,
+            text       CLOB,
+            metadata   CLOB,
+            embedding  VECTOR({dimension}, FLOAT32) NOT NULL
+        )
+    """)
+    start = time.perf_counter()
+    with conn.cursor() as cur:
+        for offset in range(0, rows, batch_size):
+            batch = [
+                (i, i % 100, f"chunk {i}", "{}", random_vector())
+                for i in range(offset, min(offset + batch_size, rows))
+            ]
+            cur.executemany(f"INSERT INTO {table_name} VALUES (:1, :2, :3, :4, :5)", batch)
+    conn.commit()
+    execute(f"""
+        CREATE VECTOR INDEX {table_name}_vec_idx ON {table_name}(embedding)
+        ORGANIZATION NEIGHBOR PARTITIONS
+        DISTANCE COSINE
+        WITH TARGET ACCURACY 95
+    """)
+    return time.perf_counter() - start
+
+def search(vector_store, vectors):
+    results, samples = [], []
+    with conn.cursor() as cur:
+        for vector in vectors:
+            sql, binds = vector_store._search_sql(vector, k)
+            start = time.perf_counter()
+            cur.execute(sql, binds)
+            results.append([row[0] for row in cur.fetchall()])
+            samples.append((time.perf_counter() - start) * 1000)
+    return results, samples
+
+try:
+    vectors = [random_vector() for _ in range(queries)]
+
+    for size in sizes.split(","):
+        rows = int(size)
+        load_s = load_corpus(rows)
+        print(f"[OK] Corpus {rows:,} chunks x {dimension} dims (load + vector index {load_s:.1f} s), k={k}, {queries} queries")
+
+        exact_store = OracleVS(client=conn, embedding_function=None, table_name=table_name, search_mode="exact")
+        search(exact_store, vectors[:1])  # warm-up
+        truth, exact_ms = search(exact_store, vectors)
+        print(f"  > exact               recall=1.000  p50={statistics.median(exact_ms):8.2f} ms  max={max(exact_ms):8.2f} ms")
+
+        for accuracy in accuracies.split(","):
+            approx_store = OracleVS(
+                client             = conn,
+                embedding_function = None,
+                table_name         = table_name,
+                search_mode        = "approx",
+                target_accuracy    = int(accuracy)
+            )
+            search(approx_store, vectors[:1])  # warm-up
+            found, approx_ms = search(approx_store, vectors)
+            recall = statistics.mean(len(set(a) & set(t)) / len(t) for a, t in zip(found, truth) if t)
+            print(f"  > approx (target {int(accuracy):>3}%) recall={recall:.3f}  p50={statistics.median(approx_ms):8.2f} ms  max={max(approx_ms):8.2f} ms")
+
+except Exception as e:
+    sys.exit(e)
+finally:
+    drop_table()
+    connection.close_connection()
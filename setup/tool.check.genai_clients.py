@@ -0,0 +1,62 @@
+import os
+import sys
+import threading
+from dotenv import load_dotenv
+
+# Cambiar al directorio `app/`
+os.chdir(os.path.normpath(os.path.abspath(os.path.join(os.getcwd(), "..", "app"))))
+print(f"[INFO] Directorio actual: {os.getcwd()}")
+sys.path.insert(0, os.getcwd())
+
+# Cargar variables de entorno desde .env en `app/`
+env_path = os.path.join(os.getcwd(), ".env")
+load_dotenv(dotenv_path=env_path)
+
+from services.genai_registry import GenAIClientRegistry
+
+# Parámetros: python tool.check.genai_clients.py
+# Simula dos reruns de Streamlit (cada uno en un hilo nuevo) y comprueba que el segundo
+# reutiliza el cliente del primero; dos hilos a la vez deben recibir clientes distintos.
+registry = GenAIClientRegistry()
+registry.clear()
+
+def lease(clients, hold=None, ready=None):
+    with registry.lease_client() as client:
+        clients.append(client)
+        if ready is not None:
+            ready.set()
+        if hold is not None:
+            hold.wait()
+
+try:
+    # Hilos secuenciales
+    sequential = []
+    for _ in range(2):
+        thread = threading.Thread(target=lease, args=(sequential,))
+        thread.start()
+        thread.join()
+    print(f"[OK] Sequential threads: {registry.get_stats()}")
+    if sequential[0] is not sequential[1]:
+        sys.exit("[ERROR] The second thread did not reuse the pooled client")
+    print("[OK] The second thread reused the client of the first one")
+
+    # Hilos concurrentes: el primero retiene su cliente mientras el segundo pide otro
+    concurrent = []
+    hold, ready = threading.Event(), threading.Event()
+    first = threading.Thread(target=lease, args=(concurrent, hold, ready))
+    first.start()
+    ready.wait()
+    second = threading.Thread(target=lease, args=(concurrent,))
+    second.start()
+    second.join()
+    hold.set()
+    first.join()
+    print(f"[OK] Concurrent threads: {registry.get_stats()}")
+    if concurrent[0] is concurrent[1]:
+        sys.exit("[ERROR] Two threads used the same client at the same time")
+    print("[OK] Concurrent threads got their own client")
+
+except Exception as e:
+    sys.exit(e)
+finally:
+    registry.clear()
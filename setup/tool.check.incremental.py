@@ -0,0 +1,84 @@
+import os
+import sys
+import time
+from dotenv import load_dotenv
+
+# Cambiar al directorio `app/`
+os.chdir(os.path.normpath(os.path.abspath(os.path.join(os.getcwd(), "..", "app"))))
+print(f"[INFO] Directorio actual: {os.getcwd()}")
+sys.path.insert(0, os.getcwd())
+
+# Cargar variables de entorno desde .env en `app/`
+env_path = os.path.join(os.getcwd(), ".env")
+load_dotenv(dotenv_path=env_path)
+
+# El modo incremental solo existe en el pipeline Python
+os.environ["CON_GEN_AI_EMB_PIPELINE"]    = "python"
+os.environ["CON_GEN_AI_EMB_INCREMENTAL"] = "True"
+
+import services.database as database
+from services.database.connection import Connection
+
+# Parámetros: python tool.check.incremental.py <user_id> <module_id>
+# Carga un archivo temporal, lo re-ingiere como nueva versión sin uno de sus párrafos y
+# comprueba que los chunks de ese párrafo se borraron de DOCS. El archivo se elimina al final.
+user_id   = int(sys.argv[1]) if len(sys.argv) > 1 else 0
+module_id = int(sys.argv[2]) if len(sys.argv) > 2 else 7
+
+connection      = Connection()
+db_file_service = database.FileService()
+db_doc_service  = database.DocService()
+
+marker     = f"REMOVED{int(time.time())}"
+paragraphs = [f"Paragraph {i}: Oracle AI Vector Search keeps chunk {i} of the incremental check. " * 8 for i in range(6)]
+removed    = f"{marker} " * 40
+version_1  = "\n\n".join(paragraphs[:3] + [removed] + paragraphs[3:])
+version_2  = "\n\n".join(paragraphs)
+
+def count_docs(conn, file_id, marker=None):
+    with conn.cursor() as cur:
+        cur.execute("""
+            SELECT COUNT(*)
+            FROM DOCS
+            WHERE FILE_ID = :file_id
+            AND (:marker IS NULL OR DBMS_LOB.INSTR(TEXT, :marker) > 0)
+        """, {"file_id": file_id, "marker": marker})
+        return cur.fetchone()[0]
+
+def ingest(text):
+    _, file_id = db_file_service.insert_file(
+        f"{marker}.txt", user_id, module_id, f"check/{marker}.txt", len(text), None, f"check/{marker}_trg.txt", "en", 0, "Incremental check"
+    )
+    db_file_service.update_extraction(file_id, text)
+    db_doc_service.vector_store(file_id)
+    return file_id
+
+file_id = None
+try:
+    with connection.acquire() as conn:
+        try:
+            file_id = ingest(version_1)
+            before  = count_docs(conn, file_id, marker)
+            total_1 = count_docs(conn, file_id)
+            print(f"[OK] Version 1: {total_1} chunks, {before} with the removed paragraph")
+
+            ingest(version_2)
+            after   = count_docs(conn, file_id, marker)
+            total_2 = count_docs(conn, file_id)
+            with conn.cursor() as cur:
+                cur.execute("SELECT DBMS_LOB.GETLENGTH(FILE_TRG_EXTRACTION) FROM FILES WHERE FILE_ID = :file_id", {"file_id": file_id})
+                length = cur.fetchone()[0]
+            print(f"[OK] Version 2: {total_2} chunks, {after} with the removed paragraph")
+            print(f"  > extraction length {length} (expected {len(version_2)})")
+
+            if before == 0 or after != 0 or length != len(version_2):
+                sys.exit("[ERROR] The re-ingest did not delete the chunks of the removed text")
+            print("[OK] Removed text was deleted from DOCS")
+        finally:
+            if file_id is not None:
+                db_file_service.delete_file(f"{marker}.txt", file_id)
+
+except Exception as e:
+    sys.exit(e)
+finally:
+    connection.close_connection()